@@ -0,0 +1,70 @@
+"""
+Run the benchmark scenarios and emit the results as JSON.
+
+Run from the repository root:
+    python -m benchmarks                            # all scenarios, JSON on stdout
+    python -m benchmarks drag codegen --classes 500
+    python -m benchmarks --output after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+
+from benchmarks.scenarios import DEFAULT_PARAMS, SCENARIOS
+
+
+def current_commit():
+    """Commit hash of the working tree, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, report):
+    """Print the ratio of every timing to the same timing in a baseline report."""
+    for scenario, metrics in report["results"].items():
+        for key, value in metrics.items():
+            before = baseline.get("results", {}).get(scenario, {}).get(key)
+            if key.endswith("_ms") and before:
+                print(f"{scenario}.{key:<28} {before:10.2f} -> {value:10.2f} ms  x{value / before:.2f}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the benchmark scenarios.")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all).")
+    for name, default in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--compare", help="Earlier JSON report to compare the timings against.")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    params = {name: getattr(args, name) for name in DEFAULT_PARAMS}
+    report = {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "results": {name: SCENARIOS[name](params) for name in args.scenarios or SCENARIOS},
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            compare(json.load(file), report)
+
+
+if __name__ == "__main__":
+    main()
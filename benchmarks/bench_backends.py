@@ -0,0 +1,73 @@
+"""
+Compare per-class generation cost of the language backends with the previous
+f-string generators.
+
+Run from the repository root:
+    python -m benchmarks.bench_backends
+"""
+import time
+
+from benchmarks.synthetic import make_diagram
+from src.models.languages import MemberTemplate, available_languages, get_backend
+
+
+def legacy_python(class_name, attributes, methods, parent_class):
+    inheritance = f"({parent_class})" if parent_class else ""
+    attr_lines = [f"    {attr} = None" for attr in attributes]
+    method_lines = [f"    def {method}(self):\n        pass" for method in methods]
+    return f"class {class_name}{inheritance}:\n" + "\n".join(attr_lines + method_lines)
+
+
+def legacy_java(class_name, attributes, methods, parent_class):
+    inheritance = f" extends {parent_class}" if parent_class else ""
+    attr_lines = [f"    private Object {attr};" for attr in attributes]
+    method_lines = [f"    public void {method}() {{}}\n" for method in methods]
+    return f"public class {class_name}{inheritance} {{\n" + "\n".join(attr_lines + method_lines) + "\n}"
+
+
+def legacy_php(class_name, attributes, methods, parent_class):
+    inheritance = f" extends {parent_class}" if parent_class else ""
+    attr_lines = [f"    public ${attr};" for attr in attributes]
+    method_lines = [f"    public function {method}() {{}}\n" for method in methods]
+    return f"class {class_name}{inheritance} {{\n" + "\n".join(attr_lines + method_lines) + "\n}"
+
+
+LEGACY = {"python": legacy_python, "java": legacy_java, "php": legacy_php}
+
+
+def per_class(generate, classes):
+    start = time.perf_counter()
+    for cls in classes:
+        generate(cls["name"], cls["attributes"], cls["methods"], "Base")
+    return (time.perf_counter() - start) / len(classes) * 1e6
+
+
+def member_rendering(classes, template="    private Object {member};"):
+    """Microseconds per class to render the attribute lines, pre-split against one format call per member."""
+    compiled = MemberTemplate(template)
+    line = template.replace("{member}", "{0}")
+    results = []
+    for render in (compiled.render, lambda members: "\n".join([line.format(member) for member in members])):
+        start = time.perf_counter()
+        for cls in classes:
+            render(cls["attributes"])
+        results.append((time.perf_counter() - start) / len(classes) * 1e6)
+    return results
+
+
+def run(num_classes=20000, members=10):
+    classes = make_diagram(num_classes, members=members)["classes"]
+    print(f"{num_classes} classes, {members} attributes and {members} methods each")
+    for language in available_languages():
+        backend = get_backend(language).generate_class
+        legacy = LEGACY.get(language)
+        line = f"  {language:<8} backend {per_class(backend, classes):6.2f} us/class"
+        if legacy is not None:
+            line += f", previous generator {per_class(legacy, classes):6.2f} us/class"
+        print(line)
+    split, formatted = member_rendering(classes)
+    print(f"  attribute lines: pre-split template {split:.2f} us/class, str.format per member {formatted:.2f} us/class")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,33 @@
+"""
+Measure how generate_code_from_diagram scales with the size of the diagram.
+
+Run from the repository root:
+    python -m benchmarks.bench_codegen
+"""
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_diagram
+from src.models.code_generator import generate_code_from_diagram
+
+SIZES = [100, 1000, 5000, 10000, 50000]
+
+
+def run(sizes=SIZES, language="python"):
+    """Time code generation for each diagram size and print per-class cost."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            path = os.path.join(tmp_dir, f"diagram_{size}.json")
+            with open(path, "w") as file:
+                json.dump(make_diagram(size), file)
+
+            start = time.perf_counter()
+            generate_code_from_diagram(path, language)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>6} classes: {elapsed * 1000:9.1f} ms  ({elapsed / size * 1e6:6.2f} us/class)")
+
+
+if __name__ == "__main__":
+    run()
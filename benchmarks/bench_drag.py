@@ -0,0 +1,49 @@
+"""
+Count canvas operations per motion event while dragging one box in a large diagram.
+
+Run from the repository root:
+    python -m benchmarks.bench_drag
+"""
+import random
+
+from benchmarks.fake_canvas import FakeEvent, make_headless_app
+from src.diagram import ClassNode, Diagram
+
+
+def build_app(num_classes, num_associations, seed=0):
+    """Build a headless UMLApp showing a random diagram, with Class0 in the visible area."""
+    rng = random.Random(seed)
+    diagram = Diagram()
+    diagram.add_class(ClassNode("Class0", ["a", "b"], ["m"], 100, 100))
+    for i in range(1, num_classes):
+        diagram.add_class(ClassNode(f"Class{i}", ["a", "b"], ["m"], rng.uniform(0, 5000), rng.uniform(0, 5000)))
+    names = list(diagram.classes)
+    for _ in range(num_associations):
+        name1, name2 = rng.sample(names, 2)
+        diagram.add_edge(rng.choice(["association", "inheritance", "composition"]), name1, name2)
+    return make_headless_app(diagram)
+
+
+def run(num_classes=300, num_associations=900, motion_events=100, events_per_frame=4):
+    """
+    Drag the first box and report canvas operations per motion event.
+    :param events_per_frame: Motion events Tk delivers between two scheduled redraws.
+    """
+    app = build_app(num_classes, num_associations)
+    box = app.class_boxes["Class0"]
+    app.drag_data.update(item=box, start_x=0, start_y=0)
+    app.canvas.reset()
+    for step in range(1, motion_events + 1):
+        app.on_drag(FakeEvent(step, step))
+        if step % events_per_frame == 0:
+            app.root.run_pending()
+    app.on_release(FakeEvent(motion_events, motion_events))
+    per_event = app.canvas.total() / motion_events
+    print(f"{num_classes} classes, {num_associations} associations, {len(app.diagram.incident(box.class_name))} on the dragged box")
+    print(f"{events_per_frame} motion events per frame")
+    print(f"canvas operations per motion event: {per_event:.1f}")
+    for name, count in sorted(app.canvas.calls.items()):
+        print(f"  {name:<18} {count / motion_events:.2f}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,23 @@
+"""
+Count canvas operations for editing one class, in a small and in a large diagram.
+
+Run from the repository root:
+    python -m benchmarks.bench_edit
+"""
+from benchmarks.bench_drag import build_app
+
+
+def run(sizes=(2, 1000)):
+    """Edit one class's members and report the canvas operations it took."""
+    for size in sizes:
+        app = build_app(size, size * 3)
+        box = app.class_boxes["Class0"]
+        app.canvas.reset()
+        app.edit_class(box, ["a", "renamed", "c", "d", "e", "f", "g"], ["m", "n"])
+        app.scheduler.flush()
+        print(f"{size:>5} classes: {app.canvas.total()} canvas operations "
+              f"({len(app.diagram.incident(box.class_name))} lines on the edited box)")
+
+
+if __name__ == "__main__":
+    run()
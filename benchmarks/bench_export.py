@@ -0,0 +1,55 @@
+"""
+Measure multi-file code export, first into an empty directory and then again
+after a one-class edit, where only the changed file should be rewritten.
+
+Run from the repository root:
+    python -m benchmarks.bench_export
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_diagram
+from src.models.exporter import class_file_content, export_code
+from src.models.code_generator import iter_class_fragments
+from src.models.languages import get_backend
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def sequential_export(data, language, output_dir):
+    """Plain loop writing every file unconditionally, the baseline for the export."""
+    backend = get_backend(language)
+    for class_name, fragment in iter_class_fragments(data, language):
+        with open(os.path.join(output_dir, backend.file_name(class_name)), "w") as file:
+            file.write(class_file_content(backend, fragment))
+
+
+def run(num_classes=5000, language="java"):
+    data = make_diagram(num_classes, members=8)
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, "seq"))
+        _, sequential = timed(sequential_export, data, language, os.path.join(root, "seq"))
+        first, cold = timed(export_code, data, language, os.path.join(root, "out"))
+        again, unchanged = timed(export_code, data, language, os.path.join(root, "out"))
+        data["classes"][num_classes // 2]["attributes"].append("added")
+        edited, one_edit = timed(export_code, data, language, os.path.join(root, "out"))
+
+    assert len(first["written"]) == num_classes
+    assert not again["written"]
+    assert len(edited["written"]) == 1
+
+    print(f"{num_classes} classes ({language})")
+    print(f"  sequential, always write {sequential * 1000:8.1f} ms")
+    print(f"  export, empty directory  {cold * 1000:8.1f} ms  ({len(first['written'])} written)")
+    print(f"  export, nothing changed  {unchanged * 1000:8.1f} ms  ({len(again['written'])} written)")
+    print(f"  export, one class edited {one_edit * 1000:8.1f} ms  ({len(edited['written'])} written)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,64 @@
+"""
+Compare file size, save time and load time of JSON and binary (.umlb) diagrams.
+
+Run from the repository root:
+    python -m benchmarks.bench_formats
+"""
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_diagram
+from src.diagram.binary_format import BinaryDiagram, read_binary, write_binary
+
+SIZES = [1000, 10000, 50000]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def save_json(data, path):
+    with open(path, "w") as file:
+        json.dump(data, file, indent=4)
+
+
+def load_json(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def open_binary(path):
+    """Open a binary diagram and read one class record, as a lazy viewer would."""
+    with BinaryDiagram(path) as diagram:
+        return diagram.class_record(diagram.class_count // 2)
+
+
+def run(sizes=SIZES):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            data = make_diagram(size, members=5, associations_per_class=3)
+            json_path = os.path.join(tmp_dir, f"diagram_{size}.json")
+            binary_path = os.path.join(tmp_dir, f"diagram_{size}.umlb")
+
+            _, json_save = timed(save_json, data, json_path)
+            _, binary_save = timed(write_binary, data, binary_path)
+            loaded, json_load = timed(load_json, json_path)
+            decoded, binary_load = timed(read_binary, binary_path)
+            assert decoded == loaded
+            _, binary_open = timed(open_binary, binary_path)
+
+            json_size = os.path.getsize(json_path)
+            binary_size = os.path.getsize(binary_path)
+            print(f"{size:>6} classes: size json {json_size / 1e6:6.2f} MB, binary {binary_size / 1e6:6.2f} MB "
+                  f"({binary_size / json_size:.0%})")
+            print(f"{'':>15} save json {json_save * 1000:7.1f} ms, binary {binary_save * 1000:7.1f} ms")
+            print(f"{'':>15} load json {json_load * 1000:7.1f} ms, binary {binary_load * 1000:7.1f} ms, "
+                  f"lazy open + one class {binary_open * 1000:5.2f} ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,64 @@
+"""
+Compare the time to load a diagram onto the canvas with the previous loader.
+
+The previous loader created every ClassBox immediately and resolved each
+association endpoint with a linear scan over all boxes. The current one
+indexes the diagram first and builds views in time-sliced chunks.
+
+Run from the repository root:
+    python -m benchmarks.bench_load
+"""
+import time
+
+from benchmarks.fake_canvas import RecordingCanvas, make_headless_app
+from benchmarks.synthetic import make_diagram
+from src.diagram import Diagram
+from src.models.association_line import AssociationLine
+from src.models.class_box import ClassBox
+
+SIZES = [1000, 2000, 5000]
+
+
+def legacy_load(canvas, data):
+    """The loading loop UMLApp.load_diagram used before chunked loading."""
+    class_boxes = []
+    for cls in data["classes"]:
+        class_boxes.append(ClassBox(
+            canvas, cls["position"][0], cls["position"][1], cls["name"], cls["attributes"], cls["methods"]
+        ))
+    for assoc in data["associations"]:
+        box1 = next((box for box in class_boxes if box.class_name == assoc["from"]), None)
+        box2 = next((box for box in class_boxes if box.class_name == assoc["to"]), None)
+        if box1 and box2:
+            AssociationLine(canvas, box1, box2, assoc["type"])
+
+
+def chunked_load(data):
+    """Load through UMLApp.set_diagram, returning the number of event-loop slices it took."""
+    app = make_headless_app()
+    app.set_diagram(Diagram.from_dict(data), incremental=True)
+    slices = 0
+    while app.root.pending:
+        app.root.run_pending()
+        slices += 1
+    return slices
+
+
+def run(sizes=SIZES):
+    for size in sizes:
+        data = make_diagram(size, associations_per_class=2)
+
+        start = time.perf_counter()
+        legacy_load(RecordingCanvas(), data)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        slices = chunked_load(data)
+        chunked = time.perf_counter() - start
+
+        print(f"{size:>6} classes: legacy {legacy * 1000:8.1f} ms (one blocking call), "
+              f"chunked {chunked * 1000:8.1f} ms over {slices} event-loop slices")
+
+
+if __name__ == "__main__":
+    run()
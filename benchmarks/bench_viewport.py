@@ -0,0 +1,36 @@
+"""
+Count the canvas items materialized for a large diagram at several zoom levels.
+
+Run from the repository root:
+    python -m benchmarks.bench_viewport
+"""
+import time
+
+from benchmarks.fake_canvas import make_headless_app
+from benchmarks.synthetic import make_diagram
+from src.diagram import Diagram
+
+
+def run(num_classes=10000, zooms=(1.0, 0.5, 0.2, 0.1, 0.05)):
+    data = make_diagram(num_classes, associations_per_class=2)
+    app = make_headless_app(Diagram.from_dict(data))
+    print(f"{num_classes} classes, {len(app.diagram.edges)} associations, 900x600 window")
+    for zoom in zooms:
+        start = time.perf_counter()
+        app.set_zoom(zoom, 0, 0)
+        elapsed = time.perf_counter() - start
+        print(f"  zoom {zoom:<5} {app.viewport.detail():<8} {len(app.class_boxes):>6} boxes, "
+              f"{len(app.association_lines):>6} lines, {len(app.canvas.items):>7} canvas items "
+              f"({elapsed * 1000:.1f} ms)")
+
+    # Scroll one screen to the right at full zoom
+    app.set_zoom(1.0, 0, 0)
+    app.canvas.origin = (app.canvas.origin[0] + 900, app.canvas.origin[1])
+    start = time.perf_counter()
+    app.refresh_viewport()
+    elapsed = time.perf_counter() - start
+    print(f"  scroll one screen: {len(app.canvas.items)} canvas items ({elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,203 @@
+from collections import Counter
+
+
+class FakeEvent:
+    """Minimal stand-in for a Tk event."""
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class FakeRoot:
+    """Headless stand-in for tk.Tk that queues after/after_idle callbacks until run_pending."""
+
+    def __init__(self):
+        self.pending = {}
+        self._next_id = 1
+
+    def after(self, ms, func, *args):
+        after_id = f"after#{self._next_id}"
+        self._next_id += 1
+        self.pending[after_id] = (func, args)
+        return after_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self):
+        """Run the callbacks queued so far, in scheduling order."""
+        pending, self.pending = self.pending, {}
+        for func, args in pending.values():
+            func(*args)
+
+    def run_until_idle(self):
+        """Run queued callbacks, including the ones they schedule, until none are left."""
+        while self.pending:
+            self.run_pending()
+
+
+class FakeWidget:
+    """Headless stand-in for the Tk widgets UMLApp configures: labels, the progress bar and its frame."""
+
+    def __init__(self):
+        self.options = {}
+        self.manager = ""
+
+    def config(self, **options):
+        self.options.update(options)
+
+    def cget(self, option):
+        return self.options.get(option, "")
+
+    def pack(self, **options):
+        self.manager = "pack"
+
+    def pack_forget(self):
+        self.manager = ""
+
+    def winfo_manager(self):
+        return self.manager
+
+    def start(self, interval=None):
+        pass
+
+    def stop(self):
+        pass
+
+
+class RecordingCanvas:
+    """Headless stand-in for tk.Canvas that counts every call made on it."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.items = {}
+        self.tags = {}
+        self._next_id = 1
+        # Visible window size and the canvas coordinates of its top-left corner
+        self.width, self.height = 900, 600
+        self.origin = (0, 0)
+        self.scrollregion = (0, 0, 0, 0)
+
+    def _create(self, kind, coords, options):
+        self.calls[f"create_{kind}"] += 1
+        item = self._next_id
+        self._next_id += 1
+        self.items[item] = [kind, list(coords), dict(options)]
+        for tag in options.get("tags", ()):
+            self.tags.setdefault(tag, set()).add(item)
+        return item
+
+    def _resolve(self, tag_or_id):
+        """Return the ids of the items matching an item id or tag."""
+        if tag_or_id == "all":
+            return list(self.items)
+        if tag_or_id in self.tags:
+            return list(self.tags[tag_or_id])
+        return [tag_or_id] if tag_or_id in self.items else []
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create("polygon", coords, options)
+
+    def coords(self, item, *coords):
+        self.calls["coords"] += 1
+        if item not in self.items:
+            return []
+        if coords:
+            self.items[item][1] = list(coords)
+        return list(self.items[item][1])
+
+    def itemconfig(self, item, **options):
+        self.calls["itemconfig"] += 1
+        if item in self.items:
+            self.items[item][2].update(options)
+
+    def move(self, tag_or_id, dx, dy):
+        self.calls["move"] += 1
+        for item in self._resolve(tag_or_id):
+            coords = self.items[item][1]
+            self.items[item][1] = [c + (dy if i % 2 else dx) for i, c in enumerate(coords)]
+
+    def delete(self, tag_or_id):
+        self.calls["delete"] += 1
+        for item in self._resolve(tag_or_id):
+            _, _, options = self.items.pop(item)
+            for tag in options.get("tags", ()):
+                self.tags[tag].discard(item)
+
+    def tag_bind(self, item, sequence, func):
+        self.calls["tag_bind"] += 1
+
+    def bind(self, sequence, func):
+        self.calls["bind"] += 1
+
+    def canvasx(self, x):
+        return x + self.origin[0]
+
+    def canvasy(self, y):
+        return y + self.origin[1]
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def configure(self, **options):
+        self.calls["configure"] += 1
+        self.scrollregion = options.get("scrollregion", self.scrollregion)
+
+    def xview_moveto(self, fraction):
+        region = self.scrollregion
+        self.origin = (region[0] + fraction * (region[2] - region[0]), self.origin[1])
+
+    def yview_moveto(self, fraction):
+        region = self.scrollregion
+        self.origin = (self.origin[0], region[1] + fraction * (region[3] - region[1]))
+
+    def find_closest(self, x, y):
+        self.calls["find_closest"] += 1
+        return (next(iter(self.items), 0),)
+
+    def total(self):
+        """Total number of canvas calls recorded so far."""
+        return sum(self.calls.values())
+
+    def reset(self):
+        """Forget the calls recorded so far."""
+        self.calls.clear()
+
+
+def make_headless_app(diagram=None, target_fps=60, journal_path=None):
+    """
+    Build a UMLApp drawing on a RecordingCanvas, without creating a Tk window.
+    Everything but the widgets is set up by the app itself.
+    :param diagram: Optional Diagram to show.
+    :param journal_path: Optional autosave journal; off by default.
+    """
+    from src.diagram.history import DEFAULT_MAX_BYTES
+    from src.gui.uml_app import UMLApp
+
+    app = UMLApp.__new__(UMLApp)
+    app.root = FakeRoot()
+    app.canvas = RecordingCanvas()
+    app.status = FakeWidget()
+    app.progress_frame = FakeWidget()
+    app.progress_label = FakeWidget()
+    app.progress_bar = FakeWidget()
+    app._setup_state(target_fps, codegen_cache_path=None, journal_path=journal_path, history_bytes=DEFAULT_MAX_BYTES)
+    if diagram is not None:
+        app.set_diagram(diagram)
+    return app
@@ -0,0 +1,287 @@
+"""
+Timed benchmark scenarios for the editor's hot paths.
+
+Each scenario takes the shared parameters, runs headless on synthetic
+diagrams and returns a flat dict of metrics. Times are in milliseconds
+(keys ending in "_ms"); everything else is a count.
+"""
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.fake_canvas import FakeEvent, make_headless_app
+from benchmarks.synthetic import make_diagram
+from src.diagram import Diagram, layout
+from src.diagram.journal import Journal
+from src.diagram.search import SearchIndex
+from src.diagram.svg import iter_svg, write_svg
+from src.diagram.validation import Validator, inheritance_order, validate_data
+from src.diagram.storage import load_diagram_file, save_diagram_file
+from src.models.code_generator import generate_code
+from src.models.languages import available_languages
+
+
+def timed(func, *args, **kwargs):
+    """Run func and return (result, elapsed milliseconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def scenario_data(params):
+    """Synthetic diagram dict for the shared scenario parameters."""
+    return make_diagram(
+        params["classes"], members=params["members"],
+        associations_per_class=params["associations_per_class"],
+        inheritance_depth=params["inheritance_depth"], seed=params["seed"]
+    )
+
+
+def bench_load(params):
+    """Read a JSON diagram file and build its views through the chunked loader."""
+    data = scenario_data(params)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "diagram.json")
+        with open(path, "w") as file:
+            json.dump(data, file)
+        loaded, read_ms = timed(load_diagram_file, path)
+
+    diagram, model_ms = timed(Diagram.from_dict, loaded)
+    app = make_headless_app()
+    _, views_ms = timed(lambda: (app.set_diagram(diagram, incremental=True), app.root.run_until_idle()))
+    return {
+        "read_ms": read_ms,
+        "model_ms": model_ms,
+        "views_ms": views_ms,
+        "boxes_materialized": len(app.class_boxes),
+        "lines_materialized": len(app.association_lines),
+        "canvas_items": len(app.canvas.items),
+    }
+
+
+def bench_codegen(params):
+    """Generate code for the whole diagram in every registered language."""
+    data = scenario_data(params)
+    results = {}
+    for language in available_languages():
+        code, elapsed = timed(generate_code, data, language)
+        results[f"{language}_ms"] = elapsed
+        results[f"{language}_bytes"] = len(code)
+    return results
+
+
+def bench_drag(params):
+    """Drag a box with drag_associations associations attached and count canvas calls per motion event."""
+    app = make_headless_app(Diagram.from_dict(scenario_data(params)))
+    names = list(app.diagram.classes)
+    for i in range(params["drag_associations"]):
+        app.diagram.add_edge("association", names[0], names[1 + i % (len(names) - 1)])
+    box = app.class_boxes[names[0]]
+
+    events = params["motion_events"]
+    app.drag_data.update(item=box, start_x=0, start_y=0)
+    app.canvas.reset()
+    start = time.perf_counter()
+    for step in range(1, events + 1):
+        app.on_drag(FakeEvent(step, step))
+        if step % 4 == 0:
+            app.root.run_pending()
+    app.on_release(FakeEvent(events, events))
+    app.root.run_until_idle()
+    elapsed = (time.perf_counter() - start) * 1000
+    return {
+        "incident_associations": len(app.diagram.incident(names[0])),
+        "total_ms": elapsed,
+        "per_event_ms": elapsed / events,
+        "canvas_calls_per_event": app.canvas.total() / events,
+    }
+
+
+def bench_save(params):
+    """Serialize the model and write it as JSON and as binary (.umlb)."""
+    diagram = Diagram.from_dict(scenario_data(params))
+    data, to_dict_ms = timed(diagram.to_dict)
+    results = {"to_dict_ms": to_dict_ms}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for extension in (".json", ".umlb"):
+            path = os.path.join(tmp_dir, "diagram" + extension)
+            _, elapsed = timed(save_diagram_file, data, path)
+            key = extension.lstrip(".")
+            results[f"{key}_ms"] = elapsed
+            results[f"{key}_bytes"] = os.path.getsize(path)
+    return results
+
+
+def bench_delete(params):
+    """Delete the most connected class of a shown diagram, removing its box and lines."""
+    app = make_headless_app(Diagram.from_dict(scenario_data(params)))
+    name = max(app.class_boxes, key=lambda visible: len(app.diagram.incident(visible)))
+    incident = len(app.diagram.incident(name))
+    app.canvas.reset()
+    _, elapsed = timed(app.diagram.remove_class, name)
+    return {
+        "incident_associations": incident,
+        "delete_ms": elapsed,
+        "canvas_calls": app.canvas.total(),
+    }
+
+
+def bench_journal(params):
+    """Cost of journaling one edit against saving the whole diagram after it."""
+    diagram = Diagram.from_dict(scenario_data(params))
+    name = next(iter(diagram.classes))
+    edits = params["motion_events"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        journal = Journal(os.path.join(tmp_dir, "journal.jsonl"))
+        # attach blocks for the copy of the diagram; the snapshot is written on a thread
+        _, attach_ms = timed(journal.attach, diagram)
+        _, snapshot_ms = timed(journal.wait)
+        start = time.perf_counter()
+        for i in range(edits):
+            diagram.set_members(name, [f"attr{i}"], [])
+        journal.flush()
+        per_edit_ms = (time.perf_counter() - start) * 1000 / edits
+        journal.close()
+        _, full_save_ms = timed(save_diagram_file, diagram.to_dict(), os.path.join(tmp_dir, "diagram.json"))
+    return {
+        "attach_ms": attach_ms,
+        "snapshot_write_ms": snapshot_ms,
+        "journaled_edit_ms": per_edit_ms,
+        "full_save_ms": full_save_ms,
+    }
+
+
+def bench_undo(params):
+    """Undo and redo deleting the most connected class of a shown diagram."""
+    app = make_headless_app(Diagram.from_dict(scenario_data(params)))
+    name = max(app.class_boxes, key=lambda visible: len(app.diagram.incident(visible)))
+    with app.history.step():
+        app.diagram.remove_class(name)
+    rounds = params["motion_events"]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        app.undo()
+        app.redo()
+    elapsed = (time.perf_counter() - start) * 1000
+    return {
+        "undo_redo_ms": elapsed / rounds,
+        "history_bytes": app.history.size,
+    }
+
+
+def bench_background(params):
+    """Longest drag event while code generation runs on a worker thread, against blocking generation."""
+    from src.gui.background import generate_code_task
+
+    data = scenario_data(params)
+    app = make_headless_app(Diagram.from_dict(data))
+    _, blocking_ms = timed(generate_code, data, "python")
+
+    results = []
+    app.background.submit("codegen", "Generating", generate_code_task, data, "python", None, on_done=results.append)
+    box = next(iter(app.class_boxes.values()))
+    app.drag_data.update(item=box, start_x=0, start_y=0)
+    latencies = []
+    step = 0
+    while not results:
+        step += 1
+        _, elapsed = timed(app.on_drag, FakeEvent(step, step))
+        latencies.append(elapsed)
+        app.root.run_pending()
+    app.on_release(FakeEvent(step, step))
+    return {
+        "blocking_codegen_ms": blocking_ms,
+        "drag_events_during_codegen": len(latencies),
+        "max_drag_event_ms": max(latencies),
+    }
+
+
+def bench_search(params):
+    """Build the search index, query it exactly, by prefix and fuzzily, and re-index one edited class."""
+    diagram = Diagram.from_dict(scenario_data(params))
+    index = SearchIndex()
+    index.attach(diagram)
+    _, build_ms = timed(index.build)
+    name = next(reversed(diagram.classes))
+    queries = {"exact": name, "prefix": name[:-1], "fuzzy": name[:2] + name[3:], "member": "attr0"}
+    results = {"build_ms": build_ms, "tokens": len(index.tokens)}
+    for kind, query in queries.items():
+        found, results[f"{kind}_query_ms"] = timed(index.search, query)
+        results[f"{kind}_results"] = len(found)
+    node = diagram.classes[name]
+    _, results["reindex_ms"] = timed(diagram.set_members, name, node.attributes + ["renamed"], node.methods)
+    return results
+
+
+def bench_validate(params):
+    """Validate a whole diagram, re-validate after single inheritance edits, and order it for codegen."""
+    data = scenario_data(params)
+    diagram = Diagram.from_dict(data)
+    validator = Validator()
+    _, attach_ms = timed(validator.attach, diagram)
+    _, data_ms = timed(validate_data, data)
+    classes = {cls["name"]: cls for cls in data["classes"]}
+    _, order_ms = timed(inheritance_order, classes, data["associations"])
+
+    names = list(diagram.classes)
+    edits = params["motion_events"]
+    start = time.perf_counter()
+    for i in range(edits):
+        # Each added edge searches the new parent's ancestors for a cycle
+        edge = diagram.add_edge("inheritance", names[-1 - i], names[i])
+        diagram.remove_edge(edge)
+    edit_ms = (time.perf_counter() - start) * 1000 / (2 * edits)
+    return {
+        "attach_ms": attach_ms,
+        "validate_data_ms": data_ms,
+        "inheritance_order_ms": order_ms,
+        "edit_ms": edit_ms,
+        "problems": validator.problem_count(),
+    }
+
+
+def bench_render(params):
+    """Render the whole diagram to SVG in memory and to a file."""
+    diagram = Diagram.from_dict(scenario_data(params))
+    svg_text, memory_ms = timed(lambda: "".join(iter_svg(diagram)))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _, file_ms = timed(write_svg, diagram, os.path.join(tmp_dir, "diagram.svg"))
+    return {"render_ms": memory_ms, "write_ms": file_ms, "svg_bytes": len(svg_text.encode("utf-8"))}
+
+
+def bench_layout(params):
+    """Compute the layered and force-directed layouts of the whole diagram."""
+    if layout.np is None:
+        return {"skipped": "numpy is not installed"}
+    diagram = Diagram.from_dict(scenario_data(params))
+    results = {}
+    for method in layout.LAYOUT_METHODS:
+        _, results[f"{method}_ms"] = timed(layout.auto_layout, diagram, method)
+    return results
+
+
+SCENARIOS = {
+    "load": bench_load,
+    "codegen": bench_codegen,
+    "drag": bench_drag,
+    "save": bench_save,
+    "delete": bench_delete,
+    "layout": bench_layout,
+    "journal": bench_journal,
+    "undo": bench_undo,
+    "background": bench_background,
+    "search": bench_search,
+    "validate": bench_validate,
+    "render": bench_render,
+}
+
+DEFAULT_PARAMS = {
+    "classes": 2000,
+    "members": 4,
+    "associations_per_class": 2,
+    "inheritance_depth": 3,
+    "seed": 0,
+    "drag_associations": 100,
+    "motion_events": 100,
+}
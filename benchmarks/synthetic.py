@@ -0,0 +1,46 @@
+import random
+
+
+def make_diagram(num_classes, members=3, associations_per_class=4, inheritance_depth=0, seed=0):
+    """
+    Build a synthetic diagram dict in the schema used by save_diagram/load_diagram,
+    with the classes laid out on a square grid.
+    :param num_classes: Number of classes to generate.
+    :param members: Number of attributes and methods per class.
+    :param associations_per_class: Average number of associations per class.
+    :param inheritance_depth: When non-zero, the classes are split into this many
+                              levels below a root level, every class below the root
+                              inherits from one class of the level above, and the
+                              random associations use the other association types.
+    :param seed: Seed for the random generator, so runs are reproducible.
+    """
+    rng = random.Random(seed)
+    columns = max(1, int(num_classes ** 0.5))
+    names = [f"Class{i}" for i in range(num_classes)]
+    classes = [
+        {
+            "name": name,
+            "attributes": [f"attr{j}" for j in range(members)],
+            "methods": [f"method{j}" for j in range(members)],
+            "position": [
+                (i % columns) * 250.0, (i // columns) * 200.0, (i % columns) * 250.0 + 200.0, (i // columns) * 200.0 + 120.0
+            ]
+        } for i, name in enumerate(names)
+    ]
+    types = ["inheritance", "composition", "aggregation", "association", "dependency"]
+    hierarchy = []
+    if inheritance_depth:
+        types = types[1:]
+        levels = [names[level::inheritance_depth + 1] for level in range(inheritance_depth + 1)]
+        for parents, children in zip(levels, levels[1:]):
+            hierarchy.extend(
+                {"type": "inheritance", "from": rng.choice(parents), "to": child} for child in children
+            )
+    associations = hierarchy + [
+        {
+            "type": rng.choice(types),
+            "from": rng.choice(names),
+            "to": rng.choice(names)
+        } for _ in range(num_classes * associations_per_class)
+    ]
+    return {"classes": classes, "associations": associations}
@@ -1,10 +1,10 @@
 import tkinter as tk
-from src.gui.uml_app import UMLApp
+from src.gui.uml_app import DEFAULT_CODEGEN_CACHE_PATH, UMLApp
 
 def main():
     """Main entry point for the UML Diagram Editor."""
     root = tk.Tk()
-    app = UMLApp(root)
+    app = UMLApp(root, codegen_cache_path=DEFAULT_CODEGEN_CACHE_PATH)
     root.mainloop()
 
 if __name__ == "__main__":
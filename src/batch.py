@@ -0,0 +1,191 @@
+"""
+Headless batch code generation for many diagram files.
+
+Never imports tkinter, so it runs on CI machines without a display:
+
+    python -m src.batch "diagrams/**/*.json" -l python -l java -o generated
+    python -m src.batch a.json b.umlb --language php --output-dir out --per-class --jobs 8
+
+For every input file and language the generated code is written to
+<output-dir>/<language>/<path relative to the inputs' common directory>,
+either as one file (the diagram name plus the language's extension) or,
+with --per-class, as a directory of one file per class. Files are spread
+over a process pool, and outputs whose content did not change are not
+rewritten.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .diagram.storage import load_diagram_file
+from .models.code_generator import generate_code, iter_class_fragments
+from .models.exporter import class_files, write_if_changed
+from .models.languages import available_languages, get_backend
+
+
+def expand_inputs(patterns):
+    """Resolve file names and glob patterns (with ** for recursion) to a sorted list of unique paths."""
+    paths = set()
+    missing = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        matches = [path for path in matches if os.path.isfile(path)]
+        if not matches:
+            missing.append(pattern)
+        paths.update(os.path.normpath(path) for path in matches)
+    return sorted(paths), missing
+
+
+def output_stem(path, common_dir):
+    """Input path relative to the inputs' common directory, without its extension."""
+    return os.path.splitext(os.path.relpath(path, common_dir))[0]
+
+
+def run_file(worker, path, stem):
+    """
+    Run worker(path, stem, result) for one file, timing it and catching its error. Runs in a worker process.
+    :return: The result dict: the path, what the worker filled in, elapsed seconds and an error message or None.
+    """
+    start = time.perf_counter()
+    result = {"path": path, "error": None}
+    try:
+        worker(path, stem, result)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_pool(paths, worker, jobs=None):
+    """
+    Run worker(path, stem, result) for every path, over a process pool when jobs > 1.
+    The stem is the path relative to the inputs' common directory, without its extension;
+    the worker records its outcome in the result dict, and its exceptions fail only that file.
+    :param worker: Picklable callable, e.g. a functools.partial of a module-level function.
+    :param jobs: Worker processes; defaults to the number of CPUs.
+    :return: (list of per-file result dicts in input order, wall-clock seconds)
+    """
+    start = time.perf_counter()
+    if not paths:
+        return [], 0.0
+    common_dir = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    stems = [output_stem(os.path.abspath(path), common_dir) for path in paths]
+    count = len(paths)
+    arguments = ([worker] * count, paths, stems)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and count > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(run_file, *arguments, chunksize=max(1, count // (4 * jobs))))
+    else:
+        results = list(map(run_file, *arguments))
+    return results, time.perf_counter() - start
+
+
+def print_results(results, quiet=False, describe=None):
+    """
+    Print the error of every failed file to stderr and, unless quiet, the time of every other one.
+    :param describe: Optional callable(result) returning text printed between the time and the path.
+    :return: Number of failed files.
+    """
+    failed = 0
+    for result in results:
+        if result["error"]:
+            failed += 1
+            print(f"error: {result['path']}: {result['error']}", file=sys.stderr)
+        elif not quiet:
+            detail = f"{describe(result)}  " if describe is not None else ""
+            print(f"{result['seconds'] * 1000:9.1f} ms  {detail}{result['path']}")
+    return failed
+
+
+def generate_file(path, stem, result, languages, output_dir, per_class=False):
+    """
+    Generate code for one diagram file in every language; a run_pool worker.
+    Records the class count and the numbers of written and unchanged output files in result.
+    """
+    result.update(classes=0, written=0, unchanged=0)
+    data = load_diagram_file(path)
+    result["classes"] = len(data.get("classes", []))
+    for language in languages:
+        backend = get_backend(language)
+        target = os.path.join(output_dir, language, stem)
+        if per_class:
+            os.makedirs(target, exist_ok=True)
+            files = class_files(backend, iter_class_fragments(data, language), target)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            files = [(target + backend.extension, backend.file_prologue + generate_code(data, language))]
+        for file_path, code in files:
+            written = write_if_changed(file_path, code.encode("utf-8"))
+            result["written" if written else "unchanged"] += 1
+
+
+def run_batch(paths, languages, output_dir, per_class=False, jobs=None):
+    """
+    Generate code for every path and language, over a process pool when jobs > 1.
+    :param jobs: Worker processes; defaults to the number of CPUs.
+    :return: (list of per-file result dicts in input order, wall-clock seconds)
+    """
+    worker = partial(generate_file, languages=languages, output_dir=output_dir, per_class=per_class)
+    return run_pool(paths, worker, jobs)
+
+
+def summarize(results, elapsed):
+    """Totals and throughput of a batch run."""
+    classes = sum(result["classes"] for result in results)
+    return {
+        "files": len(results),
+        "failed": sum(1 for result in results if result["error"]),
+        "classes": classes,
+        "written": sum(result["written"] for result in results),
+        "unchanged": sum(result["unchanged"] for result in results),
+        "seconds": elapsed,
+        "files_per_second": len(results) / elapsed if elapsed else 0.0,
+        "classes_per_second": classes / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch", description="Generate code for many UML diagram files without a display."
+    )
+    parser.add_argument("inputs", nargs="+", help="Diagram files (.json or .umlb) or glob patterns.")
+    parser.add_argument("-l", "--language", action="append", dest="languages", choices=available_languages(),
+                        help="Target language; repeat for several (default: all).")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("--per-class", action="store_true", help="Write one file per class.")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: number of CPUs).")
+    parser.add_argument("--report", help="Also write the per-file results and totals to this JSON file.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the totals and errors.")
+    args = parser.parse_args(argv)
+
+    paths, missing = expand_inputs(args.inputs)
+    for pattern in missing:
+        print(f"warning: no diagram files match {pattern}", file=sys.stderr)
+    languages = args.languages or available_languages()
+
+    results, elapsed = run_batch(paths, languages, args.output_dir, args.per_class, args.jobs)
+    print_results(results, args.quiet, lambda result: f"{result['classes']:7} classes")
+
+    totals = summarize(results, elapsed)
+    print(
+        f"{totals['files']} files ({totals['failed']} failed), {totals['classes']} classes, "
+        f"{len(languages)} languages in {elapsed:.2f} s: {totals['files_per_second']:.1f} files/s, "
+        f"{totals['classes_per_second']:.0f} classes/s; {totals['written']} outputs written, "
+        f"{totals['unchanged']} unchanged"
+    )
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump({"languages": languages, "totals": totals, "files": results}, file, indent=4)
+    return 1 if totals["failed"] or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
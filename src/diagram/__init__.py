@@ -0,0 +1,4 @@
+"""
+Headless Diagram Model Package for UML Diagram Editor
+"""
+from .model import ASSOCIATION_TYPES, ClassNode, Diagram, Edge
@@ -0,0 +1,269 @@
+"""
+Compact binary diagram format (.umlb).
+
+Layout, all integers little-endian:
+
+    header    magic b"UMLB", version u16, reserved u16, then one
+              (offset u64, size u64, count u32, reserved u32) entry per section
+    strings   (count + 1) u32 offsets into the UTF-8 blob that follows them
+    classes   fixed-width records: name, first attribute, attribute count,
+              first method, method count, flags (u32 each) and x1, y1, x2, y2 (f64)
+    members   u32 string indexes referenced by the class records
+    links     type string, from, to (u32 each); from/to are class indexes, or
+              string indexes with the top bit set for endpoints that are not classes
+
+Every name and member is stored once in the string table. The header lets
+BinaryDiagram memory-map a file and decode only the sections and records that
+are accessed.
+
+A position is four numbers. Each coordinate that is an integer sets a flag
+bit and is read back as an int, so JSON -> binary -> JSON round trips keep
+100 and 100.0 apart. Integers beyond 2**53 do not fit the f64 fields and are
+rejected.
+"""
+import argparse
+import json
+import mmap
+import struct
+
+MAGIC = b"UMLB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<QQII")
+_CLASS = struct.Struct("<6I4d")
+_LINK = struct.Struct("<3I")
+_U32 = struct.Struct("<I")
+
+STRINGS, CLASSES, MEMBERS, LINKS = range(4)
+SECTION_COUNT = 4
+HEADER_SIZE = _HEADER.size + SECTION_COUNT * _SECTION.size
+
+HAS_POSITION = 1
+# Flag of the first position coordinate stored as an integer; the others follow in the next bits
+INT_COORDINATE = 2
+NAME_ENDPOINT = 0x80000000
+# Largest integer an f64 holds exactly
+MAX_EXACT_INT = 2 ** 53
+
+
+def position_flags(name, position):
+    """Flags of a class's position, checking that it is four numbers the format can store."""
+    if not isinstance(position, (list, tuple)) or len(position) != 4:
+        raise ValueError(f"Class '{name}' has an invalid position {position!r}; expected four numbers.")
+    flags = HAS_POSITION
+    for i, value in enumerate(position):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Class '{name}' has a non-numeric position coordinate {value!r}.")
+        if isinstance(value, int):
+            if abs(value) > MAX_EXACT_INT:
+                raise ValueError(f"Class '{name}' has a position coordinate too large to store: {value}.")
+            flags |= INT_COORDINATE << i
+    return flags
+
+
+def decode_position(flags, values):
+    return [int(value) if flags & (INT_COORDINATE << i) else value for i, value in enumerate(values)]
+
+
+def encode(data):
+    """Encode a diagram dict into the binary format."""
+    strings = {}
+
+    def intern(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    class_index = {}
+    members = []
+    class_records = []
+    for cls in data.get("classes", []):
+        class_index.setdefault(cls["name"], len(class_records))
+        attributes = cls.get("attributes", [])
+        methods = cls.get("methods", [])
+        attr_start = len(members)
+        members.extend(intern(attr) for attr in attributes)
+        method_start = len(members)
+        members.extend(intern(method) for method in methods)
+        position = cls.get("position")
+        flags = position_flags(cls["name"], position) if position else 0
+        class_records.append(_CLASS.pack(
+            intern(cls["name"]), attr_start, len(attributes), method_start, len(methods), flags,
+            *(position if position else (0.0, 0.0, 0.0, 0.0))
+        ))
+
+    def endpoint(name):
+        index = class_index.get(name)
+        return index if index is not None else intern(name) | NAME_ENDPOINT
+
+    link_records = [
+        _LINK.pack(intern(assoc["type"]), endpoint(assoc["from"]), endpoint(assoc["to"]))
+        for assoc in data.get("associations", [])
+    ]
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    sections = [
+        (struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded), len(encoded)),
+        (b"".join(class_records), len(class_records)),
+        (struct.pack(f"<{len(members)}I", *members), len(members)),
+        (b"".join(link_records), len(link_records)),
+    ]
+
+    header = [_HEADER.pack(MAGIC, VERSION, 0)]
+    offset = HEADER_SIZE
+    for payload, count in sections:
+        header.append(_SECTION.pack(offset, len(payload), count, 0))
+        offset += len(payload)
+    return b"".join(header + [payload for payload, _ in sections])
+
+
+def write_binary(data, file_path):
+    """Write a diagram dict to a binary diagram file."""
+    with open(file_path, "wb") as file:
+        file.write(encode(data))
+
+
+def read_binary(file_path):
+    """Read a binary diagram file into a diagram dict."""
+    with BinaryDiagram(file_path) as diagram:
+        return diagram.to_dict()
+
+
+class BinaryDiagram:
+    """Lazy, memory-mapped view of a binary diagram file."""
+
+    def __init__(self, file_path):
+        with open(file_path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, _ = _HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{file_path} is not a binary UML diagram.")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported binary diagram version {version}.")
+        self._sections = [
+            _SECTION.unpack_from(self._view, _HEADER.size + i * _SECTION.size)[:3]
+            for i in range(SECTION_COUNT)
+        ]
+        self._string_cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._map = None
+
+    @property
+    def class_count(self):
+        return self._sections[CLASSES][2]
+
+    @property
+    def association_count(self):
+        return self._sections[LINKS][2]
+
+    def string(self, index):
+        """Decode one entry of the string table."""
+        value = self._string_cache.get(index)
+        if value is None:
+            offset, _, count = self._sections[STRINGS]
+            start, end = struct.unpack_from("<2I", self._view, offset + 4 * index)
+            blob = offset + 4 * (count + 1)
+            value = self._string_cache[index] = str(self._view[blob + start:blob + end], "utf-8")
+        return value
+
+    def strings(self):
+        """Decode the whole string table at once."""
+        offset, _, count = self._sections[STRINGS]
+        offsets = struct.unpack_from(f"<{count + 1}I", self._view, offset)
+        blob = bytes(self._view[offset + 4 * (count + 1):offset + 4 * (count + 1) + offsets[-1]])
+        text = blob.decode("utf-8")
+        if len(text) != len(blob):
+            return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+        # Pure ASCII: byte offsets are character offsets, so slice the decoded text directly
+        return [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+
+    def class_record(self, index):
+        """Decode the class at the given index into a class dict."""
+        offset = self._sections[CLASSES][0] + index * _CLASS.size
+        record = _CLASS.unpack_from(self._view, offset)
+        members_offset = self._sections[MEMBERS][0]
+        name, attr_start, attr_count, method_start, method_count, flags = record[:6]
+        attributes = struct.unpack_from(f"<{attr_count}I", self._view, members_offset + 4 * attr_start)
+        methods = struct.unpack_from(f"<{method_count}I", self._view, members_offset + 4 * method_start)
+        cls = {
+            "name": self.string(name),
+            "attributes": [self.string(i) for i in attributes],
+            "methods": [self.string(i) for i in methods]
+        }
+        if flags & HAS_POSITION:
+            cls["position"] = decode_position(flags, record[6:])
+        return cls
+
+    def class_name(self, index):
+        offset = self._sections[CLASSES][0] + index * _CLASS.size
+        return self.string(_U32.unpack_from(self._view, offset)[0])
+
+    def to_dict(self):
+        """Decode the whole file into a diagram dict, section by section."""
+        strings = self.strings()
+        offset, size, count = self._sections[MEMBERS]
+        members = struct.unpack_from(f"<{count}I", self._view, offset)
+
+        lookup = strings.__getitem__
+        classes = []
+        offset, size, _ = self._sections[CLASSES]
+        for record in _CLASS.iter_unpack(self._view[offset:offset + size]):
+            name, attr_start, attr_count, method_start, method_count, flags = record[:6]
+            cls = {
+                "name": strings[name],
+                "attributes": list(map(lookup, members[attr_start:attr_start + attr_count])),
+                "methods": list(map(lookup, members[method_start:method_start + method_count]))
+            }
+            if flags & HAS_POSITION:
+                cls["position"] = decode_position(flags, record[6:])
+            classes.append(cls)
+
+        def endpoint(value):
+            if value & NAME_ENDPOINT:
+                return strings[value & ~NAME_ENDPOINT]
+            return classes[value]["name"]
+
+        offset, size, _ = self._sections[LINKS]
+        associations = [
+            {"type": strings[kind], "from": endpoint(source), "to": endpoint(target)}
+            for kind, source, target in _LINK.iter_unpack(self._view[offset:offset + size])
+        ]
+        return {"classes": classes, "associations": associations}
+
+
+def main(argv=None):
+    """Convert diagrams between JSON and the binary format."""
+    parser = argparse.ArgumentParser(description="Convert UML diagrams between JSON and binary (.umlb).")
+    parser.add_argument("direction", choices=["to-binary", "to-json"])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args(argv)
+
+    if args.direction == "to-binary":
+        with open(args.source, "r") as file:
+            write_binary(json.load(file), args.target)
+    else:
+        with open(args.target, "w") as file:
+            json.dump(read_binary(args.source), file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Geometry and styling of class boxes and association lines, in diagram units.
+
+Shared by the Tk canvas views (ClassBox, AssociationLine) and the headless
+SVG renderer, so both draw the same picture. Boxes are anything exposing x,
+y, width and height, such as a ClassNode or a ClassBox.
+"""
+BOX_WIDTH = 200
+MIN_BOX_HEIGHT = 120
+HEADER_HEIGHT = 30
+LINE_HEIGHT = 15
+# Offsets of the class name's centre and of the member text lines inside a box
+NAME_OFFSET = 15
+MEMBER_INDENT = 10
+ATTRIBUTES_OFFSET = 35
+METHODS_GAP = 5
+NAME_FONT_SIZE = 12
+MEMBER_FONT_SIZE = 10
+
+BOX_FILL = "#f0f8ff"
+HEADER_FILL = "#87cefa"
+DEPENDENCY_DASH = (6, 2)
+
+INHERITANCE_ARROW_SIZE = 12
+ASSOCIATION_ARROW_SIZE = 10
+DIAMOND_SIZE = 10
+
+
+def box_height(attributes, methods):
+    """Height of a class box showing the given attributes and methods."""
+    return max(MIN_BOX_HEIGHT, 45 + LINE_HEIGHT * (len(attributes) + len(methods)))
+
+
+def methods_top(y, attributes):
+    """Y coordinate of the first method line of a box at y."""
+    return y + ATTRIBUTES_OFFSET + LINE_HEIGHT * len(attributes) + METHODS_GAP
+
+
+def method_text(method):
+    return f"{method}()"
+
+
+def closest_edge(box_from, box_to):
+    """Point on the border of box_from facing the centre of box_to."""
+    x_center = box_from.x + box_from.width / 2
+    y_center = box_from.y + box_from.height / 2
+
+    to_x = box_to.x + box_to.width / 2
+    to_y = box_to.y + box_to.height / 2
+
+    dx = to_x - x_center
+    dy = to_y - y_center
+
+    if abs(dx) > abs(dy):
+        if dx > 0:
+            return box_from.x + box_from.width, y_center
+        else:
+            return box_from.x, y_center
+    else:
+        if dy > 0:
+            return x_center, box_from.y + box_from.height
+        else:
+            return x_center, box_from.y
+
+
+def line_endpoints(box1, box2):
+    """(x1, y1, x2, y2) of a line from box1 to box2, between the facing borders."""
+    x1, y1 = closest_edge(box1, box2)
+    x2, y2 = closest_edge(box2, box1)
+    return x1, y1, x2, y2
+
+
+def inheritance_arrow_points(x, y, udx, udy, zoom=1.0):
+    """Points of a hollow triangle for inheritance."""
+    size = INHERITANCE_ARROW_SIZE * zoom
+    return [
+        x, y,
+        x - size * udx + size * udy, y - size * udy - size * udx,
+        x - size * udx - size * udy, y - size * udy + size * udx
+    ]
+
+
+def association_arrow_points(x, y, udx, udy, zoom=1.0):
+    """Points of a simple arrow for association."""
+    size = ASSOCIATION_ARROW_SIZE * zoom
+    return [
+        x, y,
+        x - size * udx + size/2 * udy, y - size * udy - size/2 * udx,
+        x - size * udx - size/2 * udy, y - size * udy + size/2 * udx
+    ]
+
+
+def diamond_points(x, y, udx, udy, zoom=1.0):
+    """Points of a diamond for aggregation/composition."""
+    size = DIAMOND_SIZE * zoom
+    return [
+        x, y,
+        x - size * udx + size * udy, y - size * udy - size * udx,
+        x - 2 * size * udx, y - 2 * size * udy,
+        x - size * udx - size * udy, y - size * udy + size * udx
+    ]
+
+
+def arrow_points(line_type, x, y, udx, udy, zoom=1.0):
+    """
+    Flat coordinate list of the arrow or symbol at the end (x, y) of a line with unit
+    direction (udx, udy), or None if the relationship type has none.
+    """
+    if line_type == "inheritance":
+        return inheritance_arrow_points(x, y, udx, udy, zoom)
+    elif line_type in {"composition", "aggregation"}:
+        return diamond_points(x, y, udx, udy, zoom)
+    elif line_type == "association":
+        return association_arrow_points(x, y, udx, udy, zoom)
+    return None
+
+
+def unit_direction(x1, y1, x2, y2):
+    """Unit vector from (x1, y1) to (x2, y2), or None when the points coincide."""
+    dx = x2 - x1
+    dy = y2 - y1
+    length = (dx * dx + dy * dy) ** 0.5
+    if length == 0:
+        return None
+    return dx / length, dy / length
@@ -0,0 +1,182 @@
+"""
+Undo/redo history of diagram edits, stored as deltas.
+
+History listens to a Diagram and records every mutation as a small delta
+holding what is needed to revert and re-apply it: the removed ClassNode or
+Edge object, the old and new member lists, or a move offset. Undoing or
+redoing a step touches only the objects in that step, so it takes the same
+time however large the diagram is.
+
+Mutations made inside `with history.step():` form one undo step, e.g. a
+class deleted together with its associations. Consecutive moves of the same
+class are merged into one step until seal() is called, so a whole drag
+undoes at once. The history is bounded by an estimate of its memory use,
+and the oldest steps are dropped first.
+"""
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# Rough per-object costs used to estimate the memory held by a step
+DELTA_BYTES = 100
+MEMBER_BYTES = 50
+
+
+def members_cost(*member_lists):
+    return sum(MEMBER_BYTES + len(member) for members in member_lists for member in members)
+
+
+def delta_cost(delta):
+    """Approximate memory held by one delta, in bytes."""
+    kind = delta[0]
+    if kind in ("add_class", "remove_class"):
+        node = delta[1]
+        return 2 * DELTA_BYTES + len(node.name) + members_cost(node.attributes, node.methods)
+    if kind == "set_members":
+        return DELTA_BYTES + members_cost(*delta[2:])
+    return DELTA_BYTES
+
+
+class History:
+    """Bounded undo and redo stacks of delta steps for one Diagram at a time."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize an empty history; call attach() to start recording a diagram.
+        :param max_bytes: Memory budget; the oldest undo steps are dropped beyond it.
+        """
+        self.max_bytes = max_bytes
+        self.diagram = None
+        # Steps are [cost, deltas], oldest first
+        self.undo_steps = deque()
+        self.redo_steps = []
+        self.size = 0
+        self.group = None
+        self.applying = False
+        self.sealed = True
+
+    def attach(self, diagram):
+        """Start recording a diagram, forgetting the steps of the previous one."""
+        if self.diagram is not None:
+            self.diagram.unsubscribe(self.on_model_change)
+        self.diagram = diagram
+        diagram.subscribe(self.on_model_change)
+        self.clear()
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.size = 0
+        self.sealed = True
+
+    def can_undo(self):
+        return bool(self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    @contextmanager
+    def step(self):
+        """Group the mutations made inside the block into one undo step."""
+        if self.group is not None:
+            yield
+            return
+        self.group = []
+        try:
+            yield
+        finally:
+            deltas, self.group = self.group, None
+            if deltas:
+                self.push(deltas)
+            self.sealed = True
+
+    def seal(self):
+        """End move coalescing, so the next move starts a new step (e.g. on mouse release)."""
+        self.sealed = True
+
+    def on_model_change(self, event, *args):
+        """Diagram listener recording the delta of every mutation."""
+        if self.applying:
+            return
+        if event == "move_class":
+            node, dx, dy = args
+            delta = ["move_class", node.name, dx, dy]
+        elif event == "set_members":
+            node, old_attributes, old_methods = args
+            delta = ("set_members", node.name, old_attributes, old_methods, node.attributes, node.methods)
+        else:
+            delta = (event, args[0])
+
+        if self.group is not None:
+            self.group.append(delta)
+            return
+        if event == "move_class" and not self.sealed:
+            last = self.undo_steps[-1][1] if self.undo_steps else None
+            if last is not None and len(last) == 1 and last[0][0] == "move_class" and last[0][1] == delta[1]:
+                last[0][2] += delta[2]
+                last[0][3] += delta[3]
+                return
+        self.push([delta])
+        self.sealed = event != "move_class"
+
+    def push(self, deltas):
+        """Add a new step; it invalidates the redo stack."""
+        self.size -= sum(cost for cost, _ in self.redo_steps)
+        self.redo_steps.clear()
+        cost = sum(map(delta_cost, deltas))
+        self.undo_steps.append([cost, deltas])
+        self.size += cost
+        self.evict()
+
+    def evict(self):
+        while self.size > self.max_bytes and len(self.undo_steps) > 1:
+            cost, _ = self.undo_steps.popleft()
+            self.size -= cost
+
+    def undo(self):
+        """Revert the last step; returns False when there is nothing to undo."""
+        if not self.undo_steps:
+            return False
+        step = self.undo_steps.pop()
+        self.apply(reversed(step[1]), forward=False)
+        self.redo_steps.append(step)
+        self.sealed = True
+        return True
+
+    def redo(self):
+        """Re-apply the last undone step; returns False when there is nothing to redo."""
+        if not self.redo_steps:
+            return False
+        step = self.redo_steps.pop()
+        self.apply(step[1], forward=True)
+        self.undo_steps.append(step)
+        self.sealed = True
+        return True
+
+    def apply(self, deltas, forward):
+        """Apply deltas to the diagram (forward for redo, inverted for undo) without recording them."""
+        diagram = self.diagram
+        self.applying = True
+        try:
+            for delta in deltas:
+                kind = delta[0]
+                if kind == "move_class":
+                    sign = 1 if forward else -1
+                    diagram.move_class(delta[1], sign * delta[2], sign * delta[3])
+                elif kind == "set_members":
+                    _, name, old_attributes, old_methods, new_attributes, new_methods = delta
+                    if forward:
+                        diagram.set_members(name, new_attributes, new_methods)
+                    else:
+                        diagram.set_members(name, old_attributes, old_methods)
+                elif kind.startswith("add") == forward:
+                    if kind.endswith("class"):
+                        diagram.add_class(delta[1])
+                    else:
+                        diagram.restore_edge(delta[1])
+                elif kind.endswith("class"):
+                    diagram.remove_class(delta[1].name)
+                else:
+                    diagram.remove_edge(delta[1])
+        finally:
+            self.applying = False
@@ -0,0 +1,455 @@
+"""
+Append-only journal of diagram edits, for autosave and crash recovery.
+
+A Journal listens to a Diagram and appends one compact JSON line per
+mutation, so autosaving costs the size of the edit rather than the size of
+the diagram. Consecutive moves of the same class are merged before they are
+written. Every compact_every records the journal is compacted: the whole
+diagram is written to a snapshot file and the log restarts after it.
+
+The snapshot is serialised and synced on a thread of its own, so neither
+compacting nor attaching a large diagram stalls the editor. Meanwhile the
+log goes on: a marker names the snapshot being written and edits follow it.
+Once the snapshot is on disk, the log is rewritten to start at the marker.
+
+Log lines are JSON arrays:
+
+    ["snapshot", generation]                 marker, the records after it follow that snapshot
+    ["reset", generation]                    marker, as above for a newly attached diagram
+    ["add_class", name, attributes, methods, x, y]
+    ["remove_class", name]
+    ["add_edge", kind, from, to]
+    ["remove_edge", kind, from, to, position]  position among parallel duplicates
+    ["set_members", name, attributes, methods]
+    ["move_class", name, dx, dy]
+
+The snapshot stores its generation too. Generations are timestamps, so they
+keep growing across sessions. Replay applies the records after the marker
+of the snapshot it starts from. Records before it were already folded into
+the snapshot. A log without that marker is older than the snapshot, so
+replay skips it. After a "reset" marker whose snapshot never reached the
+disk, the records belong to a diagram replay cannot rebuild. Replay stops
+there and returns the diagram as it was before the reset.
+
+Every running editor journals to its own slot (journal.jsonl,
+journal.2.jsonl, ...) and holds an exclusive lock on it. The operating
+system drops the lock when the process ends, crash or not. So a journal
+found in a slot whose lock can be taken was left behind, and is never one
+that another editor is still writing.
+"""
+import json
+import os
+import threading
+import time
+from functools import partial
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+from .model import ClassNode, Diagram
+from .storage import save_atomic
+
+SNAPSHOT_SUFFIX = ".snapshot"
+LOCK_SUFFIX = ".lock"
+# A journal left by an earlier session is moved here while the user decides whether to restore it
+ASIDE_SUFFIX = ".recovered"
+MAX_SLOTS = 100
+
+
+def encode(record):
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def write_text(text, path):
+    with open(path, "w") as file:
+        file.write(text)
+
+
+class Journal:
+    """Records the mutations of a Diagram to an append-only log with periodic snapshots."""
+
+    def __init__(self, path, compact_every=5000, sync=False, on_error=None):
+        """
+        Initialize a journal; call attach() to start recording a diagram.
+        :param path: Log file; the snapshot is kept next to it with a ".snapshot" suffix.
+        :param compact_every: Number of records after which flush() compacts the journal.
+        :param sync: fsync after every flush, surviving power loss as well as crashes.
+        :param on_error: Optional callback(OSError) for a failed write; the journal then stops
+                         recording instead of raising into the edit that triggered the write.
+        """
+        self.path = path
+        self.snapshot_path = path + SNAPSHOT_SUFFIX
+        self.compact_every = compact_every
+        self.sync = sync
+        self.on_error = on_error
+        self.diagram = None
+        self.file = None
+        self.generation = 0
+        self.records = 0
+        # Thread writing the snapshot of self.generation, its error and the log lines written since its marker
+        self.writer = None
+        self.write_error = None
+        self.since_marker = []
+        self.pending_move = None
+        # True while the journal holds edits that were not saved to a diagram file
+        self.dirty = False
+        # Grows with every recorded edit and every attach, to tell whether a saved snapshot is still current
+        self.edits = 0
+
+    def attach(self, diagram):
+        """Start recording a diagram, replacing the journal's content with a snapshot of it."""
+        self.wait()
+        if self.diagram is not None:
+            self.diagram.unsubscribe(self.on_model_change)
+        self.diagram = diagram
+        diagram.subscribe(self.on_model_change)
+        try:
+            self.start_snapshot("reset")
+        except OSError as e:
+            self.fail(e)
+        self.dirty = False
+        self.edits += 1
+
+    def detach(self):
+        """Stop recording and close the log, once a snapshot being written is on disk."""
+        self.flush()
+        self.wait()
+        if self.diagram is not None:
+            self.diagram.unsubscribe(self.on_model_change)
+            self.diagram = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def on_model_change(self, event, *args):
+        """Diagram listener appending one record per mutation."""
+        if self.file is None:
+            return
+        try:
+            self.record(event, args)
+        except OSError as e:
+            self.fail(e)
+
+    def record(self, event, args):
+        if event == "move_class":
+            node, dx, dy = args
+            pending = self.pending_move
+            if pending is not None and pending[1] == node.name:
+                pending[2] += dx
+                pending[3] += dy
+            else:
+                self.write_pending_move()
+                self.pending_move = ["move_class", node.name, dx, dy]
+            self.dirty = True
+            self.edits += 1
+            return
+
+        self.write_pending_move()
+        if event == "add_class":
+            node = args[0]
+            record = ["add_class", node.name, node.attributes, node.methods, node.x, node.y]
+        elif event == "remove_class":
+            record = ["remove_class", args[0].name]
+        elif event == "add_edge":
+            edge = args[0]
+            record = ["add_edge", edge.kind, edge.source.name, edge.target.name]
+        elif event == "remove_edge":
+            edge, position = args
+            record = ["remove_edge", edge.kind, edge.source.name, edge.target.name, position]
+        elif event == "set_members":
+            node = args[0]
+            record = ["set_members", node.name, node.attributes, node.methods]
+        else:
+            return
+        self.edits += 1
+        self.append(record)
+
+    def write_pending_move(self):
+        if self.pending_move is not None:
+            record, self.pending_move = self.pending_move, None
+            self.append(record)
+
+    def append(self, record):
+        line = encode(record)
+        self.file.write(line)
+        self.file.flush()
+        if self.writer is not None:
+            self.since_marker.append(line)
+        self.records += 1
+        self.dirty = True
+
+    def flush(self):
+        """
+        Write a merged pending move, restart the log after a snapshot written meanwhile,
+        sync if configured, and compact once enough records accumulated.
+        """
+        if self.file is None:
+            return
+        try:
+            self.write_pending_move()
+            if self.writer is not None and not self.writer.is_alive():
+                self.finish_snapshot()
+            if self.sync:
+                os.fsync(self.file.fileno())
+            if self.writer is None and self.records >= self.compact_every:
+                self.start_snapshot("snapshot")
+        except OSError as e:
+            self.fail(e)
+
+    def wait(self):
+        """Wait for a snapshot being written, then restart the log after it."""
+        if self.writer is None:
+            return
+        try:
+            self.finish_snapshot()
+        except OSError as e:
+            self.fail(e)
+
+    def fail(self, error):
+        """
+        Stop recording after a failed write; what the journal wrote before stays for recovery.
+        The journal stays subscribed, as the failure may come up while the diagram notifies its
+        listeners, and ignores further edits.
+        """
+        self.pending_move = None
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+            self.file = None
+        if self.on_error is None:
+            raise error
+        self.on_error(error)
+
+    def compact(self):
+        """Snapshot the whole diagram and restart the log after it, waiting for the write."""
+        self.wait()
+        if self.file is None:
+            return
+        try:
+            self.write_pending_move()
+            self.start_snapshot("snapshot")
+        except OSError as e:
+            self.fail(e)
+        self.wait()
+
+    def start_snapshot(self, marker):
+        """
+        Log a marker and start writing a snapshot of the diagram after it on a thread.
+        :param marker: "snapshot" to compact, "reset" for a newly attached diagram.
+        """
+        # Generations only grow, also across sessions, so an older log is never replayed onto a newer snapshot
+        self.generation = max(self.generation + 1, time.time_ns())
+        if self.file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(self.path, "w")
+        self.write_pending_move()
+        # Copied here, as the diagram goes on changing; the member lists are shared, as the
+        # model replaces them instead of changing them
+        data = self.diagram.to_dict()
+        self.append([marker, self.generation])
+        self.records = 0
+        self.since_marker = []
+        self.writer = threading.Thread(target=self.write_snapshot, args=(self.generation, data), daemon=True)
+        self.writer.start()
+
+    def write_snapshot(self, generation, data):
+        """Serialise and sync a snapshot; runs on the writer thread."""
+        try:
+            save_atomic(self.snapshot_path, partial(write_text, json.dumps(
+                {"generation": generation, "diagram": data}, separators=(",", ":")
+            )), sync=True)
+        except OSError as e:
+            self.write_error = e
+
+    def finish_snapshot(self):
+        """Wait for the snapshot write and rewrite the log to start at its marker."""
+        writer, self.writer = self.writer, None
+        writer.join()
+        lines, self.since_marker = self.since_marker, []
+        error, self.write_error = self.write_error, None
+        if error is not None:
+            raise error
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        save_atomic(self.path, partial(write_text, encode(["snapshot", self.generation]) + "".join(lines)),
+                    sync=self.sync)
+        self.file = open(self.path, "a")
+
+    def mark_saved(self, edits=None):
+        """
+        Note that the diagram was saved to a file, so the journal holds nothing worth recovering.
+        :param edits: Value of edits when the saved snapshot was taken; if the diagram changed
+                      since, the journal stays dirty.
+        """
+        self.flush()
+        if edits is None or edits == self.edits:
+            self.dirty = False
+
+    def close(self):
+        """Stop recording; keep the journal for recovery only if it holds unsaved edits."""
+        dirty = self.dirty
+        self.detach()
+        if not dirty:
+            discard_journal(self.path)
+
+
+class JournalLock:
+    """Exclusive lock on a journal slot, held for as long as an editor writes to it."""
+
+    def __init__(self, path):
+        self.path = path + LOCK_SUFFIX
+        self.file = None
+
+    def acquire(self):
+        """
+        Take the lock without waiting; returns False when another process holds it.
+        Raises OSError when the lock file cannot be created, e.g. in a read-only directory.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            file.close()
+            return False
+        self.file = file
+        return True
+
+    def release(self):
+        if self.file is None:
+            return
+        if fcntl is None:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+def journal_slot(path, number):
+    """Path of a journal slot: path itself for the first, then e.g. "journal.2.jsonl"."""
+    if number == 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{number}{extension}"
+
+
+def claim_journal(path, slots=MAX_SLOTS):
+    """
+    Lock the first journal slot at path that no running editor holds.
+    :return: (journal path, JournalLock), or (None, None) when every slot is taken.
+    """
+    for number in range(1, slots + 1):
+        slot = journal_slot(path, number)
+        lock = JournalLock(slot)
+        if lock.acquire():
+            return slot, lock
+    return None, None
+
+
+def set_aside_journal(path):
+    """
+    Move a journal left in a claimed slot out of the way, so a new journal can start there
+    right away. A journal set aside before and never restored or discarded (the editor
+    ended while asking) is kept in preference to the newer one, which recorded at most the
+    edits made while asking.
+    :return: Path the left journal can be replayed from, or None when there is none.
+    """
+    aside = path + ASIDE_SUFFIX
+    if journal_exists(path):
+        if journal_exists(aside):
+            discard_journal(path)
+        else:
+            for suffix in ("", SNAPSHOT_SUFFIX):
+                if os.path.exists(path + suffix):
+                    os.replace(path + suffix, aside + suffix)
+    return aside if journal_exists(aside) else None
+
+
+def journal_exists(path):
+    """Whether a journal or snapshot was left at path, e.g. by a session that crashed."""
+    return os.path.exists(path) or os.path.exists(path + SNAPSHOT_SUFFIX)
+
+
+def discard_journal(path):
+    """Delete the journal and snapshot at path."""
+    for file_path in (path, path + SNAPSHOT_SUFFIX):
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+
+def apply_record(diagram, record):
+    """Apply one log record to a diagram."""
+    event = record[0]
+    if event == "add_class":
+        _, name, attributes, methods, x, y = record
+        diagram.add_class(ClassNode(name, attributes, methods, x, y))
+    elif event == "remove_class":
+        diagram.remove_class(record[1])
+    elif event == "add_edge":
+        diagram.add_edge(record[1], record[2], record[3])
+    elif event == "remove_edge":
+        kind, source, target = record[1:4]
+        # Logs written before positions were recorded remove the first duplicate
+        position = record[4] if len(record) > 4 else 0
+        parallel = [edge for edge in diagram.incident(source)
+                    if edge.kind == kind and edge.source.name == source and edge.target.name == target]
+        if position < len(parallel):
+            diagram.remove_edge(parallel[position])
+    elif event == "set_members":
+        diagram.set_members(record[1], record[2], record[3])
+    elif event == "move_class":
+        diagram.move_class(record[1], record[2], record[3])
+
+
+def replay_journal(path):
+    """
+    Rebuild the diagram recorded by the journal at path: its snapshot plus the logged edits.
+    A torn last line (a crash during a write) and records that no longer apply are skipped.
+    """
+    generation = 0
+    diagram = Diagram()
+    if os.path.exists(path + SNAPSHOT_SUFFIX):
+        with open(path + SNAPSHOT_SUFFIX, "r") as file:
+            snapshot = json.load(file)
+        generation = snapshot["generation"]
+        diagram = Diagram.from_dict(snapshot["diagram"])
+    if not os.path.exists(path):
+        return diagram
+
+    with open(path, "r") as file:
+        applying = False
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if record[0] in ("snapshot", "reset"):
+                if record[1] == generation:
+                    applying = True
+                elif applying and record[0] == "reset":
+                    break
+                continue
+            if not applying:
+                continue
+            try:
+                apply_record(diagram, record)
+            except (KeyError, ValueError):
+                continue
+    return diagram
@@ -0,0 +1,347 @@
+"""
+Automatic layout of class diagrams.
+
+Two layouts are offered:
+
+    layered   Sugiyama-style: classes in inheritance hierarchies are put in
+              layers below their parents, layers are ordered by barycenter
+              sweeps to reduce crossings, and classes outside any hierarchy
+              are placed by the force-directed layout to the right.
+    force     Fruchterman-Reingold over all associations. Repulsion between
+              classes in different grid cells is approximated by the cells'
+              centres of mass, so an iteration is O(n * cells) instead of O(n^2).
+              The result is snapped to a compact grid by rank, which keeps the
+              relative placement and guarantees that no boxes overlap.
+
+Position updates are vectorized with NumPy, which is an optional dependency
+of the editor needed only by this module. Layouts return top-left positions
+by class name; apply_layout moves the classes of a Diagram through the model,
+so open views follow. Run headless on a diagram file with:
+
+    python -m src.diagram.layout diagram.json [-o laid_out.json] [--method force]
+"""
+import argparse
+from collections import deque
+from functools import partial
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from .geometry import BOX_WIDTH, box_height
+from .model import Diagram
+from .storage import load_diagram_file, save_atomic, save_diagram_file
+
+LAYOUT_METHODS = ("layered", "force")
+
+H_GAP = 60
+V_GAP = 100
+MARGIN = 50
+# Ideal distance between the centres of associated classes in the force layout
+SPRING_LENGTH = 320
+# Up to this many classes the force layout computes every pairwise repulsion
+EXACT_REPULSION_LIMIT = 400
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Auto layout needs NumPy. Install it with 'pip install numpy'.")
+
+
+def inheritance_layers(count, parent_child):
+    """
+    Assign every node to a layer one below its deepest parent (longest path from the roots).
+    Nodes on an inheritance cycle are placed below their already placed parents.
+    :param count: Number of nodes.
+    :param parent_child: List of (parent index, child index) pairs.
+    """
+    children = [[] for _ in range(count)]
+    pending_parents = [0] * count
+    for parent, child in parent_child:
+        children[parent].append(child)
+        pending_parents[child] += 1
+
+    layers = [0] * count
+    placed = [False] * count
+    queue = deque(i for i in range(count) if pending_parents[i] == 0)
+    remaining = count
+    while remaining:
+        if not queue:
+            # Only cycles are left; break one at the lowest index that is still unplaced
+            queue.append(next(i for i in range(count) if not placed[i]))
+        node = queue.popleft()
+        if placed[node]:
+            continue
+        placed[node] = True
+        remaining -= 1
+        for child in children[node]:
+            if not placed[child]:
+                layers[child] = max(layers[child], layers[node] + 1)
+                pending_parents[child] -= 1
+                if pending_parents[child] == 0:
+                    queue.append(child)
+    return layers
+
+
+def order_layers(layers, parent_child, sweeps=4):
+    """
+    Order the nodes of every layer by the barycenter of their neighbours in the adjacent layer,
+    alternating downward (parents) and upward (children) sweeps.
+    Returns a list of node index arrays, one per layer, in left-to-right order.
+    """
+    layer_of = np.asarray(layers)
+    count = len(layer_of)
+    depth = int(layer_of.max()) + 1 if count else 0
+    rows = [np.flatnonzero(layer_of == layer) for layer in range(depth)]
+    rank = np.zeros(count)
+    for row in rows:
+        rank[row] = np.arange(len(row))
+
+    edges = np.asarray(parent_child, dtype=np.int64).reshape(-1, 2)
+    edges = edges[layer_of[edges[:, 1]] == layer_of[edges[:, 0]] + 1]
+    parents, children = edges[:, 0], edges[:, 1]
+
+    def reorder(row, sources, targets):
+        # Barycenter of each node's neighbours; nodes without any keep their rank
+        inside = np.isin(targets, row)
+        total = np.bincount(targets[inside], weights=rank[sources[inside]], minlength=count)[row]
+        degree = np.bincount(targets[inside], minlength=count)[row]
+        barycenter = np.where(degree > 0, total / np.maximum(degree, 1), rank[row])
+        ordered = row[np.argsort(barycenter, kind="stable")]
+        rank[ordered] = np.arange(len(ordered))
+        return ordered
+
+    for sweep in range(sweeps):
+        if sweep % 2 == 0:
+            for layer in range(1, depth):
+                rows[layer] = reorder(rows[layer], parents, children)
+        else:
+            for layer in range(depth - 2, -1, -1):
+                rows[layer] = reorder(rows[layer], children, parents)
+    return rows
+
+
+def layered_positions(rows, heights, max_row=60):
+    """
+    Top-left positions for ordered layers, centred on the widest row.
+    Layers with more than max_row classes wrap onto several rows.
+    """
+    bands = []
+    for row in rows:
+        bands.extend(row[start:start + max_row] for start in range(0, len(row), max_row))
+    positions = np.zeros((len(heights), 2))
+    widest = max((len(band) for band in bands), default=0)
+    y = 0.0
+    for band in bands:
+        offset = (widest - len(band)) * (BOX_WIDTH + H_GAP) / 2
+        positions[band, 0] = offset + np.arange(len(band)) * (BOX_WIDTH + H_GAP)
+        positions[band, 1] = y
+        y += heights[band].max() + V_GAP
+    return positions
+
+
+def repulsion(centers, strength):
+    """Exact Fruchterman-Reingold repulsion on every node from every other node."""
+    delta = centers[:, None, :] - centers[None, :, :]
+    distance2 = np.maximum((delta ** 2).sum(axis=2), 1.0)
+    return strength * (delta / distance2[:, :, None]).sum(axis=1)
+
+
+def grid_repulsion(centers, strength, cells_per_side):
+    """
+    Repulsion approximated by the centre of mass of every occupied grid cell.
+    A node's own cell is counted without the node itself.
+    """
+    low = centers.min(axis=0)
+    span = np.maximum(centers.max(axis=0) - low, 1.0)
+    cell_xy = np.minimum((centers - low) / span * cells_per_side, cells_per_side - 1).astype(np.int64)
+    cell = cell_xy[:, 0] * cells_per_side + cell_xy[:, 1]
+
+    occupied, cell = np.unique(cell, return_inverse=True)
+    mass = np.bincount(cell).astype(float)
+    centroid = np.stack([
+        np.bincount(cell, weights=centers[:, 0]), np.bincount(cell, weights=centers[:, 1])
+    ], axis=1) / mass[:, None]
+
+    delta = centers[:, None, :] - centroid[None, :, :]
+    distance2 = np.maximum((delta ** 2).sum(axis=2), 1.0)
+    force = (delta * (mass[None, :] / distance2)[:, :, None]).sum(axis=1)
+
+    # Replace the own-cell term by the centre of mass of the other nodes in the cell
+    own_delta = centers - centroid[cell]
+    force -= own_delta * (mass[cell] / np.maximum((own_delta ** 2).sum(axis=1), 1.0))[:, None]
+    others = mass[cell] - 1
+    has_others = others > 0
+    others_centroid = (centroid[cell] * mass[cell][:, None] - centers) / np.maximum(others, 1)[:, None]
+    other_delta = centers - others_centroid
+    force += np.where(
+        has_others[:, None],
+        other_delta * (others / np.maximum((other_delta ** 2).sum(axis=1), 1.0))[:, None],
+        0.0
+    )
+    return strength * force
+
+
+def force_directed_centers(count, edges, initial=None, iterations=120, seed=0, spring_length=SPRING_LENGTH):
+    """
+    Fruchterman-Reingold layout of box centres.
+    :param count: Number of nodes.
+    :param edges: List of (index, index) pairs pulling nodes together.
+    :param initial: Optional (count, 2) array of starting centres; a jittered grid by default.
+    :return: (count, 2) array of centres.
+    """
+    rng = np.random.default_rng(seed)
+    if initial is None:
+        columns = max(1, int(np.ceil(np.sqrt(count))))
+        index = np.arange(count)
+        centers = np.stack([index % columns, index // columns], axis=1) * float(spring_length)
+    else:
+        centers = np.array(initial, dtype=float)
+    centers = centers + rng.uniform(-1.0, 1.0, size=(count, 2)) * spring_length / 10
+    if count < 2:
+        return centers
+
+    pairs = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    source, target = pairs[:, 0], pairs[:, 1]
+    strength = spring_length ** 2
+    cells_per_side = max(2, int(np.sqrt(count / 16)))
+
+    temperature = spring_length * np.sqrt(count) / 4
+    cooling = (1.0 / temperature) ** (1.0 / iterations)
+    for _ in range(iterations):
+        if count <= EXACT_REPULSION_LIMIT:
+            displacement = repulsion(centers, strength)
+        else:
+            displacement = grid_repulsion(centers, strength, cells_per_side)
+
+        delta = centers[source] - centers[target]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / spring_length)[:, None]
+        for axis in (0, 1):
+            displacement[:, axis] -= np.bincount(source, weights=pull[:, axis], minlength=count)
+            displacement[:, axis] += np.bincount(target, weights=pull[:, axis], minlength=count)
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 1e-9)
+        centers += displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature *= cooling
+    return centers
+
+
+def snap_to_grid(centers, heights):
+    """
+    Snap centres to a compact grid of slots, preserving their left-to-right order across
+    columns and top-to-bottom order within each column. Returns top-left positions.
+    """
+    count = len(centers)
+    slot_width = BOX_WIDTH + H_GAP
+    slot_height = heights.max() + H_GAP
+    width, height = np.maximum(centers.max(axis=0) - centers.min(axis=0), 1.0)
+    columns = int(np.clip(np.rint(np.sqrt(count * (width / height) * (slot_height / slot_width))), 1, count))
+    per_column = -(-count // columns)
+
+    column = np.empty(count, dtype=np.int64)
+    column[np.argsort(centers[:, 0], kind="stable")] = np.arange(count) // per_column
+    order = np.lexsort((centers[:, 1], column))
+    row = np.empty(count, dtype=np.int64)
+    row[order] = np.arange(count) - np.searchsorted(column[order], column[order])
+    return np.stack([column * slot_width, row * slot_height], axis=1).astype(float)
+
+
+def auto_layout(diagram, method="layered", iterations=120, seed=0):
+    """
+    Compute a layout for every class of a Diagram.
+    :param method: "layered" or "force".
+    :param iterations: Iterations of the force-directed layout.
+    :param seed: Seed for the force layout's initial jitter, so layouts are reproducible.
+    :return: Dict of class name to top-left (x, y).
+    """
+    require_numpy()
+    if method not in LAYOUT_METHODS:
+        raise ValueError(f"Unknown layout method '{method}'. Choose {' or '.join(LAYOUT_METHODS)}.")
+    nodes = list(diagram.classes.values())
+    if not nodes:
+        return {}
+    index = {node.name: i for i, node in enumerate(nodes)}
+    heights = np.array([node.height for node in nodes], dtype=float)
+    edges = [(index[edge.source.name], index[edge.target.name]) for edge in diagram.edges]
+
+    positions = np.zeros((len(nodes), 2))
+    free = np.arange(len(nodes))
+    right = 0.0
+    if method == "layered":
+        inheritance = {
+            (index[edge.source.name], index[edge.target.name])
+            for edge in diagram.edges if edge.kind == "inheritance" and edge.source is not edge.target
+        }
+        in_hierarchy = np.zeros(len(nodes), dtype=bool)
+        for parent, child in inheritance:
+            in_hierarchy[parent] = in_hierarchy[child] = True
+        members = np.flatnonzero(in_hierarchy)
+        if len(members):
+            local = np.full(len(nodes), -1)
+            local[members] = np.arange(len(members))
+            local_edges = [(local[parent], local[child]) for parent, child in sorted(inheritance)]
+            rows = order_layers(inheritance_layers(len(members), local_edges), local_edges)
+            positions[members] = layered_positions(rows, heights[members])
+            right = positions[members, 0].max() + BOX_WIDTH + 2 * H_GAP
+        free = np.flatnonzero(~in_hierarchy)
+
+    if len(free):
+        local = np.full(len(nodes), -1)
+        local[free] = np.arange(len(free))
+        free_edges = [(local[a], local[b]) for a, b in edges if local[a] >= 0 and local[b] >= 0]
+        centers = force_directed_centers(len(free), free_edges, iterations=iterations, seed=seed)
+        corners = snap_to_grid(centers, heights[free])
+        corners[:, 0] += right
+        positions[free] = corners
+
+    positions += MARGIN - positions.min(axis=0)
+    return {node.name: (float(x), float(y)) for node, (x, y) in zip(nodes, positions.tolist())}
+
+
+def apply_layout(diagram, positions):
+    """Move the classes of a Diagram to the given top-left positions, notifying its listeners."""
+    for name, (x, y) in positions.items():
+        node = diagram.classes[name]
+        if (node.x, node.y) != (x, y):
+            diagram.move_class(name, x - node.x, y - node.y)
+
+
+def layout_file(source, target=None, method="layered", iterations=120, seed=0):
+    """
+    Lay out a JSON or binary diagram file, writing it to target (default: in place).
+    Only the "position" of each class changes. Repeated class entries after the first,
+    associations to missing classes and everything else are written back as read, and
+    the file is replaced only once the new content is complete.
+    :return: Dict of class name to its new top-left position.
+    """
+    data = load_diagram_file(source)
+    positions = auto_layout(Diagram.from_dict(data), method, iterations, seed)
+    placed = set()
+    for cls in data.get("classes", []):
+        name = cls["name"]
+        if name in placed:
+            continue
+        placed.add(name)
+        x, y = positions[name]
+        cls["position"] = [x, y, x + BOX_WIDTH, y + box_height(cls.get("attributes", []), cls.get("methods", []))]
+
+    save_atomic(target or source, partial(save_diagram_file, data))
+    return positions
+
+
+def main(argv=None):
+    """Lay out a diagram file from the command line."""
+    parser = argparse.ArgumentParser(description="Compute positions for the classes of a UML diagram file.")
+    parser.add_argument("source")
+    parser.add_argument("-o", "--output", help="File to write (default: overwrite the source).")
+    parser.add_argument("--method", choices=LAYOUT_METHODS, default="layered")
+    parser.add_argument("--iterations", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    layout_file(args.source, args.output, args.method, args.iterations, args.seed)
+
+
+if __name__ == "__main__":
+    main()
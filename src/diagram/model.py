@@ -0,0 +1,185 @@
+from .geometry import BOX_WIDTH, box_height
+
+ASSOCIATION_TYPES = ("association", "dependency", "inheritance", "composition", "aggregation")
+
+
+class ClassNode:
+    """A class in the diagram: name, members and top-left position."""
+
+    __slots__ = ("name", "attributes", "methods", "x", "y", "edges")
+
+    def __init__(self, name, attributes=None, methods=None, x=100, y=100):
+        self.name = name
+        self.attributes = list(attributes or [])
+        self.methods = list(methods or [])
+        self.x, self.y = x, y
+        # Edges touching this class, in insertion order
+        self.edges = []
+
+    @property
+    def width(self):
+        return BOX_WIDTH
+
+    @property
+    def height(self):
+        return box_height(self.attributes, self.methods)
+
+    def position(self):
+        """Box bounds [x1, y1, x2, y2], as stored in diagram files."""
+        return [self.x, self.y, self.x + self.width, self.y + self.height]
+
+    def to_dict(self, include_position=True):
+        data = {"name": self.name, "attributes": self.attributes, "methods": self.methods}
+        if include_position:
+            data["position"] = self.position()
+        return data
+
+
+class Edge:
+    """A relationship between two classes. For inheritance, source is the parent."""
+
+    __slots__ = ("kind", "source", "target")
+
+    def __init__(self, kind, source, target):
+        self.kind = kind
+        self.source = source
+        self.target = target
+
+    def to_dict(self):
+        return {"type": self.kind, "from": self.source.name, "to": self.target.name}
+
+    def parallel(self, other):
+        """Whether other has the same kind, source and target."""
+        return self.kind == other.kind and self.source is other.source and self.target is other.target
+
+
+class Diagram:
+    """
+    Tk-independent UML diagram model.
+
+    Classes are indexed by name, edges are kept in insertion order and each
+    ClassNode lists its incident edges. Every mutation goes through a method
+    that notifies the subscribed listeners with listener(event, *args), where
+    event is one of "add_class", "remove_class", "add_edge", "remove_edge",
+    "set_members" and "move_class". "remove_edge" also passes the edge's
+    position among its parallel duplicates (same kind, source and target).
+    """
+
+    __slots__ = ("classes", "edges", "listeners")
+
+    def __init__(self):
+        self.classes = {}
+        # Ordered set of Edge objects
+        self.edges = {}
+        self.listeners = []
+
+    def __len__(self):
+        return len(self.classes)
+
+    def __contains__(self, name):
+        return name in self.classes
+
+    def get(self, name):
+        """Return the ClassNode with the given name, or None."""
+        return self.classes.get(name)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def _emit(self, event, *args):
+        for listener in self.listeners:
+            listener(event, *args)
+
+    def add_class(self, node):
+        """Add a ClassNode; class names must be unique."""
+        if node.name in self.classes:
+            raise ValueError(f"Class '{node.name}' already exists.")
+        self.classes[node.name] = node
+        self._emit("add_class", node)
+        return node
+
+    def remove_class(self, name):
+        """Remove a class together with its incident edges."""
+        node = self.classes[name]
+        for edge in list(node.edges):
+            self.remove_edge(edge)
+        del self.classes[name]
+        self._emit("remove_class", node)
+        return node
+
+    def add_edge(self, kind, source_name, target_name):
+        """Add a relationship of the given kind between two existing classes."""
+        source = self.classes.get(source_name)
+        target = self.classes.get(target_name)
+        if source is None or target is None:
+            missing = source_name if source is None else target_name
+            raise ValueError(f"Class '{missing}' not found.")
+        return self.restore_edge(Edge(kind, source, target))
+
+    def restore_edge(self, edge):
+        """Add an Edge object, e.g. one removed earlier; both of its classes must be in the diagram."""
+        self.edges[edge] = None
+        edge.source.edges.append(edge)
+        if edge.target is not edge.source:
+            edge.target.edges.append(edge)
+        self._emit("add_edge", edge)
+        return edge
+
+    def remove_edge(self, edge):
+        del self.edges[edge]
+        source_edges = edge.source.edges
+        index = source_edges.index(edge)
+        # Parallel duplicates keep their relative order in the source's list and in self.edges
+        position = sum(1 for other in source_edges[:index] if other.parallel(edge))
+        del source_edges[index]
+        if edge.target is not edge.source:
+            edge.target.edges.remove(edge)
+        self._emit("remove_edge", edge, position)
+
+    def set_members(self, name, attributes, methods):
+        """Replace the attributes and methods of a class."""
+        node = self.classes[name]
+        old_attributes, old_methods = node.attributes, node.methods
+        node.attributes, node.methods = list(attributes), list(methods)
+        self._emit("set_members", node, old_attributes, old_methods)
+
+    def move_class(self, name, dx, dy):
+        """Move a class by (dx, dy)."""
+        node = self.classes[name]
+        node.x += dx
+        node.y += dy
+        self._emit("move_class", node, dx, dy)
+
+    def incident(self, name):
+        """Edges touching the named class."""
+        return self.classes[name].edges
+
+    def to_dict(self, include_positions=True):
+        """Diagram dict in the schema used by diagram files and code generation."""
+        return {
+            "classes": [node.to_dict(include_positions) for node in self.classes.values()],
+            "associations": [edge.to_dict() for edge in self.edges]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a Diagram from a diagram dict.
+        Repeated class names keep their first occurrence and associations whose
+        endpoints are missing are skipped, as the editor has always done on load.
+        """
+        diagram = cls()
+        for cls_data in data.get("classes", []):
+            if cls_data["name"] in diagram.classes:
+                continue
+            position = cls_data.get("position") or (100, 100)
+            diagram.add_class(ClassNode(
+                cls_data["name"], cls_data.get("attributes"), cls_data.get("methods"), position[0], position[1]
+            ))
+        for assoc in data.get("associations", []):
+            if assoc["from"] in diagram.classes and assoc["to"] in diagram.classes:
+                diagram.add_edge(assoc["type"], assoc["from"], assoc["to"])
+        return diagram
@@ -0,0 +1,261 @@
+"""
+Inverted index for finding classes by class, attribute and method names.
+
+A SearchIndex listens to a Diagram and maps name tokens to the classes that
+declare them. The index is built on the first query after attach(), so
+loading a diagram does not pay for it, and from then on only the classes
+touched by an edit are re-indexed. Every name is indexed whole and split into its words
+(snake_case and camelCase), lowercased, so "getUserName" is found by
+"getusername", "user" or "name".
+
+Three lookups are offered, none of which scans the whole index:
+
+- exact: a dict lookup of the token.
+- prefix: a binary search in the sorted token list, then the run of tokens
+  that start with the prefix.
+- fuzzy: a deletion neighbourhood (symmetric delete). Every token is also
+  filed under each of its one-character deletions, and a query looks up
+  itself and its own deletions. The candidates are then checked with an
+  edit distance bound, finding every token within one insertion, deletion,
+  substitution or transposition.
+"""
+import re
+from functools import lru_cache
+from bisect import bisect_left, insort
+from heapq import heappush, heapreplace, nsmallest
+
+# Score of a match by lookup and by field, combined by multiplication
+MATCH_SCORES = {"exact": 3, "prefix": 2, "fuzzy": 1}
+FIELD_SCORES = {"class": 3, "method": 2, "attribute": 2}
+# Queries shorter than this are not looked up fuzzily; nearly every short token would match
+MIN_FUZZY_LENGTH = 3
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Words of a name; digits stay with the word before them, so "Order2" is one word
+_WORD = re.compile(r"[A-Z]+[0-9]*(?![a-z])|[A-Z]?[a-z]+[0-9]*|[0-9]+")
+
+
+def member_name(member):
+    """Identifier declared by a member string, e.g. "+ getName(): String" -> "getName"."""
+    match = _IDENTIFIER.search(member)
+    return match.group() if match else ""
+
+
+@lru_cache(maxsize=65536)
+def member_tokens(member):
+    """Tokens of the name declared by a member string; members repeat a lot across classes."""
+    return tuple(name_tokens(member_name(member)))
+
+
+def name_tokens(name):
+    """Lowercase tokens of a name: the name itself and, when it has several, its words."""
+    if not name:
+        return []
+    tokens = [name.lower()]
+    words = [word.lower() for part in name.split("_") for word in _WORD.findall(part)]
+    if len(words) > 1:
+        tokens.extend(word for word in words if word not in tokens)
+    return tokens
+
+
+def deletions(token):
+    """The strings left by deleting one character of token."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def within_distance(a, b, limit=1):
+    """Whether the edit distance of a and b, counting adjacent transpositions, is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """Token index over the class, attribute and method names of a Diagram."""
+
+    def __init__(self):
+        self.diagram = None
+        # token -> {field: set of class names}
+        self.postings = {}
+        # class name -> {token: set of fields}, to unindex a class
+        self.class_tokens = {}
+        # Sorted distinct tokens, for prefix lookups
+        self.tokens = []
+        # one-character deletion -> set of tokens
+        self.neighbours = {}
+        # False until the attached diagram is indexed by the first query
+        self.built = False
+
+    def attach(self, diagram):
+        """Follow a diagram, forgetting the previous one; it is indexed on the first query."""
+        if self.diagram is not None:
+            self.diagram.unsubscribe(self.on_model_change)
+        self.diagram = diagram
+        diagram.subscribe(self.on_model_change)
+        self.postings = {}
+        self.class_tokens = {}
+        self.neighbours = {}
+        self.tokens = []
+        self.built = False
+
+    def build(self):
+        """Index every class of the attached diagram, if not done yet."""
+        if self.built or self.diagram is None:
+            return
+        for node in self.diagram.classes.values():
+            self.add(node, sort=False)
+        self.tokens = sorted(self.postings)
+        self.built = True
+
+    def on_model_change(self, event, *args):
+        """Diagram listener re-indexing the classes an edit touched."""
+        if not self.built:
+            return
+        if event == "add_class":
+            self.add(args[0])
+        elif event == "remove_class":
+            self.remove(args[0].name)
+        elif event == "set_members":
+            self.remove(args[0].name)
+            self.add(args[0])
+
+    def add(self, node, sort=True):
+        """Index the names of a ClassNode."""
+        fields = {}
+        named = [("class", node.name)]
+        named += [("attribute", member) for member in node.attributes]
+        named += [("method", member) for member in node.methods]
+        for field, name in named:
+            for token in member_tokens(name):
+                fields.setdefault(token, set()).add(field)
+        self.class_tokens[node.name] = fields
+        for token, token_fields in fields.items():
+            by_field = self.postings.get(token)
+            if by_field is None:
+                by_field = self.postings[token] = {}
+                if sort:
+                    insort(self.tokens, token)
+                for deletion in deletions(token):
+                    self.neighbours.setdefault(deletion, set()).add(token)
+            for field in token_fields:
+                by_field.setdefault(field, set()).add(node.name)
+
+    def remove(self, name):
+        """Forget the names of a class."""
+        for token, token_fields in self.class_tokens.pop(name, {}).items():
+            by_field = self.postings[token]
+            for field in token_fields:
+                names = by_field[field]
+                names.discard(name)
+                if not names:
+                    del by_field[field]
+            if by_field:
+                continue
+            del self.postings[token]
+            del self.tokens[bisect_left(self.tokens, token)]
+            for deletion in deletions(token):
+                tokens = self.neighbours[deletion]
+                tokens.discard(token)
+                if not tokens:
+                    del self.neighbours[deletion]
+
+    def exact(self, token):
+        return [token] if token in self.postings else []
+
+    def prefix(self, prefix, limit=None):
+        """Indexed tokens starting with prefix, in sorted order."""
+        tokens = self.tokens
+        start = bisect_left(tokens, prefix)
+        end = start
+        while end < len(tokens) and tokens[end].startswith(prefix) and (limit is None or end - start < limit):
+            end += 1
+        return tokens[start:end]
+
+    def fuzzy(self, token):
+        """Indexed tokens within edit distance 1 of token, other than token itself."""
+        if len(token) < MIN_FUZZY_LENGTH:
+            return []
+        candidates = set(self.neighbours.get(token, ()))
+        for deletion in deletions(token):
+            if deletion in self.postings:
+                candidates.add(deletion)
+            candidates.update(self.neighbours.get(deletion, ()))
+        candidates.discard(token)
+        return sorted(candidate for candidate in candidates if within_distance(token, candidate))
+
+    def term_groups(self, term, prefix_limit=1000):
+        """
+        Classes matching one query term, grouped by how they match.
+        :return: List of (score, token, field, set of class names), best score first.
+        """
+        self.build()
+        tokens = [("exact", token) for token in self.exact(term)]
+        tokens += [("prefix", token) for token in self.prefix(term, prefix_limit) if token != term]
+        tokens += [("fuzzy", token) for token in self.fuzzy(term) if not token.startswith(term)]
+        groups = [
+            (MATCH_SCORES[match] * FIELD_SCORES[field], token, field, names)
+            for match, token in tokens for field, names in self.postings[token].items()
+        ]
+        groups.sort(key=lambda group: -group[0])
+        return groups
+
+    def search(self, query, limit=50):
+        """
+        Find the classes matching every word of a query, best first; ties are ordered by name.
+        Candidates are visited from the best-scoring groups of the rarest term down, and the
+        visit stops once no remaining group can reach the current top results.
+        :return: List of (class name, score, {query term: (matched token, field)}).
+        """
+        terms = [token for word in query.split() for token in name_tokens(member_name(word))[:1]]
+        per_term = [self.term_groups(term) for term in terms]
+        if not per_term or not all(per_term):
+            return []
+        order = sorted(range(len(terms)), key=lambda i: sum(len(group[3]) for group in per_term[i]))
+        driver, others = per_term[order[0]], [per_term[i] for i in order[1:]]
+        others_best = sum(groups[0][0] for groups in others)
+
+        def best_group(groups, name):
+            return next((group for group in groups if name in group[3]), None)
+
+        top = []
+        scored = []
+        seen = set()
+        for score, _, _, names in driver:
+            if len(top) == limit and score + others_best < top[0]:
+                break
+            for name in names:
+                if name in seen:
+                    continue
+                seen.add(name)
+                total = score
+                for groups in others:
+                    group = best_group(groups, name)
+                    if group is None:
+                        break
+                    total += group[0]
+                else:
+                    scored.append((-total, name))
+                    if len(top) < limit:
+                        heappush(top, total)
+                    elif total > top[0]:
+                        heapreplace(top, total)
+
+        results = []
+        for negative_total, name in nsmallest(limit, scored):
+            matches = {}
+            for term, groups in zip(terms, per_term):
+                matches.setdefault(term, best_group(groups, name)[1:3])
+            results.append((name, -negative_total, matches))
+        return results
@@ -0,0 +1,81 @@
+class GridIndex:
+    """
+    Uniform-grid spatial index over axis-aligned bounds.
+
+    Each key is stored in every cell its bounds overlap, so inserting, moving and
+    removing a key costs O(cells covered) and a query costs O(cells in the query
+    rectangle + keys found), independent of the total number of keys.
+    """
+
+    def __init__(self, cell_size=400):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.bounds = {}
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __contains__(self, key):
+        return key in self.bounds
+
+    def _cell_range(self, x1, y1, x2, y2):
+        size = self.cell_size
+        for cx in range(int(x1 // size), int(x2 // size) + 1):
+            for cy in range(int(y1 // size), int(y2 // size) + 1):
+                yield cx, cy
+
+    def insert(self, key, bounds):
+        """Index key under bounds (x1, y1, x2, y2)."""
+        self.bounds[key] = tuple(bounds)
+        for cell in self._cell_range(*bounds):
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        bounds = self.bounds.pop(key, None)
+        if bounds is None:
+            return
+        for cell in self._cell_range(*bounds):
+            keys = self.cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.cells[cell]
+
+    def update(self, key, bounds):
+        """Move key to new bounds."""
+        self.remove(key)
+        self.insert(key, bounds)
+
+    def query(self, x1, y1, x2, y2):
+        """Return the set of keys whose bounds intersect the rectangle."""
+        found = set()
+        for cell in self._cell_range(x1, y1, x2, y2):
+            keys = self.cells.get(cell)
+            if keys:
+                found.update(keys)
+        return {
+            key for key in found
+            if not (self.bounds[key][2] < x1 or self.bounds[key][0] > x2
+                    or self.bounds[key][3] < y1 or self.bounds[key][1] > y2)
+        }
+
+    def occupied_cells(self, x1, y1, x2, y2, group=1):
+        """
+        Bounds (x1, y1, x2, y2) of the cells intersecting the rectangle that hold at least one key.
+        :param group: Merge blocks of group x group cells, returning each occupied block once.
+        """
+        blocks = {
+            (cx // group, cy // group) for cx, cy in self._cell_range(x1, y1, x2, y2) if (cx, cy) in self.cells
+        }
+        size = self.cell_size * group
+        return [(bx * size, by * size, (bx + 1) * size, (by + 1) * size) for bx, by in blocks]
+
+    def extent(self):
+        """Bounds (x1, y1, x2, y2) covering every key, or None when empty."""
+        if not self.bounds:
+            return None
+        boxes = self.bounds.values()
+        return (
+            min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes)
+        )
@@ -0,0 +1,66 @@
+import json
+import os
+
+from ..instrumentation import timed
+from .binary_format import read_binary, write_binary
+
+BINARY_EXTENSION = ".umlb"
+# JSON chunks written between two calls of a save's check callback
+CHECK_INTERVAL = 5000
+
+
+def is_binary_path(file_path):
+    return str(file_path).lower().endswith(BINARY_EXTENSION)
+
+
+@timed("load_diagram")
+def load_diagram_file(file_path):
+    """Read a diagram dict from a JSON or binary (.umlb) diagram file."""
+    if is_binary_path(file_path):
+        return read_binary(file_path)
+    with open(file_path, "r") as file:
+        return json.load(file)
+
+
+@timed("save_diagram")
+def save_diagram_file(data, file_path, check=None):
+    """
+    Write a diagram dict as JSON, or in the binary format for .umlb paths.
+    :param check: Optional callable run between chunks of JSON output; an exception it raises aborts the write.
+    """
+    if is_binary_path(file_path):
+        if check is not None:
+            check()
+        write_binary(data, file_path)
+        return
+    with open(file_path, "w") as file:
+        if check is None:
+            json.dump(data, file, indent=4)
+            return
+        for count, chunk in enumerate(json.JSONEncoder(indent=4).iterencode(data)):
+            file.write(chunk)
+            if count % CHECK_INTERVAL == 0:
+                check()
+
+
+def save_atomic(path, write, sync=False):
+    """
+    Replace the file at path with the content write() produces, so readers, and a crash or
+    failure midway, see either the old file or the complete new one.
+    :param write: Callable(temporary path) writing the new content. It is given a file next to
+                  path that keeps path's extension and is unique to this process, since several
+                  editors may save the same file. An exception it raises leaves path untouched.
+    :param sync: fsync the new content before it replaces the old, to survive power loss too.
+    """
+    directory, name = os.path.split(path)
+    stem, extension = os.path.splitext(name)
+    temp_path = os.path.join(directory, f"{stem}.{os.getpid()}.part{extension}")
+    try:
+        write(temp_path)
+        if sync:
+            with open(temp_path, "rb+") as file:
+                os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
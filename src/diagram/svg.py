@@ -0,0 +1,200 @@
+"""
+Headless SVG (and optionally PNG) rendering of class diagrams.
+
+The picture is the one the editor draws at full detail: the same box layout,
+line endpoints and arrow shapes, taken from geometry. Elements are written to
+the output as they are produced, without building a document tree. Only the
+diagram's bounds are computed first, for the SVG header, so memory use stays
+at the size of the model however large the drawing gets.
+
+PNG output converts the SVG with CairoSVG, an optional dependency needed
+only for that.
+"""
+import os
+from xml.sax.saxutils import escape
+
+try:
+    import cairosvg
+except (ImportError, OSError):  # pragma: no cover - depends on the environment
+    cairosvg = None
+
+from .geometry import (
+    ATTRIBUTES_OFFSET, BOX_FILL, DEPENDENCY_DASH, HEADER_FILL, HEADER_HEIGHT, LINE_HEIGHT, MEMBER_FONT_SIZE,
+    MEMBER_INDENT, NAME_FONT_SIZE, NAME_OFFSET, arrow_points, line_endpoints, method_text, methods_top,
+    unit_direction
+)
+from .model import Diagram
+from .storage import load_diagram_file
+
+MARGIN = 20
+# Elements joined into one write to the output
+WRITE_CHUNK = 1000
+# Baseline offsets approximating Tk's "nw" and "center" text anchors, as fractions of the font size
+TOP_BASELINE = 0.8
+CENTER_BASELINE = 0.35
+# Tk font sizes are in points; SVG user units are pixels at 96 dpi
+PIXELS_PER_POINT = 4 / 3
+
+STYLE = f"""<style>
+.box{{fill:{BOX_FILL};stroke:#000;stroke-width:2}}
+.head{{fill:{HEADER_FILL};stroke:#000;stroke-width:2}}
+.name{{font:bold {NAME_FONT_SIZE}pt Arial,sans-serif;text-anchor:middle}}
+.member{{font:{MEMBER_FONT_SIZE}pt Arial,sans-serif}}
+.line{{stroke:#000;stroke-width:1;fill:none}}
+.dependency{{stroke-dasharray:{DEPENDENCY_DASH[0]} {DEPENDENCY_DASH[1]}}}
+.hollow{{fill:#fff;stroke:#000}}
+.solid{{fill:#000;stroke:#000}}
+</style>
+"""
+
+
+def png_available():
+    return cairosvg is not None
+
+
+def require_cairosvg():
+    if cairosvg is None:
+        raise RuntimeError("PNG output needs CairoSVG. Install it with 'pip install cairosvg'.")
+
+
+def number(value):
+    """Coordinate with at most two decimals and no trailing zeros."""
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def points_text(points):
+    return " ".join(number(value) for value in points)
+
+
+def diagram_bounds(diagram):
+    """(x1, y1, x2, y2) covering every class, or None for an empty diagram."""
+    nodes = iter(diagram.classes.values())
+    first = next(nodes, None)
+    if first is None:
+        return None
+    x1, y1 = first.x, first.y
+    x2, y2 = first.x + first.width, first.y + first.height
+    for node in nodes:
+        x1, y1 = min(x1, node.x), min(y1, node.y)
+        x2, y2 = max(x2, node.x + node.width), max(y2, node.y + node.height)
+    return x1, y1, x2, y2
+
+
+def class_elements(node):
+    """SVG elements of one class box, in the canvas's drawing order."""
+    x, y = node.x, node.y
+    left, width = number(x), number(node.width)
+    elements = [
+        f'<rect class="box" x="{left}" y="{number(y)}" width="{width}" height="{number(node.height)}"/>',
+        f'<rect class="head" x="{left}" y="{number(y)}" width="{width}" height="{HEADER_HEIGHT}"/>',
+        f'<text class="name" x="{number(x + node.width / 2)}" '
+        f'y="{number(y + NAME_OFFSET + CENTER_BASELINE * NAME_FONT_SIZE * PIXELS_PER_POINT)}">{escape(node.name)}</text>',
+    ]
+    member_x = number(x + MEMBER_INDENT)
+    baseline = TOP_BASELINE * MEMBER_FONT_SIZE * PIXELS_PER_POINT
+    columns = (
+        (y + ATTRIBUTES_OFFSET, node.attributes),
+        (methods_top(y, node.attributes), [method_text(method) for method in node.methods]),
+    )
+    for top, texts in columns:
+        for index, text in enumerate(texts):
+            elements.append(
+                f'<text class="member" x="{member_x}" y="{number(top + LINE_HEIGHT * index + baseline)}">'
+                f'{escape(text)}</text>'
+            )
+    return elements
+
+
+def edge_elements(edge):
+    """SVG elements of one association: its line and the arrow or symbol at its end."""
+    x1, y1, x2, y2 = line_endpoints(edge.source, edge.target)
+    line_class = "line dependency" if edge.kind == "dependency" else "line"
+    elements = [
+        f'<line class="{line_class}" x1="{number(x1)}" y1="{number(y1)}" x2="{number(x2)}" y2="{number(y2)}"/>'
+    ]
+    direction = unit_direction(x1, y1, x2, y2)
+    points = arrow_points(edge.kind, x2, y2, *direction) if direction is not None else None
+    if points is not None:
+        if edge.kind == "association":
+            elements.append(f'<polyline class="line" points="{points_text(points)}"/>')
+        else:
+            fill = "solid" if edge.kind == "composition" else "hollow"
+            elements.append(f'<polygon class="{fill}" points="{points_text(points)}"/>')
+    return elements
+
+
+def iter_svg(diagram, zoom=1.0):
+    """
+    Yield the SVG document of a Diagram in pieces.
+    :param zoom: Output pixels per diagram unit; the drawing itself stays in diagram units.
+    """
+    bounds = diagram_bounds(diagram) or (0, 0, 0, 0)
+    x, y = bounds[0] - MARGIN, bounds[1] - MARGIN
+    width, height = bounds[2] - bounds[0] + 2 * MARGIN, bounds[3] - bounds[1] + 2 * MARGIN
+    yield (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{number(width * zoom)}" height="{number(height * zoom)}" '
+        f'viewBox="{number(x)} {number(y)} {number(width)} {number(height)}">\n'
+    )
+    yield STYLE
+    yield f'<rect x="{number(x)}" y="{number(y)}" width="{number(width)}" height="{number(height)}" fill="#fff"/>\n'
+
+    # Classes first and lines over them, as the editor creates its views
+    chunk = []
+    for node in diagram.classes.values():
+        chunk.extend(class_elements(node))
+        if len(chunk) >= WRITE_CHUNK:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    for edge in diagram.edges:
+        chunk.extend(edge_elements(edge))
+        if len(chunk) >= WRITE_CHUNK:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+    yield "</svg>\n"
+
+
+def write_svg(diagram, file_path, zoom=1.0):
+    """Write a Diagram as an SVG file, streaming the elements."""
+    with open(file_path, "w", encoding="utf-8") as file:
+        for piece in iter_svg(diagram, zoom):
+            file.write(piece)
+
+
+def write_png(svg_path, png_path, scale=1.0):
+    """Convert an SVG file to PNG with CairoSVG."""
+    require_cairosvg()
+    cairosvg.svg2png(url=svg_path, write_to=png_path, scale=scale)
+
+
+def render_diagram(diagram, target_stem, formats=("svg",), zoom=1.0):
+    """
+    Render a Diagram or diagram dict to target_stem plus ".svg" and/or ".png".
+    The PNG is converted from the SVG, which is removed again when only PNG was asked for.
+    :return: List of the written paths.
+    """
+    if isinstance(diagram, dict):
+        diagram = Diagram.from_dict(diagram)
+    if "png" in formats:
+        require_cairosvg()
+    svg_path = target_stem + ".svg"
+    write_svg(diagram, svg_path, zoom)
+    written = [svg_path]
+    if "png" in formats:
+        png_path = target_stem + ".png"
+        # The SVG's size already includes the zoom
+        write_png(svg_path, png_path)
+        written.append(png_path)
+        if "svg" not in formats:
+            os.remove(svg_path)
+            written.remove(svg_path)
+    return written
+
+
+def render_file(source, target_stem, formats=("svg",), zoom=1.0):
+    """Render a diagram file (.json or .umlb); see render_diagram."""
+    return render_diagram(Diagram.from_dict(load_diagram_file(source)), target_stem, formats, zoom)
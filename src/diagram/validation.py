@@ -0,0 +1,341 @@
+"""
+Validation of the class graph of a diagram.
+
+Four kinds of problems are reported, each found in O(V + E):
+
+- "cycle": classes that inherit from each other, directly or indirectly.
+- "multiple_parents": a class with several inheritance parents; code
+  generation only uses the first one.
+- "duplicate_class": a class name defined more than once in a diagram file.
+- "dangling_endpoint": an association naming a class that does not exist.
+
+Duplicates and dangling endpoints can only occur in diagram files, so
+validate_data() checks them on dicts. A Diagram cannot hold them, but it can
+hold cycles and classes with several parents. A Validator tracks both for a
+Diagram and re-validates after each edit. An added inheritance edge is
+checked against the ancestors of its parent only. A removed edge re-splits
+only the cycle it belonged to.
+
+The same graph gives the order code generation emits classes in: every
+parent before its subclasses, otherwise diagram order (inheritance_order).
+
+    python -m src.diagram.validation diagram.json [more.umlb ...]
+"""
+import argparse
+import sys
+
+from .storage import load_diagram_file
+
+INHERITANCE = "inheritance"
+
+
+class Issue:
+    """A problem found in a diagram: its kind, the classes involved and a readable message."""
+
+    __slots__ = ("kind", "classes", "message")
+
+    def __init__(self, kind, classes, message):
+        self.kind = kind
+        self.classes = classes
+        self.message = message
+
+    def __repr__(self):
+        return f"Issue({self.kind!r}, {self.classes!r})"
+
+
+def cycle_issue(names):
+    return Issue("cycle", list(names), f"Inheritance cycle between {', '.join(names)}.")
+
+
+def multiple_parents_issue(name, parents):
+    return Issue(
+        "multiple_parents", [name] + list(parents),
+        f"Class '{name}' has several parents ({', '.join(parents)}); code generation uses {parents[0]}."
+    )
+
+
+def cyclic_components(names, children):
+    """
+    Strongly connected components of the inheritance graph that contain a cycle.
+    Iterative Tarjan, restricted to names.
+    :param names: Nodes to search, in the order components should be discovered.
+    :param children: Function returning the child names of a node.
+    :return: List of sets of names; a single name only when it inherits from itself.
+    """
+    allowed = names if isinstance(names, (set, dict)) else set(names)
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+    counter = 0
+    for root in names:
+        if root in index:
+            continue
+        work = [(root, iter(children(root)))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            for child in successors:
+                if child not in allowed:
+                    continue
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(children(child))))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in children(node):
+                        components.append(component)
+    return components
+
+
+def topological_order(names, parents):
+    """
+    Order names so that every parent comes before its subclasses, otherwise keeping the given order.
+    Classes in a cycle keep the order in which the walk reaches them.
+    :param parents: Dict of name to the list of its parent names.
+    """
+    order = []
+    placed = set()
+    for root in names:
+        if root in placed:
+            continue
+        placed.add(root)
+        root_parents = parents.get(root)
+        if not root_parents or placed.issuperset(root_parents):
+            order.append(root)
+            continue
+        work = [(root, iter(root_parents))]
+        while work:
+            node, pending = work[-1]
+            for parent in pending:
+                if parent not in placed:
+                    placed.add(parent)
+                    work.append((parent, iter(parents.get(parent, ()))))
+                    break
+            else:
+                work.pop()
+                order.append(node)
+    return order
+
+
+def inheritance_parents(associations, names):
+    """Dict of class name to its distinct inheritance parents among names, in diagram order."""
+    parents = {}
+    for assoc in associations:
+        if assoc["type"] == INHERITANCE and assoc["from"] in names and assoc["to"] in names:
+            parents.setdefault(assoc["to"], {})[assoc["from"]] = None
+    return {name: list(found) for name, found in parents.items()}
+
+
+def inheritance_order(names, associations):
+    """Class names with parents before subclasses, otherwise in diagram order."""
+    return topological_order(names, inheritance_parents(associations, names))
+
+
+def validate_data(data):
+    """Return the Issues of a diagram dict."""
+    issues = []
+    counts = {}
+    for cls in data.get("classes", []):
+        counts[cls["name"]] = counts.get(cls["name"], 0) + 1
+    for name, count in counts.items():
+        if count > 1:
+            issues.append(Issue("duplicate_class", [name], f"Class '{name}' is defined {count} times."))
+
+    associations = data.get("associations", [])
+    for number, assoc in enumerate(associations, 1):
+        for end in ("from", "to"):
+            if assoc[end] not in counts:
+                issues.append(Issue(
+                    "dangling_endpoint", [assoc["from"], assoc["to"]],
+                    f"Association {number} ({assoc['type']} {assoc['from']} -> {assoc['to']}) "
+                    f"refers to missing class '{assoc[end]}'."
+                ))
+                break
+
+    parents = inheritance_parents(associations, counts)
+    for name, found in parents.items():
+        if len(found) > 1:
+            issues.append(multiple_parents_issue(name, found))
+    children = {}
+    for name, found in parents.items():
+        for parent in found:
+            children.setdefault(parent, []).append(name)
+    position = {name: number for number, name in enumerate(counts)}
+    for component in cyclic_components(counts, lambda name: children.get(name, ())):
+        issues.append(cycle_issue(sorted(component, key=position.get)))
+    return issues
+
+
+def parent_names(node):
+    """Distinct inheritance parents of a ClassNode, in edge order."""
+    return list(dict.fromkeys(
+        edge.source.name for edge in node.edges if edge.kind == INHERITANCE and edge.target is node
+    ))
+
+
+def child_names(node):
+    return [edge.target.name for edge in node.edges if edge.kind == INHERITANCE and edge.source is node]
+
+
+class Validator:
+    """Keeps the inheritance cycles and multiple-parent classes of a Diagram up to date."""
+
+    def __init__(self, on_change=None):
+        """
+        Initialize a validator; call attach() to start validating a diagram.
+        :param on_change: Optional callback() run after an edit changed the set of problems.
+        """
+        self.on_change = on_change
+        self.diagram = None
+        # Classes with several parents
+        self.multiple_parents = set()
+        # Class name -> set of the classes in its cycle, shared by the members of a cycle
+        self.cycles = {}
+
+    def attach(self, diagram):
+        """Validate a whole diagram and follow its edits, forgetting the previous one."""
+        if self.diagram is not None:
+            self.diagram.unsubscribe(self.on_model_change)
+        self.diagram = diagram
+        diagram.subscribe(self.on_model_change)
+        classes = diagram.classes
+        self.multiple_parents = {name for name, node in classes.items() if len(parent_names(node)) > 1}
+        self.cycles = {}
+        for component in cyclic_components(classes, lambda name: child_names(classes[name])):
+            for name in component:
+                self.cycles[name] = component
+
+    def children(self, name):
+        return child_names(self.diagram.classes[name])
+
+    def on_model_change(self, event, *args):
+        """Diagram listener re-validating the part of the graph an edit touched."""
+        if event in ("add_edge", "remove_edge"):
+            edge = args[0]
+            if edge.kind != INHERITANCE:
+                return
+            changed = self.check_parents(edge.target)
+            if event == "add_edge":
+                changed = self.link(edge.source.name, edge.target.name) or changed
+            else:
+                changed = self.unlink(edge.source.name, edge.target.name) or changed
+        elif event == "remove_class":
+            # Its edges were removed first, so it is in no cycle any more
+            name = args[0].name
+            changed = name in self.multiple_parents
+            self.multiple_parents.discard(name)
+        else:
+            return
+        if changed and self.on_change is not None:
+            self.on_change()
+
+    def check_parents(self, node):
+        """Update whether a class has several parents; returns True if that changed."""
+        several = len(parent_names(node)) > 1
+        if several == (node.name in self.multiple_parents):
+            return False
+        if several:
+            self.multiple_parents.add(node.name)
+        else:
+            self.multiple_parents.discard(node.name)
+        return True
+
+    def link(self, parent, child):
+        """
+        Record the cycle closed by a new parent -> child edge, if any. The new cycle's classes
+        lie on paths from child down to parent, so only the ancestors of parent are searched.
+        """
+        ancestors = {parent}
+        pending = [parent]
+        while pending:
+            for name in parent_names(self.diagram.classes[pending.pop()]):
+                if name not in ancestors:
+                    ancestors.add(name)
+                    pending.append(name)
+        if child not in ancestors:
+            return False
+
+        component = {child}
+        pending = [child]
+        while pending:
+            for name in self.children(pending.pop()):
+                if name in ancestors and name not in component:
+                    component.add(name)
+                    pending.append(name)
+        for name in list(component):
+            component.update(self.cycles.get(name, ()))
+        for name in component:
+            self.cycles[name] = component
+        return True
+
+    def unlink(self, parent, child):
+        """Split the cycle a removed parent -> child edge belonged to into the cycles that remain."""
+        component = self.cycles.get(parent)
+        if component is None or self.cycles.get(child) is not component:
+            return False
+        for name in component:
+            del self.cycles[name]
+        for remaining in cyclic_components(component, self.children):
+            for name in remaining:
+                self.cycles[name] = remaining
+        return True
+
+    def issues(self):
+        """Current Issues: cycles first, then classes with several parents, each sorted by class name."""
+        classes = self.diagram.classes if self.diagram is not None else {}
+        issues = []
+        seen = set()
+        for component in self.cycles.values():
+            if id(component) not in seen:
+                seen.add(id(component))
+                issues.append(cycle_issue(sorted(component)))
+        for name in sorted(self.multiple_parents):
+            issues.append(multiple_parents_issue(name, parent_names(classes[name])))
+        return issues
+
+    def problem_count(self):
+        return len({id(component) for component in self.cycles.values()}) + len(self.multiple_parents)
+
+
+def main(argv=None):
+    """Validate diagram files from the command line; exits with status 1 if any has problems."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.diagram.validation", description="Check UML diagram files for model problems."
+    )
+    parser.add_argument("inputs", nargs="+", help="Diagram files (.json or .umlb).")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.inputs:
+        issues = validate_data(load_diagram_file(path))
+        for issue in issues:
+            print(f"{path}: {issue.kind}: {issue.message}")
+        if issues:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
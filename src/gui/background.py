@@ -0,0 +1,221 @@
+"""
+Run slow operations on worker threads, off the Tk event loop.
+
+Workers never touch Tk. They report progress and results through a queue
+that the event loop drains with after(), so every callback runs on the Tk
+thread. Tasks are cancelled cooperatively: a worker calls task.check()
+between units of work, which raises TaskCancelled once cancel() was called.
+
+Work that reads the diagram receives a plain-dict snapshot taken on the Tk
+thread, so the model can keep changing (drags, scrolling, edits) while the
+worker runs.
+"""
+import os
+import queue
+import threading
+import time
+
+from ..diagram import Diagram
+from ..diagram.storage import load_diagram_file, save_atomic, save_diagram_file
+from ..diagram.svg import render_diagram
+from ..diagram.validation import validate_data
+from ..instrumentation import timed
+from ..models.code_generator import iter_class_fragments
+from ..models.exporter import export_code
+from ..models.python_importer import import_python_tree
+
+# Classes generated between two cancellation checks and progress reports
+CODEGEN_CHUNK = 500
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker by BackgroundTask.check() after the task was cancelled."""
+
+
+class BackgroundTask:
+    """Handle of one background operation, shared by the worker and the Tk thread."""
+
+    def __init__(self, runner, kind, label):
+        self.runner = runner
+        self.kind = kind
+        self.label = label
+        self.fraction = None
+        self.thread = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Raise TaskCancelled if the task was cancelled; called by the worker between units of work."""
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def progress(self, fraction):
+        """Report completion between 0 and 1 from the worker."""
+        self.runner.queue.put(("progress", self, fraction))
+
+
+class BackgroundRunner:
+    """Starts worker threads and delivers their progress and results on the Tk thread."""
+
+    def __init__(self, widget, on_change=None, poll_interval=50):
+        """
+        Initialize the runner.
+        :param widget: Tk widget whose after() polls the result queue.
+        :param on_change: Optional callback() run on the Tk thread whenever a task starts,
+                          reports progress or finishes.
+        :param poll_interval: Milliseconds between two polls of the queue while tasks run.
+        """
+        self.widget = widget
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.queue = queue.Queue()
+        # Running tasks with their (on_done, on_error, on_cancel) callbacks
+        self.tasks = {}
+        self._poll_id = None
+
+    def running(self, kind):
+        """The running task of a kind, or None."""
+        return next((task for task in self.tasks if task.kind == kind), None)
+
+    def submit(self, kind, label, func, *args, on_done=None, on_error=None, on_cancel=None):
+        """
+        Run func(task, *args) on a worker thread. Only one task per kind runs at a time.
+        :param on_done: Optional callback(result) run on the Tk thread after success.
+        :param on_error: Optional callback(exception) run on the Tk thread after a failure.
+        :param on_cancel: Optional callback() run on the Tk thread once a cancelled task stopped,
+                          whether or not it got to finish; its result is discarded.
+        :return: The BackgroundTask, or None when a task of the same kind is already running.
+        """
+        if self.running(kind) is not None:
+            return None
+        task = BackgroundTask(self, kind, label)
+        self.tasks[task] = (on_done, on_error, on_cancel)
+        task.thread = threading.Thread(target=self._work, args=(task, func, args), daemon=True)
+        task.thread.start()
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self.poll)
+        self._changed()
+        return task
+
+    def cancel_all(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def join(self, timeout=None):
+        """
+        Wait for the workers of the running tasks to end, e.g. after cancel_all() before exiting,
+        as a cancelled worker runs on until its next check.
+        :param timeout: Seconds to wait for all of them together; None waits as long as it takes.
+        :return: True when every worker ended.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for task in self.tasks:
+            task.thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(task.thread.is_alive() for task in self.tasks)
+
+    def _work(self, task, func, args):
+        try:
+            self.queue.put(("done", task, func(task, *args)))
+        except TaskCancelled:
+            self.queue.put(("cancelled", task, None))
+        except Exception as e:
+            self.queue.put(("error", task, e))
+
+    def poll(self):
+        """Deliver queued progress and results; keeps polling while tasks are running."""
+        self._poll_id = None
+        changed = False
+        while True:
+            try:
+                status, task, value = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            changed = True
+            if status == "progress":
+                task.fraction = value
+                continue
+            on_done, on_error, on_cancel = self.tasks.pop(task)
+            if status == "error":
+                if on_error is not None:
+                    on_error(value)
+            elif status == "cancelled" or task.cancelled:
+                if on_cancel is not None:
+                    on_cancel()
+            elif on_done is not None:
+                on_done(value)
+        if self.tasks:
+            self._poll_id = self.widget.after(self.poll_interval, self.poll)
+        if changed:
+            self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+
+@timed("generate_code")
+def generate_code_task(task, data, language, cache, changes=None):
+    """Worker: generate code for a diagram snapshot, reporting progress per chunk of classes."""
+    total = max(1, len(data.get("classes", [])))
+    fragments = []
+    for count, (_, fragment) in enumerate(iter_class_fragments(data, language, cache, changes), 1):
+        fragments.append(fragment)
+        if count % CODEGEN_CHUNK == 0:
+            task.check()
+            task.progress(count / total)
+    return "".join(fragments)
+
+
+def export_code_task(task, data, language, output_dir, cache, changes=None):
+    """Worker: export one file per class; cancellation is honoured before any file is written."""
+    task.check()
+    return export_code(data, language, output_dir, cache=cache, changes=changes)
+
+
+def export_image_task(task, data, file_path):
+    """Worker: render a diagram snapshot to an SVG or PNG file, chosen by the file's extension."""
+    stem, extension = os.path.splitext(file_path)
+    task.check()
+    return render_diagram(data, stem, (extension[1:].lower(),))[0]
+
+
+def save_diagram_task(task, data, file_path):
+    """
+    Worker: save a diagram snapshot. The file is written next to its target and moved over it
+    at the end, so a cancelled or failed save leaves the previous file intact.
+    """
+    def write(part_path):
+        save_diagram_file(data, part_path, check=task.check)
+        task.check()
+
+    save_atomic(file_path, write)
+    return file_path
+
+
+def load_diagram_task(task, file_path):
+    """
+    Worker: read a diagram file and build its model; the Tk thread then shows it.
+    Returns (Diagram, validation Issues of the file), since building the model drops
+    duplicate classes and dangling associations.
+    """
+    data = load_diagram_file(file_path)
+    task.check()
+    issues = validate_data(data)
+    task.check()
+    return Diagram.from_dict(data), issues
+
+
+def import_python_task(task, root_dir, cache):
+    """
+    Worker: import a tree of Python sources and build its model; the Tk thread then shows it.
+    Returns (Diagram, import stats) as described by import_python_tree.
+    """
+    data, stats = import_python_tree(root_dir, cache, check=task.check)
+    task.check()
+    return Diagram.from_dict(data), stats
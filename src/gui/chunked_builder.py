@@ -0,0 +1,51 @@
+import time
+
+
+class ChunkedBuilder:
+    """Runs a sequence of small tasks in time-sliced chunks scheduled with after, so Tk stays responsive."""
+
+    def __init__(self, widget, tasks, total, on_progress=None, on_done=None, time_slice=0.02):
+        """
+        Initialize the builder.
+        :param widget: Tk widget whose after() schedules the chunks.
+        :param tasks: Iterable of zero-argument callables, consumed lazily.
+        :param total: Number of tasks, used for progress reporting.
+        :param on_progress: Optional callback(done, total) called after every chunk.
+        :param on_done: Optional callback called once all tasks have run.
+        :param time_slice: Seconds of work per chunk before yielding to the event loop.
+        """
+        self.widget = widget
+        self.tasks = iter(tasks)
+        self.total = total
+        self.done = 0
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.time_slice = time_slice
+        self._after_id = None
+
+    def start(self):
+        self._after_id = self.widget.after_idle(self._run_chunk)
+
+    def cancel(self):
+        """Stop before the remaining tasks run."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _run_chunk(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.time_slice
+        for task in self.tasks:
+            task()
+            self.done += 1
+            if time.perf_counter() >= deadline:
+                break
+        else:
+            if self.on_progress is not None:
+                self.on_progress(self.done, self.total)
+            if self.on_done is not None:
+                self.on_done()
+            return
+        if self.on_progress is not None:
+            self.on_progress(self.done, self.total)
+        self._after_id = self.widget.after(1, self._run_chunk)
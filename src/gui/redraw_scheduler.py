@@ -0,0 +1,72 @@
+import time
+
+from ..instrumentation import timed
+
+
+class RedrawScheduler:
+    """Coalesces box moves and association updates into at most one redraw per frame."""
+
+    def __init__(self, widget, target_fps=60):
+        """
+        Initialize the scheduler.
+        :param widget: Tk widget whose after/after_idle are used to schedule flushes.
+        :param target_fps: Maximum number of redraws per second.
+        """
+        self.widget = widget
+        self.target_fps = target_fps
+        self.pending_moves = {}
+        self.dirty_lines = {}
+        self._after_id = None
+        self._last_flush = 0.0
+
+    @property
+    def frame_interval(self):
+        """Minimum time between two flushes, in seconds."""
+        return 1.0 / max(1, self.target_fps)
+
+    def move(self, box, dx, dy):
+        """Accumulate a move of box, applied on the next flush."""
+        delta = self.pending_moves.get(box)
+        if delta is None:
+            self.pending_moves[box] = [dx, dy]
+        else:
+            delta[0] += dx
+            delta[1] += dy
+        self.schedule()
+
+    def mark_dirty(self, line):
+        """Request a geometry update of an association line on the next flush."""
+        self.dirty_lines[line] = None
+        self.schedule()
+
+    def schedule(self):
+        """Schedule a flush unless one is already pending."""
+        if self._after_id is not None:
+            return
+        delay = self._last_flush + self.frame_interval - time.perf_counter()
+        if delay <= 0:
+            self._after_id = self.widget.after_idle(self.flush)
+        else:
+            self._after_id = self.widget.after(int(delay * 1000) + 1, self.flush)
+
+    @timed("redraw")
+    def flush(self):
+        """Apply all accumulated moves, then update every dirty line once."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._last_flush = time.perf_counter()
+
+        moves, self.pending_moves = self.pending_moves, {}
+        dirty_lines, self.dirty_lines = self.dirty_lines, {}
+        for box, (dx, dy) in moves.items():
+            if dx or dy:
+                box.move(dx, dy)
+        for line in dirty_lines:
+            line.update_line()
+
+    def forget(self, *objects):
+        """Drop pending work for boxes or lines that are being deleted."""
+        for obj in objects:
+            self.pending_moves.pop(obj, None)
+            self.dirty_lines.pop(obj, None)
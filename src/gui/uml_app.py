@@ -1,35 +1,155 @@
+import os
 import tkinter as tk
-from tkinter import simpledialog, messagebox, filedialog
-import json
+from tkinter import simpledialog, messagebox, filedialog, ttk
+from functools import partial
+from ..diagram import ASSOCIATION_TYPES, ClassNode, Diagram
+from ..diagram.geometry import BOX_FILL, BOX_WIDTH, box_height
+from ..diagram.history import DEFAULT_MAX_BYTES, History
+from ..diagram.journal import Journal, claim_journal, discard_journal, replay_journal, set_aside_journal
+from ..diagram.layout import LAYOUT_METHODS, apply_layout, auto_layout
+from ..diagram.search import SearchIndex
+from ..diagram.spatial import GridIndex
+from ..diagram.svg import png_available
+from ..diagram.validation import Validator
+from ..instrumentation import instrumentation, timed
 from ..models.class_box import ClassBox
 from ..models.association_line import AssociationLine
-from ..models.code_generator import generate_code_from_diagram
+from ..models.canvas_registry import CanvasRegistry
+from ..models.codegen_cache import CodegenCache
+from ..models.languages import available_languages, describe_languages, get_backend
+from ..models.python_importer import ImportCache
+from .background import (
+    BackgroundRunner, export_code_task, export_image_task, generate_code_task, import_python_task,
+    load_diagram_task, save_diagram_task
+)
+from .chunked_builder import ChunkedBuilder
+from .redraw_scheduler import RedrawScheduler
+from .viewport import Viewport
+
+DIAGRAM_FILETYPES = [("JSON Files", "*.json"), ("Binary UML Diagrams", "*.umlb")]
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.expanduser("~"), ".uml_editor", "journal.jsonl")
+DEFAULT_CODEGEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".uml_editor", "codegen_cache.json")
+AUTOSAVE_INTERVAL_MS = 1000
+# Seconds quit() waits for cancelled workers before leaving without saving the code generation cache
+QUIT_WAIT_SECONDS = 5
 
 class UMLApp:
     """Main application to manage the UML Diagram Editor."""
 
-    def __init__(self, root):
+    def __init__(self, root, target_fps=60, codegen_cache_path=None, journal_path=DEFAULT_JOURNAL_PATH,
+                 history_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the editor.
+        :param root: Tk root window.
+        :param target_fps: Maximum number of redraws per second while dragging.
+        :param codegen_cache_path: Optional file the code generation cache is kept in between sessions.
+        :param journal_path: Edit journal used for autosave and crash recovery; None disables it.
+        :param history_bytes: Approximate memory budget of the undo history.
+        """
         self.root = root
         self.root.title("Modern UML Diagram Editor")
 
-        # Canvas
-        self.canvas = tk.Canvas(root, bg="white", width=900, height=600)
+        # Scrollable canvas
+        self.status = tk.Label(root, anchor="w")
+        self.status.pack(fill=tk.X, side=tk.BOTTOM)
+        # Progress of background operations; only shown while one runs
+        self.progress_frame = tk.Frame(root)
+        self.progress_label = tk.Label(self.progress_frame, anchor="w")
+        self.progress_label.pack(side=tk.LEFT, padx=5)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, length=200)
+        self.progress_bar.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.progress_frame, text="Cancel", command=self.cancel_background).pack(side=tk.LEFT, padx=5)
+        x_scrollbar = tk.Scrollbar(root, orient=tk.HORIZONTAL, command=self.on_xscroll)
+        x_scrollbar.pack(fill=tk.X, side=tk.BOTTOM)
+        y_scrollbar = tk.Scrollbar(root, orient=tk.VERTICAL, command=self.on_yscroll)
+        y_scrollbar.pack(fill=tk.Y, side=tk.RIGHT)
+        self.canvas = tk.Canvas(
+            root, bg="white", width=900, height=600,
+            xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set
+        )
         self.canvas.pack(fill=tk.BOTH, expand=True)
-
-        self.class_boxes = []
-        self.associations = []
-
-        # Dragging data
-        self.drag_data = {"item": None, "start_x": 0, "start_y": 0}
+        self._setup_state(target_fps, codegen_cache_path, journal_path, history_bytes)
 
         # Event bindings
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
         self.canvas.bind("<Button-3>", self.delete_item)  # Right-click to delete items
+        self.canvas.bind("<ButtonPress-2>", lambda event: self.canvas.scan_mark(event.x, event.y))
+        self.canvas.bind("<B2-Motion>", self.on_pan)
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-4>", self.on_mouse_wheel)
+        self.canvas.bind("<Button-5>", self.on_mouse_wheel)
+        self.canvas.bind("<Configure>", lambda event: self.schedule_viewport_refresh())
+        self.root.bind("<Control-z>", lambda event: self.undo())
+        self.root.bind("<Control-y>", lambda event: self.redo())
+        self.root.bind("<Control-Shift-Z>", lambda event: self.redo())
+        self.root.bind("<Control-f>", lambda event: self.show_find_dialog())
 
         # UI setup
         self._setup_ui()
 
+    def _setup_state(self, target_fps, codegen_cache_path, journal_path, history_bytes):
+        """
+        Create the model, its listeners and the view bookkeeping; everything but the widgets.
+        Needs self.root, self.canvas and self.status; parameters as for __init__.
+        """
+        self.viewport = Viewport(self.canvas)
+        self._viewport_refresh_id = None
+
+        # The diagram model is the source of truth; boxes and lines are views over it
+        self.diagram = Diagram()
+        self.diagram.subscribe(self.on_model_change)
+        self.history = History(history_bytes)
+        self.history.attach(self.diagram)
+        self.search_index = SearchIndex()
+        self.search_index.attach(self.diagram)
+        # Name of the class outlined as the current search result
+        self.highlighted = None
+        self.validator = Validator(on_change=self.show_problem_count)
+        self.validator.attach(self.diagram)
+        # Problems of the loaded file that the model cannot hold (duplicates, dangling associations)
+        self.file_issues = []
+        self.class_boxes = {}
+        self.association_lines = {}
+        # Canvas items standing for the occupied cells of the spatial index when boxes are too small to draw
+        self.cell_items = []
+        self.registry = CanvasRegistry()
+        self.builder = None
+
+        # Dragging data
+        self.drag_data = {"item": None, "start_x": 0, "start_y": 0}
+        self.scheduler = RedrawScheduler(self.root, target_fps)
+        self.codegen_cache = CodegenCache(path=codegen_cache_path)
+        self.codegen_cache.attach(self.diagram)
+        self.import_cache = ImportCache()
+        self.background = BackgroundRunner(self.root, on_change=self.update_progress)
+        # A running save holds quit() back until it ends
+        self.save_task = None
+        self.quit_requested = False
+
+        # Autosave journal in a slot of its own. A journal an earlier session left in that slot
+        # is set aside and offered for recovery, while this session journals from the start.
+        # A journal that cannot be written turns autosave off with a warning rather than failing.
+        self.journal = None
+        self.journal_lock = None
+        if journal_path:
+            try:
+                journal_path, self.journal_lock = claim_journal(journal_path)
+                if journal_path:
+                    left_journal = set_aside_journal(journal_path)
+                    self.journal = Journal(journal_path)
+                    self.journal.attach(self.diagram)
+            except OSError as e:
+                self.journal_failed(e)
+                return
+            if self.journal_lock is None:
+                self.journal_failed(None)
+                return
+            self.journal.on_error = self.journal_failed
+            if left_journal is not None:
+                self.root.after_idle(self.offer_recovery, left_journal)
+            self.root.after(AUTOSAVE_INTERVAL_MS, self.autosave)
+
     def _setup_ui(self):
         """Set up the user interface with a menu bar."""
         menu_bar = tk.Menu(self.root)
@@ -37,18 +157,184 @@ class UMLApp:
         # File Menu
         file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Generate Code", command=self.generate_code)
+        file_menu.add_command(label="Export Code...", command=self.export_code)
+        file_menu.add_command(label="Export Image...", command=self.export_image)
         file_menu.add_command(label="Save Diagram", command=self.save_diagram)
         file_menu.add_command(label="Load Diagram", command=self.load_diagram)
-        file_menu.add_command(label="Quit", command=self.root.quit)
+        file_menu.add_command(label="Import Python Sources...", command=self.import_python_sources)
+        file_menu.add_command(label="Quit", command=self.quit)
         menu_bar.add_cascade(label="File", menu=file_menu)
 
         # Edit Menu
         edit_menu = tk.Menu(menu_bar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        edit_menu.add_separator()
         edit_menu.add_command(label="Add Class", command=self.add_class)
         edit_menu.add_command(label="Add Association", command=self.add_association)
+        edit_menu.add_command(label="Find...", accelerator="Ctrl+F", command=self.show_find_dialog)
+        edit_menu.add_command(label="Validate Model...", command=self.show_validation)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Auto Layout...", command=self.auto_layout)
         menu_bar.add_cascade(label="Edit", menu=edit_menu)
 
+        # View Menu
+        view_menu = tk.Menu(menu_bar, tearoff=0)
+        view_menu.add_command(label="Zoom In", command=lambda: self.set_zoom(self.viewport.zoom * 1.25))
+        view_menu.add_command(label="Zoom Out", command=lambda: self.set_zoom(self.viewport.zoom / 1.25))
+        view_menu.add_command(label="Reset Zoom", command=lambda: self.set_zoom(1.0))
+        view_menu.add_separator()
+        view_menu.add_command(label="Frame Rate...", command=self.set_frame_rate)
+        view_menu.add_command(label="Code Generation Cache...", command=self.show_codegen_cache_stats)
+
+        # Instrumentation submenu
+        self.instrumentation_enabled = tk.BooleanVar(value=instrumentation.enabled)
+        instrument_menu = tk.Menu(view_menu, tearoff=0)
+        instrument_menu.add_checkbutton(
+            label="Enable Instrumentation", variable=self.instrumentation_enabled,
+            command=self.toggle_instrumentation
+        )
+        instrument_menu.add_command(label="Statistics...", command=self.show_instrumentation_stats)
+        instrument_menu.add_command(label="Start Profiling", command=instrumentation.start_profile)
+        instrument_menu.add_command(label="Stop Profiling...", command=self.stop_profiling)
+        view_menu.add_cascade(label="Instrumentation", menu=instrument_menu)
+        menu_bar.add_cascade(label="View", menu=view_menu)
+
         self.root.config(menu=menu_bar)
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+
+    def offer_recovery(self, path):
+        """Offer to restore the edits recorded by the journal an earlier session left at path."""
+        if messagebox.askyesno("Recover", "Unsaved changes from a previous session were found. Restore them?"):
+            try:
+                diagram = replay_journal(path)
+            except (OSError, ValueError, KeyError) as e:
+                messagebox.showerror("Error", f"Could not read the journal: {e}")
+            else:
+                # Journals the restored diagram, so the left journal is no longer needed
+                self.set_diagram(diagram, incremental=True)
+                if self.journal is not None:
+                    self.journal.dirty = True
+        discard_journal(path)
+
+    def autosave(self):
+        """Flush the journal, compacting it when it grew large, and reschedule while it records."""
+        if self.journal is None:
+            return
+        self.journal.flush()
+        self.root.after(AUTOSAVE_INTERVAL_MS, self.autosave)
+
+    def journal_failed(self, error):
+        """
+        Turn autosave off after the journal could not be claimed or written, and warn about it.
+        :param error: The OSError, or None when every journal slot is held by another editor.
+        """
+        self.journal = None
+        if self.journal_lock is not None:
+            self.journal_lock.release()
+            self.journal_lock = None
+        reason = f"the journal could not be written ({error})" if error else "every journal slot is in use"
+        self.root.after_idle(
+            messagebox.showwarning, "Autosave Off", f"Autosave and crash recovery are off: {reason}."
+        )
+
+    def quit(self):
+        """
+        Cancel background operations and wait for their workers, persist the code generation
+        cache, if configured, close the journal and leave the main loop. While a save runs, the
+        other operations are cancelled and quitting waits for the save to end.
+        """
+        if self.save_task is not None:
+            self.quit_requested = True
+            for task in self.background.tasks:
+                if task is not self.save_task:
+                    task.cancel()
+            self.status.config(text="Finishing the save before quitting...")
+            return
+        self.background.cancel_all()
+        # Code generation and export workers fill the cache until they stop
+        stopped = self.background.join(QUIT_WAIT_SECONDS)
+        if self.journal is not None:
+            try:
+                self.journal.close()
+            except OSError:
+                pass
+        if self.journal_lock is not None:
+            self.journal_lock.release()
+        if self.codegen_cache.path and stopped:
+            try:
+                self.codegen_cache.save()
+            except OSError as e:
+                messagebox.showerror("Error", f"Could not save the code generation cache: {e}")
+        self.root.quit()
+
+    def show_codegen_cache_stats(self):
+        """Show the hit/miss counters of the code generation cache."""
+        stats = self.codegen_cache.stats()
+        messagebox.showinfo(
+            "Code Generation Cache",
+            f"Hits: {stats['hits']}\nMisses: {stats['misses']}\nEvictions: {stats['evictions']}\n"
+            f"Cached classes: {stats['size']}\nHit rate: {stats['hit_rate']:.0%}"
+        )
+
+    def toggle_instrumentation(self):
+        """Switch the hot-path timers and counters on or off."""
+        if self.instrumentation_enabled.get():
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def show_instrumentation_stats(self):
+        """Show the instrumentation timers and counters in a window that can refresh, reset and export them."""
+        stats_window = tk.Toplevel(self.root)
+        stats_window.title("Instrumentation")
+
+        text_widget = tk.Text(stats_window, wrap=tk.NONE, font=("Courier", 10), width=70, height=20)
+        text_widget.pack(fill=tk.BOTH, expand=True)
+
+        def refresh():
+            text_widget.configure(state=tk.NORMAL)
+            text_widget.delete("1.0", tk.END)
+            text_widget.insert(tk.END, instrumentation.report())
+            text_widget.insert(tk.END, f"\n{'live canvas items':<28}{len(self.registry.owners):>8}\n")
+            if not instrumentation.enabled:
+                text_widget.insert(tk.END, "\nInstrumentation is off; enable it from View > Instrumentation.\n")
+            text_widget.configure(state=tk.DISABLED)
+
+        def reset():
+            instrumentation.reset()
+            refresh()
+
+        def save():
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json", filetypes=[("JSON Files", "*.json")], title="Save Statistics"
+            )
+            if file_path:
+                instrumentation.dump(file_path)
+
+        buttons = tk.Frame(stats_window)
+        buttons.pack(pady=5)
+        tk.Button(buttons, text="Refresh", command=refresh).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Reset", command=reset).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Save JSON...", command=save).pack(side=tk.LEFT, padx=5)
+        refresh()
+
+    def stop_profiling(self):
+        """Stop the cProfile capture, optionally save it, and show the most expensive calls."""
+        if not instrumentation.profiling:
+            messagebox.showerror("Error", "Profiling is not running. Start it from View > Instrumentation first.")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".prof", filetypes=[("Profile Data", "*.prof")], title="Save Profile (optional)"
+        )
+        report = instrumentation.stop_profile(file_path or None)
+
+        profile_window = tk.Toplevel(self.root)
+        profile_window.title("Profile")
+        text_widget = tk.Text(profile_window, wrap=tk.NONE, font=("Courier", 10))
+        text_widget.insert(tk.END, report)
+        text_widget.configure(state=tk.DISABLED)
+        text_widget.pack(fill=tk.BOTH, expand=True)
 
     def add_class(self):
         """Add a new class box."""
@@ -59,75 +345,229 @@ class UMLApp:
         if class_name:
             attr_list = [attr.strip() for attr in attributes.split(",")] if attributes else []
             method_list = [method.strip() for method in methods.split(",")] if methods else []
-            box = ClassBox(self.canvas, 100, 100, class_name, attr_list, method_list)
-            self.class_boxes.append(box)
+            x, y = self.viewport.free_spot(BOX_WIDTH, box_height(attr_list, method_list))
+            try:
+                self.diagram.add_class(ClassNode(class_name, attr_list, method_list, x, y))
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+
+    def auto_layout(self):
+        """Reposition every class with the layered or force-directed layout."""
+        if not self.diagram.classes:
+            return
+        method = simpledialog.askstring(
+            "Auto Layout",
+            "Enter layout (layered: inheritance hierarchies top-down, force: by associations):",
+            initialvalue="layered"
+        )
+        if method is None:
+            return
+        if method not in LAYOUT_METHODS:
+            messagebox.showerror("Error", f"Invalid layout. Choose {' or '.join(LAYOUT_METHODS)}.")
+            return
+
+        try:
+            positions = auto_layout(self.diagram, method)
+        except Exception as e:
+            messagebox.showerror("Error", f"Auto layout failed: {e}")
+            return
+        with self.history.step():
+            apply_layout(self.diagram, positions)
+        self.scheduler.flush()
+        self.viewport.update_scrollregion()
+        self.schedule_viewport_refresh()
+
+    def set_frame_rate(self):
+        """Ask for the maximum number of redraws per second while dragging."""
+        fps = simpledialog.askinteger(
+            "Frame Rate", "Maximum redraws per second while dragging:",
+            initialvalue=self.scheduler.target_fps, minvalue=1, maxvalue=240
+        )
+        if fps:
+            self.scheduler.target_fps = fps
 
     def add_association(self):
         """Add an association line between two classes."""
-        if len(self.class_boxes) < 2:
+        if len(self.diagram) < 2:
             messagebox.showerror("Error", "You need at least two classes to create an association.")
             return
 
-        box_names = [box.class_name for box in self.class_boxes]
-        box1_name = simpledialog.askstring("Class Selection", f"Select the first class:\n{', '.join(box_names)}")
-        box2_name = simpledialog.askstring("Class Selection", f"Select the second class:\n{', '.join(box_names)}")
+        box1_name = self.ask_class_name("Select the first class:")
+        box2_name = self.ask_class_name("Select the second class:") if box1_name else None
 
-        box1 = next((box for box in self.class_boxes if box.class_name == box1_name), None)
-        box2 = next((box for box in self.class_boxes if box.class_name == box2_name), None)
-
-        if box1 and box2:
+        if box1_name in self.diagram and box2_name in self.diagram:
             line_type = simpledialog.askstring(
                 "Line Type",
                 "Enter line type (association, dependency, inheritance, composition, aggregation):"
             )
-            if line_type in {"association", "dependency", "inheritance", "composition", "aggregation"}:
-                line = AssociationLine(self.canvas, box1, box2, line_type)
-                self.associations.append((line, line_type, box1.class_name, box2.class_name))
+            if line_type in ASSOCIATION_TYPES:
+                self.diagram.add_edge(line_type, box1_name, box2_name)
             else:
                 messagebox.showerror("Error", "Invalid line type.")
         else:
             messagebox.showerror("Error", "Class not found.")
 
+    def ask_class_name(self, prompt):
+        """
+        Ask for the name of an existing class. Small diagrams list their classes; otherwise a
+        name that does not exist is looked up in the search index and the best match offered.
+        """
+        names = list(self.diagram.classes)
+        if len(names) <= 20:
+            prompt += f"\n{', '.join(names)}"
+        name = simpledialog.askstring("Class Selection", prompt)
+        if not name or name in self.diagram:
+            return name
+        results = self.search_index.search(name, limit=1)
+        if results and messagebox.askyesno("Class Selection", f"Class '{name}' not found. Use '{results[0][0]}'?"):
+            return results[0][0]
+        return None
+
+    def show_find_dialog(self):
+        """Find classes by class, attribute or method name and jump to them."""
+        find_window = tk.Toplevel(self.root)
+        find_window.title("Find")
+        # Index up front rather than on the first keystroke
+        self.search_index.build()
+
+        query = tk.StringVar()
+        entry = tk.Entry(find_window, textvariable=query, width=50)
+        entry.pack(fill=tk.X, padx=5, pady=5)
+        listbox = tk.Listbox(find_window, width=70, height=20)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=5)
+        summary = tk.Label(find_window, anchor="w")
+        summary.pack(fill=tk.X, padx=5, pady=5)
+        found = []
+
+        def update(*args):
+            found[:] = self.search_index.search(query.get(), limit=200)
+            listbox.delete(0, tk.END)
+            for name, _, matches in found:
+                detail = ", ".join(f"{field} {token}" for token, field in matches.values())
+                listbox.insert(tk.END, f"{name}  ({detail})")
+            summary.config(text=f"{len(found)} classes" + (" (first 200 shown)" if len(found) == 200 else ""))
+
+        def jump(event=None):
+            selection = listbox.curselection()
+            if not selection and found:
+                selection = (0,)
+            if selection:
+                self.jump_to_class(found[selection[0]][0])
+
+        query.trace_add("write", update)
+        listbox.bind("<<ListboxSelect>>", jump)
+        entry.bind("<Return>", jump)
+        entry.focus_set()
+
+    def show_problem_count(self):
+        """Show the number of model problems in the status bar, or clear it."""
+        count = self.validator.problem_count() + len(self.file_issues)
+        self.status.config(text=f"{count} model problems; see Edit > Validate Model." if count else "")
+
+    def show_validation(self):
+        """List the problems of the model; double-click one to jump to its first class."""
+        issues = self.file_issues + self.validator.issues()
+        validation_window = tk.Toplevel(self.root)
+        validation_window.title("Validate Model")
+
+        listbox = tk.Listbox(validation_window, width=90, height=20)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        for issue in issues:
+            listbox.insert(tk.END, issue.message)
+        if not issues:
+            listbox.insert(tk.END, "No problems found.")
+
+        def jump(event):
+            selection = listbox.curselection()
+            if selection and issues:
+                name = next((name for name in issues[selection[0]].classes if name in self.diagram), None)
+                if name is not None:
+                    self.jump_to_class(name)
+
+        listbox.bind("<Double-1>", jump)
+
+    def jump_to_class(self, name):
+        """Scroll a class into the middle of the window and highlight it."""
+        node = self.diagram.get(name)
+        if node is None:
+            return
+        self.scheduler.flush()
+        self.viewport.center_on(node.x + node.width / 2, node.y + node.height / 2)
+        self.highlight_class(name)
+        self.refresh_viewport()
+
+    def highlight_class(self, name):
+        """Outline one class box, removing the outline from the previously highlighted one."""
+        previous = self.class_boxes.get(self.highlighted)
+        if previous is not None:
+            previous.set_highlight(False)
+        self.highlighted = name
+        box = self.class_boxes.get(name)
+        if box is not None:
+            box.set_highlight(True)
+
+    def ask_language(self, title):
+        """Ask for a code generation language; returns None after reporting an invalid choice."""
+        language = simpledialog.askstring(
+            title, f"Enter target language ({', '.join(available_languages())}):"
+        )
+        if language not in available_languages():
+            messagebox.showerror("Error", f"Invalid language. Choose {describe_languages()}.")
+            return None
+        return language
+
     def generate_code(self):
         """Generate and display code for all classes."""
-        language = simpledialog.askstring(
-            "Code Generation", "Enter target language (python, java, php):"
+        language = self.ask_language("Code Generation")
+        if language is None:
+            return
+
+        self.start_background(
+            "codegen", f"Generating {language} code", generate_code_task,
+            self.diagram.to_dict(include_positions=False), language, self.codegen_cache,
+            self.codegen_cache.change_numbers(),
+            on_done=lambda code: self.display_code_in_window(code, language),
+            on_error=lambda e: messagebox.showerror("Error", f"Code generation failed: {e}")
         )
-        if language not in {"python", "java", "php"}:
-            messagebox.showerror("Error", "Invalid language. Choose python, java, or php.")
+
+    def export_code(self):
+        """Generate one source file per class into a chosen directory."""
+        language = self.ask_language("Export Code")
+        if language is None:
+            return
+        output_dir = filedialog.askdirectory(title="Export Code To")
+        if not output_dir:
             return
 
-        # Prepare data for code generation
-        diagram_data = {
-            "classes": [
-                {
-                    "name": box.class_name,
-                    "attributes": box.attributes,
-                    "methods": box.methods
-                } for box in self.class_boxes
-            ],
-            "associations": [
-                {
-                    "type": assoc[1],
-                    "from": assoc[2],
-                    "to": assoc[3]
-                } for assoc in self.associations
-            ]
-        }
-
-        # Save diagram data to a temporary JSON file for the generator
-        try:
-            with open("temp_diagram.json", "w") as temp_file:
-                json.dump(diagram_data, temp_file, indent=4)
+        data = self.diagram.to_dict(include_positions=False)
+        self.start_background(
+            "codegen", f"Exporting {language} code", export_code_task, data, language, output_dir,
+            self.codegen_cache, self.codegen_cache.change_numbers(),
+            on_done=lambda result: messagebox.showinfo(
+                "Success",
+                f"Exported {len(data['classes'])} classes to {output_dir}\n"
+                f"Written: {len(result['written'])}\nUnchanged: {len(result['unchanged'])}"
+            ),
+            on_error=lambda e: messagebox.showerror("Error", f"Code export failed: {e}")
+        )
 
-            # Generate the code
-            code_output = generate_code_from_diagram("temp_diagram.json", language)
-        except Exception as e:
-            messagebox.showerror("Error", f"Code generation failed: {e}")
+    def export_image(self):
+        """Render the whole diagram to an SVG file, or to PNG when CairoSVG is installed."""
+        filetypes = [("SVG Images", "*.svg")]
+        if png_available():
+            filetypes.append(("PNG Images", "*.png"))
+        file_path = filedialog.asksaveasfilename(defaultextension=".svg", filetypes=filetypes, title="Export Image")
+        if not file_path:
+            return
+        if not file_path.lower().endswith((".svg", ".png")):
+            messagebox.showerror("Error", "Choose a file name ending in .svg or .png.")
             return
 
-        # Display the generated code
-        self.display_code_in_window(code_output, language)
+        self.start_background(
+            "render", "Rendering image", export_image_task, self.diagram.to_dict(), file_path,
+            on_done=lambda path: messagebox.showinfo("Success", f"Image successfully saved to {path}"),
+            on_error=lambda e: messagebox.showerror("Error", f"Could not export the image: {e}")
+        )
 
     def display_code_in_window(self, code, language):
         """Display the generated code in a new Tkinter window."""
@@ -144,9 +584,10 @@ class UMLApp:
 
     def save_code_to_file(self, code, language):
         """Save the generated code to a file."""
+        extension = get_backend(language).extension
         file_path = filedialog.asksaveasfilename(
-            defaultextension=f".{language}",
-            filetypes=[(f"{language.capitalize()} Files", f"*.{language}")],
+            defaultextension=extension,
+            filetypes=[(f"{language.capitalize()} Files", f"*{extension}")],
             title="Save Generated Code"
         )
         if file_path:
@@ -155,105 +596,433 @@ class UMLApp:
             messagebox.showinfo("Success", f"Code successfully saved to {file_path}")
 
     def save_diagram(self):
-        """Save the current diagram to a JSON file."""
+        """Save the current diagram to a JSON or binary (.umlb) file."""
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON Files", "*.json")],
+            filetypes=DIAGRAM_FILETYPES,
             title="Save Diagram"
         )
-        if file_path:
-            data = {
-                "classes": [
-                    {
-                        "name": box.class_name,
-                        "attributes": box.attributes,
-                        "methods": box.methods,
-                        "position": self.canvas.coords(box.box_id)
-                    } for box in self.class_boxes
-                ],
-                "associations": [
-                    {
-                        "type": assoc[1],
-                        "from": assoc[2],
-                        "to": assoc[3]
-                    } for assoc in self.associations
-                ]
-            }
-            with open(file_path, "w") as file:
-                json.dump(data, file, indent=4)
-            messagebox.showinfo("Success", f"Diagram successfully saved to {file_path}")
+        if not file_path:
+            return
+
+        # The journal is clean only once the file is written, and only if nothing changed since the snapshot
+        edits = self.journal.edits if self.journal is not None else None
+
+        def finished():
+            self.save_task = None
+            if self.quit_requested:
+                self.quit()
+
+        def saved(path):
+            if self.journal is not None:
+                self.journal.mark_saved(edits)
+            finished()
+            if not self.quit_requested:
+                messagebox.showinfo("Success", f"Diagram successfully saved to {path}")
+
+        def failed(e):
+            self.quit_requested = False
+            finished()
+            messagebox.showerror("Error", f"Could not save the diagram: {e}")
+
+        def cancelled():
+            self.status.config(text="Save cancelled; the diagram was not saved.")
+            finished()
+
+        self.save_task = self.start_background(
+            "file", "Saving diagram", save_diagram_task, self.diagram.to_dict(), file_path,
+            on_done=saved, on_error=failed, on_cancel=cancelled
+        )
 
     def load_diagram(self):
-        """Load a diagram from a JSON file."""
+        """Load a diagram from a JSON or binary (.umlb) file."""
         file_path = filedialog.askopenfilename(
             defaultextension=".json",
-            filetypes=[("JSON Files", "*.json")],
+            filetypes=DIAGRAM_FILETYPES,
             title="Load Diagram"
         )
-        if file_path:
-            with open(file_path, "r") as file:
-                data = json.load(file)
-
-            for box in self.class_boxes:
-                box.delete()
-            self.class_boxes.clear()
-            for assoc, _, _, _ in self.associations:
-                assoc.delete()
-            self.associations.clear()
-
-            for cls in data["classes"]:
-                box = ClassBox(
-                    self.canvas,
-                    cls["position"][0],
-                    cls["position"][1],
-                    cls["name"],
-                    cls["attributes"],
-                    cls["methods"]
-                )
-                self.class_boxes.append(box)
-
-            for assoc in data["associations"]:
-                box1 = next((box for box in self.class_boxes if box.class_name == assoc["from"]), None)
-                box2 = next((box for box in self.class_boxes if box.class_name == assoc["to"]), None)
-                if box1 and box2:
-                    line = AssociationLine(self.canvas, box1, box2, assoc["type"])
-                    self.associations.append((line, assoc["type"], assoc["from"], assoc["to"]))
-
-            messagebox.showinfo("Success", "Diagram successfully loaded.")
+        if not file_path:
+            return
+
+        def loaded(result):
+            diagram, issues = result
+            self.set_diagram(diagram, incremental=True, on_done=lambda: show_success(issues))
+            self.file_issues = [issue for issue in issues if issue.kind in ("duplicate_class", "dangling_endpoint")]
+
+        def show_success(issues):
+            message = "Diagram successfully loaded."
+            if issues:
+                message += f"\n{len(issues)} problems were found; see Edit > Validate Model."
+            messagebox.showinfo("Success", message)
+
+        self.start_background(
+            "file", "Loading diagram", load_diagram_task, file_path, on_done=loaded,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not load the diagram: {e}")
+        )
+
+    def start_background(self, kind, label, func, *args, on_done=None, on_error=None, on_cancel=None):
+        """Run func on a worker thread, unless an operation of the same kind is still running."""
+        task = self.background.submit(
+            kind, label, func, *args, on_done=on_done, on_error=on_error, on_cancel=on_cancel
+        )
+        if task is None:
+            running = self.background.running(kind)
+            messagebox.showinfo("Busy", f"{running.label} is still running. Wait for it or cancel it first.")
+        return task
+
+    def cancel_background(self):
+        """Cancel the running background operations; their results are discarded."""
+        self.background.cancel_all()
+        self.update_progress()
+
+    def update_progress(self):
+        """Show, update or hide the progress indicator of background operations."""
+        tasks = list(self.background.tasks)
+        if not tasks:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", value=0)
+            self.progress_frame.pack_forget()
+            return
+        if not self.progress_frame.winfo_manager():
+            self.progress_frame.pack(fill=tk.X, side=tk.BOTTOM, after=self.status)
+        if all(task.cancelled for task in tasks):
+            self.progress_label.config(text="Cancelling...")
+        else:
+            self.progress_label.config(text=", ".join(task.label for task in tasks) + "...")
+        fraction = tasks[0].fraction if len(tasks) == 1 else None
+        if fraction is None:
+            if str(self.progress_bar.cget("mode")) != "indeterminate":
+                self.progress_bar.config(mode="indeterminate")
+                self.progress_bar.start(20)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode="determinate", value=fraction * 100)
+
+    def import_python_sources(self):
+        """Build a diagram from the classes of a directory of Python files."""
+        root_dir = filedialog.askdirectory(title="Import Python Sources")
+        if not root_dir:
+            return
+
+        def imported(result):
+            diagram, stats = result
+            summary = (
+                f"Imported {len(diagram)} classes from {stats['files']} files "
+                f"({stats['parsed']} parsed, {stats['files'] - stats['parsed']} unchanged)."
+            )
+            if stats["errors"]:
+                summary += f"\n{len(stats['errors'])} files could not be parsed, e.g. {stats['errors'][0][0]}."
+            self.set_diagram(diagram, incremental=True, on_done=lambda: messagebox.showinfo("Success", summary))
+
+        # Shares the "file" kind with load and save, so one worker at a time uses the import cache
+        self.start_background(
+            "file", "Importing Python sources", import_python_task, root_dir, self.import_cache, on_done=imported,
+            on_error=lambda e: messagebox.showerror("Error", f"Import failed: {e}")
+        )
+
+    def set_diagram(self, diagram, incremental=False, on_done=None):
+        """
+        Replace the current diagram model and rebuild the canvas views for it.
+        :param incremental: Build the views in time-sliced chunks, keeping the window responsive.
+        :param on_done: Optional callback run once every view has been built.
+        """
+        if self.builder is not None:
+            self.builder.cancel()
+            self.builder = None
+        self.diagram.unsubscribe(self.on_model_change)
+        self.clear_views()
+
+        self.diagram = diagram
+        diagram.subscribe(self.on_model_change)
+        self.history.attach(diagram)
+        self.search_index.attach(diagram)
+        self.codegen_cache.attach(diagram)
+        self.highlighted = None
+        self.validator.attach(diagram)
+        self.file_issues = []
+        if self.journal is not None:
+            self.journal.attach(diagram)
+        self.viewport.index = GridIndex()
+        for node in diagram.classes.values():
+            self.viewport.index.insert(node.name, node.position())
+        self.viewport.update_scrollregion()
+        self.refresh_viewport(incremental=incremental, on_done=on_done)
+
+    def refresh_viewport(self, incremental=False, on_done=None):
+        """
+        Materialize views for the classes intersecting the visible area and the
+        associations touching them, and drop the views that scrolled out of it.
+        :param incremental: Build the missing views in time-sliced chunks.
+        :param on_done: Optional callback run once every view has been built.
+        """
+        self._viewport_refresh_id = None
+        if self.builder is not None:
+            # Keep a chunked build going over the new visible set
+            self.builder.cancel()
+            incremental = True
+            on_done = on_done or self.builder.on_done
+            self.builder = None
+        self.delete_cell_views()
+        if self.viewport.detail() == "cells":
+            visible = set()
+            self.create_cell_views()
+        else:
+            visible = self.viewport.visible_keys()
+        if self.drag_data["item"] is not None:
+            visible.add(self.drag_data["item"].class_name)
+        edges = set()
+        if self.viewport.shows_lines():
+            edges = {edge for name in visible for edge in self.diagram.classes[name].edges}
+
+        for name in [name for name in self.class_boxes if name not in visible]:
+            self.delete_class_view(name)
+        for edge in [edge for edge in self.association_lines if edge not in edges]:
+            self.delete_association_view(edge)
+
+        tasks = self.view_build_tasks(self.diagram, visible, edges)
+        if not incremental:
+            for task in tasks:
+                task()
+            if on_done is not None:
+                on_done()
+            return
+
+        def finish():
+            self.builder = None
+            self.show_problem_count()
+            if on_done is not None:
+                on_done()
+
+        self.builder = ChunkedBuilder(
+            self.root, tasks, len(visible) + len(edges),
+            on_progress=self.show_load_progress, on_done=finish
+        )
+        self.builder.start()
+
+    def create_cell_views(self):
+        """Draw one rectangle per visible cell of the spatial index holding a class."""
+        z = self.viewport.zoom
+        for x1, y1, x2, y2 in self.viewport.visible_cells():
+            self.cell_items.append(self.canvas.create_rectangle(
+                x1 * z, y1 * z, x2 * z, y2 * z, fill=BOX_FILL, outline="gray"
+            ))
+
+    def delete_cell_views(self):
+        for item in self.cell_items:
+            self.canvas.delete(item)
+        self.cell_items = []
+
+    def schedule_viewport_refresh(self):
+        """Refresh the materialized views once the event loop is idle."""
+        if self._viewport_refresh_id is None:
+            self._viewport_refresh_id = self.root.after_idle(self.refresh_viewport)
+
+    def view_build_tasks(self, diagram, names, edges):
+        """
+        Yield one task per class and association view still missing from the canvas.
+        Views are checked when the task is reached, so edits made while a chunked
+        build is in progress are honoured.
+        """
+        def build_class(name):
+            node = diagram.classes.get(name)
+            if node is not None and name not in self.class_boxes:
+                self.create_class_view(node)
+
+        def build_association(edge):
+            if edge in diagram.edges and edge not in self.association_lines:
+                self.create_association_view(edge)
+
+        for name in names:
+            yield partial(build_class, name)
+        for edge in edges:
+            yield partial(build_association, edge)
+
+    def show_load_progress(self, done, total):
+        """Show the progress of a chunked load in the status bar."""
+        percent = 100 * done // total if total else 100
+        self.status.config(text=f"Loading diagram... {done}/{total} ({percent}%)")
+
+    def on_model_change(self, event, *args):
+        """Keep the spatial index and the canvas views in sync with a change of the diagram model."""
+        index = self.viewport.index
+        cells = self.viewport.detail() == "cells"
+        if cells and event in ("add_class", "remove_class", "set_members", "move_class"):
+            # The occupied cells may change; they are redrawn as a whole, bounded by the window
+            self.schedule_viewport_refresh()
+        if event == "add_class":
+            node = args[0]
+            index.insert(node.name, node.position())
+            self.viewport.extend_scrollregion(node.position())
+            if not cells:
+                self.create_class_view(node)
+        elif event == "remove_class":
+            index.remove(args[0].name)
+            self.delete_class_view(args[0].name)
+        elif event == "add_edge":
+            edge = args[0]
+            if self.viewport.shows_lines() and (
+                    edge.source.name in self.class_boxes or edge.target.name in self.class_boxes):
+                self.create_association_view(edge)
+        elif event == "remove_edge":
+            self.delete_association_view(args[0])
+        elif event == "set_members":
+            node = args[0]
+            index.update(node.name, node.position())
+            self.viewport.extend_scrollregion(node.position())
+            box = self.class_boxes.get(node.name)
+            if box is not None:
+                box.update_members(node.attributes, node.methods)
+            self.mark_lines_dirty(node)
+        elif event == "move_class":
+            node, dx, dy = args
+            index.update(node.name, node.position())
+            self.viewport.extend_scrollregion(node.position())
+            box = self.class_boxes.get(node.name)
+            if box is not None:
+                self.scheduler.move(box, dx, dy)
+            self.mark_lines_dirty(node)
+
+    def mark_lines_dirty(self, node):
+        """Re-route the materialized lines touching a class on the next redraw."""
+        for edge in node.edges:
+            line = self.association_lines.get(edge)
+            if line is not None:
+                self.scheduler.mark_dirty(line)
+
+    def create_class_view(self, node):
+        """Create the ClassBox showing a ClassNode."""
+        box = ClassBox(
+            self.canvas, node.x, node.y, node.name, node.attributes, node.methods,
+            registry=self.registry, on_edit=self.edit_class,
+            zoom=self.viewport.zoom, detail=self.viewport.detail()
+        )
+        self.class_boxes[node.name] = box
+        if node.name == self.highlighted:
+            box.set_highlight(True)
+        return box
+
+    def delete_class_view(self, name):
+        """Remove the ClassBox of a class from the canvas, if it is materialized."""
+        box = self.class_boxes.pop(name, None)
+        if box is not None:
+            self.scheduler.forget(box)
+            box.delete()
+
+    def create_association_view(self, edge):
+        """Create the AssociationLine showing an Edge."""
+        line = AssociationLine(
+            self.canvas, edge.source, edge.target, edge.kind,
+            registry=self.registry, edge=edge, zoom=self.viewport.zoom
+        )
+        self.association_lines[edge] = line
+        return line
+
+    def delete_association_view(self, edge):
+        """Remove the AssociationLine of an edge from the canvas, if it is materialized."""
+        line = self.association_lines.pop(edge, None)
+        if line is not None:
+            self.scheduler.forget(line)
+            line.delete()
+
+    def clear_views(self):
+        """Remove every materialized class, association and cell view from the canvas."""
+        self.delete_cell_views()
+        for edge in list(self.association_lines):
+            self.delete_association_view(edge)
+        for name in list(self.class_boxes):
+            self.delete_class_view(name)
+
+    def set_zoom(self, zoom, anchor_x=None, anchor_y=None):
+        """Zoom around a window position (the window centre by default) and redraw at the new scale."""
+        if anchor_x is None:
+            anchor_x, anchor_y = self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2
+        self.scheduler.flush()
+        self.clear_views()
+        self.viewport.set_zoom(zoom, anchor_x, anchor_y)
+        self.refresh_viewport()
+
+    def on_xscroll(self, *args):
+        self.canvas.xview(*args)
+        self.schedule_viewport_refresh()
+
+    def on_yscroll(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_viewport_refresh()
+
+    def on_pan(self, event):
+        """Pan the canvas with the middle mouse button."""
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.schedule_viewport_refresh()
+
+    def on_mouse_wheel(self, event):
+        """Scroll with the wheel, Shift+wheel scrolls sideways and Ctrl+wheel zooms."""
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        if event.state & 0x0004:  # Control
+            self.set_zoom(self.viewport.zoom * (1.25 if up else 0.8), event.x, event.y)
+            return
+        scroll = self.canvas.xview_scroll if event.state & 0x0001 else self.canvas.yview_scroll  # Shift
+        scroll(-3 if up else 3, "units")
+        self.schedule_viewport_refresh()
+
+    def undo(self):
+        """Revert the last edit."""
+        if self.history.undo():
+            self.after_history_change()
+
+    def redo(self):
+        """Re-apply the last undone edit."""
+        if self.history.redo():
+            self.after_history_change()
+
+    def after_history_change(self):
+        """
+        Bring the canvas up to date after undo or redo. The scrollregion already grew with
+        the replayed edits; it is not shrunk, which would scan every class.
+        """
+        self.scheduler.flush()
+        self.schedule_viewport_refresh()
+
+    def edit_class(self, box, attributes, methods):
+        """Apply an edit made in a ClassBox to the diagram model."""
+        self.diagram.set_members(box.class_name, attributes, methods)
 
     def delete_item(self, event):
         """Delete the selected class box or association line."""
-        item = self.canvas.find_closest(event.x, event.y)[0]
-        for box in self.class_boxes:
-            if box.box_id == item or item in box.box_parts:
-                box.delete()
-                self.class_boxes.remove(box)
-                return
-        for assoc, _, _, _ in self.associations:
-            if assoc.line_id == item:
-                assoc.delete()
-                self.associations.remove(assoc)
-                return
+        owner = self.find_owner(event.x, event.y)
+        if isinstance(owner, ClassBox):
+            with self.history.step():
+                self.diagram.remove_class(owner.class_name)
+        elif isinstance(owner, AssociationLine):
+            self.diagram.remove_edge(owner.edge)
+
+    def find_owner(self, x, y):
+        """Return the ClassBox or AssociationLine owning the canvas item closest to window position (x, y)."""
+        items = self.canvas.find_closest(*self.viewport.to_canvas(x, y))
+        return self.registry.owner_of(items[0]) if items else None
 
+    @timed("on_drag")
     def on_drag(self, event):
         """Handle drag events for moving boxes."""
         if not self.drag_data["item"]:
-            item = self.canvas.find_closest(event.x, event.y)[0]
-            for box in self.class_boxes:
-                if box.box_id == item or item in box.box_parts:
-                    self.drag_data["item"] = box
-                    self.drag_data["start_x"] = event.x
-                    self.drag_data["start_y"] = event.y
-                    break
+            owner = self.find_owner(event.x, event.y)
+            if isinstance(owner, ClassBox):
+                self.drag_data["item"] = owner
+                self.drag_data["start_x"] = event.x
+                self.drag_data["start_y"] = event.y
         else:
-            dx = event.x - self.drag_data["start_x"]
-            dy = event.y - self.drag_data["start_y"]
-            self.drag_data["item"].move(dx, dy)
+            zoom = self.viewport.zoom
+            dx = (event.x - self.drag_data["start_x"]) / zoom
+            dy = (event.y - self.drag_data["start_y"]) / zoom
+            self.diagram.move_class(self.drag_data["item"].class_name, dx, dy)
             self.drag_data["start_x"] = event.x
             self.drag_data["start_y"] = event.y
-            for assoc, _, _, _ in self.associations:
-                assoc.update_line()
 
     def on_release(self, event):
         """Handle mouse release."""
-        self.drag_data["item"] = None
+        self.scheduler.flush()
+        if self.drag_data["item"] is not None:
+            self.drag_data["item"] = None
+            self.history.seal()
+            if self.journal is not None:
+                self.journal.flush()
+            self.schedule_viewport_refresh()
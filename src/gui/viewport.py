@@ -0,0 +1,130 @@
+import math
+
+from ..diagram.geometry import BOX_WIDTH
+from ..diagram.spatial import GridIndex
+
+# Below this zoom level class boxes show only their name
+NAME_ONLY_ZOOM = 0.6
+# Below this zoom level association lines are omitted
+LINES_ZOOM = 0.25
+# Boxes narrower than this many pixels cannot show a name; the occupied cells of the
+# spatial index are drawn instead, so the number of items is bounded by the window
+MIN_LABEL_PIXELS = 30
+
+MIN_ZOOM = 0.05
+MAX_ZOOM = 4.0
+
+
+class Viewport:
+    """Tracks zoom, scrolling and the spatial index of class bounds for a scrollable canvas."""
+
+    def __init__(self, canvas, margin=200):
+        """
+        Initialize the viewport.
+        :param canvas: Canvas whose visible area is tracked.
+        :param margin: Extra diagram units materialized around the visible area.
+        """
+        self.canvas = canvas
+        self.margin = margin
+        self.zoom = 1.0
+        self.index = GridIndex()
+        self.scrollregion = (0, 0, 0, 0)
+
+    def detail(self):
+        """Level of detail for class boxes at the current zoom."""
+        if self.zoom * BOX_WIDTH < MIN_LABEL_PIXELS:
+            return "cells"
+        if self.zoom < NAME_ONLY_ZOOM:
+            return "name"
+        return "full"
+
+    def shows_lines(self):
+        """Whether association lines are drawn at the current zoom."""
+        return self.zoom >= LINES_ZOOM
+
+    def to_canvas(self, x, y):
+        """Convert window coordinates of an event to canvas coordinates."""
+        return self.canvas.canvasx(x), self.canvas.canvasy(y)
+
+    def to_diagram(self, x, y):
+        """Convert window coordinates of an event to diagram units."""
+        cx, cy = self.to_canvas(x, y)
+        return cx / self.zoom, cy / self.zoom
+
+    def visible_rect(self):
+        """Visible area plus margin, in diagram units (x1, y1, x2, y2)."""
+        x1, y1 = self.to_diagram(0, 0)
+        x2, y2 = self.to_diagram(self.canvas.winfo_width(), self.canvas.winfo_height())
+        return x1 - self.margin, y1 - self.margin, x2 + self.margin, y2 + self.margin
+
+    def visible_keys(self):
+        return self.index.query(*self.visible_rect())
+
+    def visible_cells(self):
+        """Bounds of the occupied index cells in view, merged into blocks at least MIN_LABEL_PIXELS wide."""
+        group = max(1, math.ceil(MIN_LABEL_PIXELS / (self.index.cell_size * self.zoom)))
+        return self.index.occupied_cells(*self.visible_rect(), group=group)
+
+    def free_spot(self, width, height, gap=30):
+        """
+        Top-left diagram position for a box of the given size that overlaps no indexed class,
+        scanning the visible area row by row; right of the diagram when the view is full.
+        """
+        left, top = self.to_diagram(0, 0)
+        right, bottom = self.to_diagram(self.canvas.winfo_width(), self.canvas.winfo_height())
+        y = top + gap
+        while y + height <= bottom or y == top + gap:
+            x = left + gap
+            while x + width <= right or x == left + gap:
+                margin = gap / 2
+                if not self.index.query(x - margin, y - margin, x + width + margin, y + height + margin):
+                    return x, y
+                x += width + gap
+            y += height + gap
+        extent = self.index.extent()
+        return extent[2] + gap, extent[1]
+
+    def update_scrollregion(self):
+        """Let the scrollbars cover every indexed class."""
+        extent = self.index.extent() or (0, 0, 0, 0)
+        z = self.zoom
+        self.scrollregion = (
+            min(0, extent[0] * z) - 100, min(0, extent[1] * z) - 100, extent[2] * z + 100, extent[3] * z + 100
+        )
+        self.canvas.configure(scrollregion=self.scrollregion)
+
+    def extend_scrollregion(self, bounds):
+        """Grow the scrollregion to cover one more box, without scanning the whole index."""
+        z = self.zoom
+        region = self.scrollregion
+        self.scrollregion = (
+            min(region[0], bounds[0] * z - 100), min(region[1], bounds[1] * z - 100),
+            max(region[2], bounds[2] * z + 100), max(region[3], bounds[3] * z + 100)
+        )
+        if self.scrollregion != region:
+            self.canvas.configure(scrollregion=self.scrollregion)
+
+    def center_on(self, x, y):
+        """Scroll so the diagram point (x, y) is in the middle of the window."""
+        region = self.scrollregion
+        width, height = region[2] - region[0], region[3] - region[1]
+        if width > 0:
+            self.canvas.xview_moveto((x * self.zoom - self.canvas.winfo_width() / 2 - region[0]) / width)
+        if height > 0:
+            self.canvas.yview_moveto((y * self.zoom - self.canvas.winfo_height() / 2 - region[1]) / height)
+
+    def set_zoom(self, zoom, anchor_x=0, anchor_y=0):
+        """
+        Change the zoom level, keeping the diagram point under the window position
+        (anchor_x, anchor_y) in place.
+        """
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+        world_x, world_y = self.to_diagram(anchor_x, anchor_y)
+        self.zoom = zoom
+        self.update_scrollregion()
+        region = self.scrollregion
+        width, height = region[2] - region[0], region[3] - region[1]
+        if width > 0:
+            self.canvas.xview_moveto((world_x * zoom - anchor_x - region[0]) / width)
+        if height > 0:
+            self.canvas.yview_moveto((world_y * zoom - anchor_y - region[1]) / height)
@@ -0,0 +1,132 @@
+"""
+Lightweight timers and counters for the editor's hot paths.
+
+Instrumentation is off by default and can be switched on at runtime, from
+the View menu or by setting UML_INSTRUMENT=1. While it is off, a timed
+function costs one attribute check on top of the call and count() returns
+immediately, so the decorators can stay on the hot paths permanently.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from collections import Counter
+from functools import wraps
+
+
+class Instrumentation:
+    """Collects call timings and event counters while enabled."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = Counter()
+        self.profiler = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forget every timing and counter recorded so far."""
+        self.timers.clear()
+        self.counters.clear()
+
+    def timed(self, name):
+        """Decorator recording the duration of every call under name while enabled."""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def record(self, name, seconds):
+        """Add one call of the given duration to a timer."""
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    def count(self, name, amount=1):
+        """Increment a counter while enabled."""
+        if self.enabled:
+            self.counters[name] += amount
+
+    def stats(self):
+        """Return the timings (in milliseconds) and counters as a JSON-friendly dict."""
+        return {
+            "enabled": self.enabled,
+            "timers": {
+                name: {
+                    "calls": calls,
+                    "total_ms": total * 1000,
+                    "mean_ms": total * 1000 / calls,
+                    "max_ms": longest * 1000,
+                } for name, (calls, total, longest) in sorted(self.timers.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def report(self):
+        """Format the statistics as a plain-text table."""
+        stats = self.stats()
+        lines = [f"{'timer':<28}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for name, timer in stats["timers"].items():
+            lines.append(
+                f"{name:<28}{timer['calls']:>8}{timer['total_ms']:>12.1f}{timer['mean_ms']:>10.3f}{timer['max_ms']:>10.3f}"
+            )
+        lines.append("")
+        lines.append(f"{'counter':<28}{'value':>8}")
+        for name, value in stats["counters"].items():
+            lines.append(f"{name:<28}{value:>8}")
+        return "\n".join(lines)
+
+    def dump(self, file_path):
+        """Write the statistics to a JSON file."""
+        with open(file_path, "w") as file:
+            json.dump(self.stats(), file, indent=4)
+
+    @property
+    def profiling(self):
+        return self.profiler is not None
+
+    def start_profile(self):
+        """Start a cProfile capture; it runs until stop_profile()."""
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self, file_path=None, limit=25):
+        """
+        Stop the cProfile capture and return the top entries by cumulative time as text.
+        :param file_path: Optional .prof file the raw profile is saved to, for snakeviz or pstats.
+        :param limit: Number of functions listed in the returned text.
+        """
+        if self.profiler is None:
+            return ""
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        if file_path:
+            profiler.dump_stats(file_path)
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
+
+instrumentation = Instrumentation(enabled=os.environ.get("UML_INSTRUMENT", "") not in ("", "0"))
+timed = instrumentation.timed
@@ -0,0 +1,27 @@
+from ..instrumentation import instrumentation
+
+
+class CanvasRegistry:
+    """Maps canvas item ids to the model object (ClassBox or AssociationLine) that owns them."""
+
+    def __init__(self):
+        self.owners = {}
+
+    def register(self, owner, *item_ids):
+        """Record owner as the owner of the given canvas items."""
+        for item_id in item_ids:
+            if item_id is not None:
+                self.owners[item_id] = owner
+        instrumentation.count("canvas items created", len(item_ids))
+
+    def unregister(self, *item_ids):
+        """Forget the given canvas items."""
+        owners = self.owners
+        removed = len(owners)
+        for item_id in item_ids:
+            owners.pop(item_id, None)
+        instrumentation.count("canvas items deleted", removed - len(owners))
+
+    def owner_of(self, item_id):
+        """Return the object owning a canvas item, or None."""
+        return self.owners.get(item_id)
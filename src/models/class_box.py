@@ -1,182 +1,214 @@
+import itertools
 import tkinter as tk
 from tkinter import simpledialog
+from ..diagram.geometry import (
+    ATTRIBUTES_OFFSET, BOX_FILL, BOX_WIDTH, HEADER_FILL, HEADER_HEIGHT, LINE_HEIGHT, MEMBER_FONT_SIZE,
+    MEMBER_INDENT, NAME_FONT_SIZE, NAME_OFFSET, box_height, method_text, methods_top
+)
+
+# Smallest font size of a class name; at smaller zooms the name is shortened to fit the box instead
+MIN_NAME_FONT = 6
+# Average width of a bold Arial character, in pixels per point of font size
+CHAR_WIDTH = 0.75
+
 
 class ClassBox:
-    def __init__(self, canvas, x, y, class_name, attributes=None, methods=None, relationships=None):
+    _tag_counter = itertools.count()
+
+    def __init__(self, canvas, x, y, class_name, attributes=None, methods=None, registry=None,
+                 on_edit=None, zoom=1.0, detail="full"):
         """
         Initialize a UML class box.
         :param canvas: Canvas on which the box is drawn.
-        :param x, y: Top-left coordinates.
+        :param x, y: Top-left coordinates, in diagram units.
         :param class_name: Name of the class.
         :param attributes: List of class attributes.
         :param methods: List of class methods.
-        :param relationships: Dict of relationships (composition, aggregation, dependency).
+        :param registry: Optional CanvasRegistry kept up to date with the box's canvas items.
+        :param on_edit: Optional callback(box, attributes, methods) that applies edits through
+                        the diagram model; without it edits are applied to the box directly.
+        :param zoom: Canvas pixels per diagram unit.
+        :param detail: Level of detail: "full" or "name" (rectangle and class name).
         """
         self.canvas = canvas
+        self.registry = registry
+        self.on_edit = on_edit
+        self.zoom = zoom
+        self.detail = detail
         self.class_name = class_name
         self.attributes = attributes or []
         self.methods = methods or []
-        self.relationships = relationships or {"composition": [], "aggregation": [], "dependency": []}
         self.x, self.y = x, y
-        self.width, self.height = 200, 120
+        self.width, self.height = BOX_WIDTH, self.content_height()
         self.box_parts = []
-        self.drag_data = {"x": 0, "y": 0}
+        self.head_parts = []
+        self.attribute_ids = []
+        self.method_ids = []
+        # Canvas tag shared by all of the box's items, so they move and bind as one
+        self.tag = f"classbox{next(self._tag_counter)}"
         self.create_box()
         self.bind_events()
 
+    def content_height(self):
+        """Height needed to show the header, attributes and methods."""
+        return box_height(self.attributes, self.methods)
+
+    def methods_top(self):
+        """Y coordinate of the first method line."""
+        return methods_top(self.y, self.attributes)
+
+    def font(self, size, *style):
+        """Font scaled to the zoom level."""
+        return ("Arial", max(1, round(size * self.zoom))) + style
+
+    def label(self):
+        """
+        Text and font of the class name. With detail "name" the font stays readable at any
+        zoom, and a name too long for the box is cut short with an ellipsis.
+        """
+        if self.detail == "full":
+            return self.class_name, self.font(NAME_FONT_SIZE, "bold")
+        size = max(MIN_NAME_FONT, round(NAME_FONT_SIZE * self.zoom))
+        fits = max(1, int(self.width * self.zoom / (size * CHAR_WIDTH)))
+        text = self.class_name if len(self.class_name) <= fits else self.class_name[:fits - 1] + "\u2026"
+        return text, ("Arial", size, "bold")
+
     def create_box(self):
         """Draws the UML class box."""
+        z = self.zoom
         # Draw main box and header
         self.box_id = self.canvas.create_rectangle(
-            self.x, self.y, self.x + self.width, self.y + self.height,
-            outline="black", fill="#f0f8ff", width=2
+            self.x * z, self.y * z, (self.x + self.width) * z, (self.y + self.height) * z,
+            outline="black", fill=BOX_FILL, width=2 if self.detail == "full" else 1, tags=(self.tag,)
         )
-        header_id = self.canvas.create_rectangle(
-            self.x, self.y, self.x + self.width, self.y + 30,
-            outline="black", fill="#87cefa", width=2
+        self.head_parts = [self.box_id]
+        if self.detail == "full":
+            self.head_parts.append(self.canvas.create_rectangle(
+                self.x * z, self.y * z, (self.x + self.width) * z, (self.y + HEADER_HEIGHT) * z,
+                outline="black", fill=HEADER_FILL, width=2, tags=(self.tag,)
+            ))
+        text, font = self.label()
+        self.head_parts.append(self.canvas.create_text(
+            (self.x + self.width / 2) * z, (self.y + NAME_OFFSET) * z, text=text,
+            font=font, anchor="center", tags=(self.tag,)
+        ))
+
+        # Draw attributes and methods
+        self.attribute_ids = self.sync_texts(
+            [], [], self.attribute_texts(self.attributes), self.y + ATTRIBUTES_OFFSET
         )
-        text_id = self.canvas.create_text(
-            self.x + self.width / 2, self.y + 15, text=self.class_name,
-            font=("Arial", 12, "bold"), anchor="center"
-        )
-        self.box_parts.extend([self.box_id, header_id, text_id])
+        self.method_ids = self.sync_texts([], [], self.method_texts(self.methods), self.methods_top())
 
-        # Draw attributes
-        attr_y = self.y + 35
-        for attr in self.attributes:
-            text_id = self.canvas.create_text(
-                self.x + 10, attr_y, text=f"{attr}", font=("Arial", 10), anchor="nw"
-            )
-            self.box_parts.append(text_id)
-            attr_y += 15
-
-        # Draw methods
-        method_y = attr_y + 5
-        for method in self.methods:
-            text_id = self.canvas.create_text(
-                self.x + 10, method_y, text=f"{method}()", font=("Arial", 10), anchor="nw"
-            )
-            self.box_parts.append(text_id)
-            method_y += 15
+        self.box_parts = self.head_parts + self.attribute_ids + self.method_ids
+        if self.registry is not None:
+            self.registry.register(self, *self.box_parts)
+
+    @staticmethod
+    def attribute_texts(attributes):
+        return [f"{attr}" for attr in attributes]
+
+    @staticmethod
+    def method_texts(methods):
+        return [method_text(method) for method in methods]
+
+    def sync_texts(self, item_ids, old_texts, new_texts, top, moved=False):
+        """
+        Update a column of member text items to show new_texts, touching only what changed.
+        :param item_ids: Canvas ids currently showing old_texts.
+        :param top: Y coordinate of the first line.
+        :param moved: Whether the column's top changed, so kept items must be repositioned.
+        :return: Canvas ids showing new_texts.
+        """
+        if self.detail != "full":
+            return []
+        z = self.zoom
+        kept = item_ids[:len(new_texts)]
+        for index, item_id in enumerate(kept):
+            if old_texts[index] != new_texts[index]:
+                self.canvas.itemconfig(item_id, text=new_texts[index])
+            if moved:
+                self.canvas.coords(item_id, (self.x + MEMBER_INDENT) * z, (top + LINE_HEIGHT * index) * z)
+
+        stale = item_ids[len(new_texts):]
+        for item_id in stale:
+            self.canvas.delete(item_id)
+        if stale and self.registry is not None:
+            self.registry.unregister(*stale)
+
+        created = []
+        for index in range(len(kept), len(new_texts)):
+            created.append(self.canvas.create_text(
+                (self.x + MEMBER_INDENT) * z, (top + LINE_HEIGHT * index) * z, text=new_texts[index],
+                font=self.font(MEMBER_FONT_SIZE), anchor="nw",
+                tags=(self.tag,)
+            ))
+        if created and self.registry is not None:
+            self.registry.register(self, *created)
+        return kept + created
 
     def bind_events(self):
-        """Binds drag and edit events."""
-        for part_id in self.box_parts:
-            self.canvas.tag_bind(part_id, "<ButtonPress-1>", self.on_drag_start)
-            self.canvas.tag_bind(part_id, "<B1-Motion>", self.on_drag)
-            self.canvas.tag_bind(part_id, "<Double-1>", self.edit_content)
-
-    def on_drag_start(self, event):
-        """Start dragging the box."""
-        self.drag_data["x"] = event.x
-        self.drag_data["y"] = event.y
-
-    def on_drag(self, event):
-        """Handle dragging."""
-        dx = event.x - self.drag_data["x"]
-        dy = event.y - self.drag_data["y"]
-        self.move(dx, dy)
-        self.drag_data["x"] = event.x
-        self.drag_data["y"] = event.y
+        """Binds the edit event; dragging is handled by UMLApp.on_drag."""
+        self.canvas.tag_bind(self.tag, "<Double-1>", self.edit_content)
 
     def move(self, dx, dy):
-        """Move the box."""
+        """Move the box by (dx, dy) diagram units."""
         self.x += dx
         self.y += dy
-        for part_id in self.box_parts:
-            self.canvas.move(part_id, dx, dy)
+        self.canvas.move(self.tag, dx * self.zoom, dy * self.zoom)
 
     def edit_content(self, event):
-        """Edit attributes, methods, and relationships."""
+        """Edit attributes and methods."""
         attribute_string = ", ".join(self.attributes)
         method_string = ", ".join(self.methods)
         new_attributes = simpledialog.askstring("Edit Attributes", "Enter attributes (comma-separated):", initialvalue=attribute_string)
         new_methods = simpledialog.askstring("Edit Methods", "Enter methods (comma-separated):", initialvalue=method_string)
+        attributes = self.attributes
+        methods = self.methods
         if new_attributes is not None:
-            self.attributes = [attr.strip() for attr in new_attributes.split(",")]
+            attributes = [attr.strip() for attr in new_attributes.split(",")]
         if new_methods is not None:
-            self.methods = [method.strip() for method in new_methods.split(",")]
-        self.canvas.delete("all")
-        self.create_box()
-
-    def generate_python_code(self):
-        """Generate Python code for the class."""
-        code = f"class {self.class_name}:\n"
-        code += "    def __init__(self):\n"
-
-        # Add attributes
-        for attr in self.attributes:
-            code += f"        self.{attr} = None\n"
-
-        # Add composition
-        for comp_class in self.relationships["composition"]:
-            code += f"        self.{comp_class.lower()} = {comp_class}()\n"
-
-        # Add aggregation
-        for agg_class in self.relationships["aggregation"]:
-            code += f"        self.{agg_class.lower()} = None  # Aggregation\n"
-
-        # Add dependency
-        for dep_class in self.relationships["dependency"]:
-            code += f"# Dependency: Uses {dep_class}\n"
-
-        # Add methods
-        for method in self.methods:
-            code += f"\n    def {method}(self):\n        pass\n"
-
-        return code
-
-    def generate_java_code(self):
-        """Generate Java code for the class."""
-        code = f"public class {self.class_name} {{\n"
-
-        # Add attributes
-        for attr in self.attributes:
-            code += f"    private String {attr};\n"
-
-        # Add constructor
-        code += "\n    public " + self.class_name + "() {\n"
-        for comp_class in self.relationships["composition"]:
-            code += f"        this.{comp_class.lower()} = new {comp_class}();\n"
-        code += "    }\n"
-
-        # Add aggregation
-        for agg_class in self.relationships["aggregation"]:
-            code += f"    private {agg_class} {agg_class.lower()}; // Aggregation\n"
-
-        # Add dependency comments
-        for dep_class in self.relationships["dependency"]:
-            code += f"// Dependency: Uses {dep_class}\n"
-
-        code += "}\n"
-        return code
-
-    def generate_php_code(self):
-        """Generate PHP code for the class."""
-        code = f"<?php\nclass {self.class_name} {{\n"
-
-        # Add attributes
-        for attr in self.attributes:
-            code += f"    private ${attr};\n"
-
-        # Add constructor
-        code += "\n    public function __construct() {\n"
-        for comp_class in self.relationships["composition"]:
-            code += f"        $this->{comp_class.lower()} = new {comp_class}();\n"
-        code += "    }\n"
-
-        # Add aggregation
-        for agg_class in self.relationships["aggregation"]:
-            code += f"    private ${agg_class.lower()}; // Aggregation\n"
-
-        # Add dependency comments
-        for dep_class in self.relationships["dependency"]:
-            code += f"// Dependency: Uses {dep_class}\n"
+            methods = [method.strip() for method in new_methods.split(",")]
+        if self.on_edit is not None:
+            self.on_edit(self, attributes, methods)
+        else:
+            self.update_members(attributes, methods)
+
+    def update_members(self, attributes, methods):
+        """Show new attribute and method lists, redrawing only the changed items of this box."""
+        old_attributes, old_methods = self.attributes, self.methods
+        old_methods_top = self.methods_top()
+        self.attributes, self.methods = attributes, methods
+
+        self.attribute_ids = self.sync_texts(
+            self.attribute_ids, self.attribute_texts(old_attributes), self.attribute_texts(attributes),
+            self.y + ATTRIBUTES_OFFSET
+        )
+        methods_top = self.methods_top()
+        self.method_ids = self.sync_texts(
+            self.method_ids, self.method_texts(old_methods), self.method_texts(methods), methods_top,
+            moved=methods_top != old_methods_top
+        )
+        self.box_parts = self.head_parts + self.attribute_ids + self.method_ids
+
+        # Resize to the new content
+        height = self.content_height()
+        if height != self.height:
+            self.height = height
+            z = self.zoom
+            self.canvas.coords(
+                self.box_id, self.x * z, self.y * z, (self.x + self.width) * z, (self.y + self.height) * z
+            )
 
-        code += "}\n?>"
+    def set_highlight(self, highlighted):
+        """Outline the box in orange, e.g. for a search result, or restore its normal outline."""
+        if highlighted:
+            self.canvas.itemconfig(self.box_id, outline="#ff8c00", width=4)
+        else:
+            self.canvas.itemconfig(self.box_id, outline="black", width=2 if self.detail == "full" else 1)
 
     def delete(self):
-         self.canvas.delete(self.box_id)
-
-
-# The "return code" line was removed, because it's outside of a function
+        """Remove all of the box's items from the canvas."""
+        self.canvas.delete(self.tag)
+        if self.registry is not None:
+            self.registry.unregister(*self.box_parts)
+        self.box_parts = []
@@ -1,5 +1,14 @@
 import json
+from collections import defaultdict
 
+from ..diagram.validation import inheritance_order
+from ..instrumentation import timed
+from .languages import available_languages, get_backend
+
+RELATIONSHIP_TYPES = {"composition", "aggregation"}
+
+
+@timed("generate_code_from_diagram")
 def generate_code_from_diagram(file_path, language):
     """Generate code based on a saved UML diagram JSON file."""
     try:
@@ -8,83 +17,115 @@ def generate_code_from_diagram(file_path, language):
     except Exception as e:
         raise ValueError(f"Error reading file: {e}")
 
+    return generate_code(data, language)
+
+
+@timed("generate_code")
+def generate_code(diagram, language, cache=None, changes=None):
+    """
+    Generate code for an in-memory diagram.
+    :param diagram: Diagram dict with "classes" and "associations", or a model
+                    object exposing to_dict().
+    :param language: Name of a registered language backend (python, java, php, ...).
+    :param cache: Optional CodegenCache reused across calls for unchanged classes.
+    :param changes: Optional cache.change_numbers() taken with the diagram snapshot; see iter_class_fragments.
+    """
+    return "".join(fragment for _, fragment in iter_class_fragments(diagram, language, cache, changes))
+
+
+def iter_class_fragments(diagram, language, cache=None, changes=None):
+    """
+    Yield (class name, code) for every class of a diagram, parents before their
+    subclasses and otherwise in diagram order, so no class is emitted before a
+    parent it extends. Each fragment is the class followed by its composition and aggregation lines,
+    exactly as it appears in the output of generate_code.
+    :param changes: Optional cache.change_numbers() of the diagram the cache is attached to, taken
+                    with this snapshot of it. Classes not edited since their last generation then
+                    reuse their fragment without building its cache key.
+    """
+    data = diagram if isinstance(diagram, dict) else diagram.to_dict()
+
     classes = {cls["name"]: cls for cls in data.get("classes", [])}
     associations = data.get("associations", [])
 
-    code_output = ""
-    for cls_name, cls_data in classes.items():
-        class_name = cls_data["name"]
-        attributes = cls_data["attributes"]
-        methods = cls_data["methods"]
-
-        # Check associations for inheritance
-        parents = [assoc["from"] for assoc in associations if assoc["to"] == class_name and assoc["type"] == "inheritance"]
-        parent_class = parents[0] if parents else None
-
-        # Generate code for the class
-        if language == "python":
-            code_output += generate_python_code(class_name, attributes, methods, parent_class) + "\n\n"
-        elif language == "java":
-            code_output += generate_java_code(class_name, attributes, methods, parent_class) + "\n\n"
-        elif language == "php":
-            code_output += generate_php_code(class_name, attributes, methods, parent_class) + "\n\n"
-        else:
-            raise ValueError("Unsupported language. Choose python, java, or php.")
-
-        # Generate code for composition and aggregation
-        related_classes = [
-            assoc for assoc in associations if assoc["from"] == class_name and assoc["type"] in {"composition", "aggregation"}
-        ]
-        for assoc in related_classes:
-            code_output += generate_relationship_code(language, assoc, classes) + "\n"
-
-    return code_output
+    backend = get_backend(language) if classes else None
+
+    plan = cache.get_plan(changes.structure) if changes is not None else None
+    if plan is None:
+        parents, relationships = build_association_index(associations)
+        plan = (inheritance_order(classes, associations), parents, relationships)
+        if changes is not None:
+            cache.put_plan(changes.structure, plan)
+    order, parents, relationships = plan
+
+    for class_name in order:
+        cls_data = classes[class_name]
+        parent_class = parents.get(class_name)
+        class_relationships = relationships.get(class_name, ())
+        if cache is None:
+            yield class_name, generate_class_fragment(backend, cls_data, parent_class, class_relationships)
+            continue
+        if changes is not None:
+            change = changes(class_name)
+            fragment = cache.get_current(class_name, language, change)
+            if fragment is not None:
+                yield class_name, fragment
+                continue
+        key = cache.make_key(backend, cls_data, parent_class, class_relationships)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = generate_class_fragment(backend, cls_data, parent_class, class_relationships)
+            cache.put(key, fragment)
+        if changes is not None:
+            cache.put_current(class_name, language, change, fragment)
+        yield class_name, fragment
+
+
+def generate_class_fragment(backend, cls_data, parent_class, relationships):
+    """Generate the code of one class followed by its composition and aggregation lines."""
+    fragments = [
+        backend.generate_class(cls_data["name"], cls_data["attributes"], cls_data["methods"], parent_class),
+        "\n\n"
+    ]
+    for assoc in relationships:
+        fragments.append(backend.generate_relationship(assoc))
+        fragments.append("\n")
+    return "".join(fragments)
+
+
+def build_association_index(associations):
+    """
+    Index associations by class name in a single pass.
+    :param associations: List of association dicts with "type", "from" and "to".
+    :return: (parents, relationships) where parents maps a class to its first
+             inheritance parent and relationships maps a class to its outgoing
+             composition/aggregation associations, both in diagram order.
+    """
+    parents = {}
+    relationships = defaultdict(list)
+    for assoc in associations:
+        assoc_type = assoc["type"]
+        if assoc_type == "inheritance":
+            parents.setdefault(assoc["to"], assoc["from"])
+        elif assoc_type in RELATIONSHIP_TYPES:
+            relationships[assoc["from"]].append(assoc)
+    return parents, relationships
 
 
 def generate_python_code(class_name, attributes, methods, parent_class):
-    inheritance = f"({parent_class})" if parent_class else ""
-    attr_lines = [f"    {attr} = None" for attr in attributes]
-    method_lines = [f"    def {method}(self):\n        pass" for method in methods]
-
-    return f"class {class_name}{inheritance}:\n" + "\n".join(attr_lines + method_lines)
+    return get_backend("python").generate_class(class_name, attributes, methods, parent_class)
 
 
 def generate_java_code(class_name, attributes, methods, parent_class):
-    inheritance = f" extends {parent_class}" if parent_class else ""
-    attr_lines = [f"    private Object {attr};" for attr in attributes]
-    method_lines = [f"    public void {method}() {{}}\n" for method in methods]
-
-    return f"public class {class_name}{inheritance} {{\n" + "\n".join(attr_lines + method_lines) + "\n}"
+    return get_backend("java").generate_class(class_name, attributes, methods, parent_class)
 
 
 def generate_php_code(class_name, attributes, methods, parent_class):
-    inheritance = f" extends {parent_class}" if parent_class else ""
-    attr_lines = [f"    public ${attr};" for attr in attributes]
-    method_lines = [f"    public function {method}() {{}}\n" for method in methods]
-
-    return f"class {class_name}{inheritance} {{\n" + "\n".join(attr_lines + method_lines) + "\n}"
+    return get_backend("php").generate_class(class_name, attributes, methods, parent_class)
 
 
 def generate_relationship_code(language, assoc, classes):
     """Generate code for composition and aggregation relationships."""
-    from_class = assoc["from"]
-    to_class = assoc["to"]
-    assoc_type = assoc["type"]
-
-    if language == "python":
-        if assoc_type == "composition":
-            return f"    self.{to_class.lower()} = {to_class}()  # Composition relationship in {from_class}"
-        elif assoc_type == "aggregation":
-            return f"    self.{to_class.lower()} = None  # Aggregation relationship in {from_class}"
-    elif language == "java":
-        if assoc_type == "composition":
-            return f"    private {to_class} {to_class.lower()};  // Composition relationship in {from_class}"
-        elif assoc_type == "aggregation":
-            return f"    private {to_class} {to_class.lower()};  // Aggregation relationship in {from_class}"
-    elif language == "php":
-        if assoc_type == "composition":
-            return f"    private ${to_class.lower()};  // Composition relationship in {from_class}"
-        elif assoc_type == "aggregation":
-            return f"    private ${to_class.lower()};  // Aggregation relationship in {from_class}"
-
-    return ""  # Fallback for unsupported relationships
+    if language not in available_languages():
+        return ""  # Fallback for unsupported languages
+    return get_backend(language).generate_relationship(assoc)
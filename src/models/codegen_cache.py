@@ -0,0 +1,199 @@
+import json
+import os
+from collections import OrderedDict
+
+from ..diagram.storage import save_atomic
+from .code_generator import RELATIONSHIP_TYPES
+
+# Bump whenever generated output changes, so cached fragments are not reused
+GENERATOR_VERSION = 1
+
+
+class ChangeNumbers:
+    """Change numbers of an attached diagram's classes and structure, as of one diagram snapshot."""
+
+    __slots__ = ("changed", "unchanged", "structure")
+
+    def __init__(self, changed, unchanged, structure):
+        self.changed = changed
+        self.unchanged = unchanged
+        self.structure = structure
+
+    def __call__(self, name):
+        return self.changed.get(name, self.unchanged)
+
+
+class CodegenCache:
+    """
+    Bounded LRU cache of generated per-class code fragments.
+
+    Keys are built from everything a class's fragment depends on: generator
+    version, language backend and its version, class name and members, inheritance parent and outgoing
+    composition/aggregation associations. Unchanged classes hit the cache, so
+    regeneration after an edit only formats the classes whose inputs changed.
+
+    A cache attached to a Diagram also remembers the fragments of its classes by
+    name and drops a class's fragments when an edit touches it. Classes that did
+    not change since the last generation then skip building and hashing their
+    key as well. The class order and association index are kept until a class or
+    a relevant association is added or removed, so editing members costs the
+    edited classes plus one pass over the names.
+    """
+
+    def __init__(self, max_entries=20000, path=None):
+        """
+        Initialize the cache.
+        :param max_entries: Maximum number of fragments kept; least recently used ones are evicted.
+        :param path: Optional JSON file the cache is loaded from and saved to. A file that
+                     cannot be read is ignored and replaced on the next save.
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.diagram = None
+        # Class name -> {language: (change number, fragment)} for the attached diagram
+        self.current = {}
+        # Class name -> number of its last change; classes unchanged since attach() have attached_at
+        self.changed = {}
+        self.change_count = 0
+        self.attached_at = 0
+        # Number of the last change adding or removing a class, inheritance, composition or aggregation
+        self.structure = 0
+        # (structure number, (class order, parents, relationships)) of the last generation
+        self.plan = None
+        if path and os.path.exists(path):
+            try:
+                self.load()
+            except (OSError, ValueError, KeyError, TypeError):
+                self.entries.clear()
+
+    @staticmethod
+    def make_key(backend, cls_data, parent_class, relationships):
+        return (
+            GENERATOR_VERSION, backend.name, backend.version, cls_data["name"], tuple(cls_data["attributes"]),
+            tuple(cls_data["methods"]), parent_class,
+            tuple([(assoc["type"], assoc["from"], assoc["to"]) for assoc in relationships]) if relationships else ()
+        )
+
+    def attach(self, diagram):
+        """Follow the edits of a diagram, forgetting the class fragments of the previous one."""
+        if self.diagram is not None:
+            self.diagram.unsubscribe(self.on_model_change)
+        self.diagram = diagram
+        diagram.subscribe(self.on_model_change)
+        self.current = {}
+        self.changed = {}
+        self.change_count += 1
+        self.attached_at = self.structure = self.change_count
+
+    def on_model_change(self, event, *args):
+        """Diagram listener dropping the fragments of the classes an edit changed."""
+        if event in ("add_class", "remove_class"):
+            self.invalidate(args[0].name)
+            self.structure = self.change_count
+        elif event == "set_members":
+            self.invalidate(args[0].name)
+        elif event in ("add_edge", "remove_edge"):
+            edge = args[0]
+            if edge.kind == "inheritance":
+                self.invalidate(edge.target.name)
+            elif edge.kind in RELATIONSHIP_TYPES:
+                self.invalidate(edge.source.name)
+            else:
+                return
+            self.structure = self.change_count
+
+    def invalidate(self, name):
+        self.change_count += 1
+        self.changed[name] = self.change_count
+        self.current.pop(name, None)
+
+    def change_numbers(self):
+        """
+        Snapshot of the change numbers of the attached diagram. Take it together with the
+        diagram snapshot passed to iter_class_fragments, on the thread that edits the diagram.
+        """
+        return ChangeNumbers(dict(self.changed), self.attached_at, self.structure)
+
+    def get_current(self, name, language, change):
+        """Return the fragment remembered for a class at a change number, or None."""
+        fragment = self.current.get(name, {}).get(language)
+        if fragment is None or fragment[0] != change:
+            return None
+        self.hits += 1
+        return fragment[1]
+
+    def put_current(self, name, language, change, fragment):
+        # A worker may still finish a class an edit has just dropped; its change number no longer matches
+        self.current.setdefault(name, {})[language] = (change, fragment)
+
+    def get_plan(self, structure):
+        """Return the class order and association index remembered for a structure number, or None."""
+        plan = self.plan
+        return plan[1] if plan is not None and plan[0] == structure else None
+
+    def put_plan(self, structure, plan):
+        self.plan = (structure, plan)
+
+    def get(self, key):
+        """Return the cached fragment for key, or None."""
+        fragment = self.entries.get(key)
+        if fragment is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fragment
+
+    def put(self, key, fragment):
+        self.entries[key] = fragment
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.current.clear()
+        self.plan = None
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def load(self, path=None):
+        """Load entries saved by save(); entries from other generator versions are ignored."""
+        with open(path or self.path, "r") as file:
+            data = json.load(file)
+        if data.get("version") != GENERATOR_VERSION:
+            return
+        for key, fragment in data["entries"]:
+            version, language, backend_version, name, attributes, methods, parent, relationships = key
+            self.put((
+                version, language, backend_version, name, tuple(attributes), tuple(methods), parent,
+                tuple(tuple(relationship) for relationship in relationships)
+            ), fragment)
+
+    def save(self, path=None):
+        """Persist the cache to a JSON file, replacing it only once the new content is written."""
+        path = path or self.path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        entries = list(self.entries.items())
+
+        def write(temp_path):
+            with open(temp_path, "w") as file:
+                json.dump({"version": GENERATOR_VERSION, "entries": entries}, file)
+
+        save_atomic(path, write)
@@ -0,0 +1,109 @@
+"""
+Export generated code as one source file per class.
+
+Files are written by a thread pool, and a file is only rewritten when its
+content changed, so re-exporting a mostly unchanged diagram leaves the
+timestamps alone and build tools watching the directory stay quiet.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .code_generator import iter_class_fragments
+from .languages import get_backend
+
+BATCHES_PER_EXPORT = 32
+
+
+def content_hash(data):
+    """SHA-256 digest of encoded file content."""
+    return hashlib.sha256(data).digest()
+
+
+def write_if_changed(path, data):
+    """
+    Write bytes to path unless the file already holds exactly the same content.
+    Returns True when the file was written.
+    """
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as file:
+                if content_hash(file.read()) == content_hash(data):
+                    return False
+    except OSError:
+        pass
+    with open(path, "wb") as file:
+        file.write(data)
+    return True
+
+
+def write_batch(files):
+    """Apply write_if_changed to a list of (path, bytes) pairs."""
+    return [write_if_changed(path, data) for path, data in files]
+
+
+def class_file_content(backend, fragment):
+    """Full source file text for one generated class fragment."""
+    return backend.file_prologue + fragment.rstrip("\n") + "\n"
+
+
+def class_files(backend, fragments, output_dir):
+    """
+    Source files of generated class fragments: a list of (path, text) in fragment order.
+    File names that collide, also when compared case-insensitively, get a numeric suffix
+    ("http_server_2.py") in class order, so no class overwrites another.
+    :param fragments: (class name, fragment) pairs, as yielded by iter_class_fragments.
+    :raise ValueError: A class name is empty, contains a path separator or would otherwise
+                       place its file outside output_dir.
+    """
+    root = os.path.realpath(output_dir)
+    taken = set()
+    files = []
+    for class_name, fragment in fragments:
+        if not class_name or "/" in class_name or "\\" in class_name:
+            raise ValueError(f"Class name {class_name!r} cannot be used as a file name.")
+        file_name = backend.file_name(class_name)
+        stem, extension = os.path.splitext(file_name)
+        number = 1
+        while file_name.casefold() in taken:
+            number += 1
+            file_name = f"{stem}_{number}{extension}"
+        taken.add(file_name.casefold())
+        path = os.path.join(output_dir, file_name)
+        if os.path.dirname(os.path.realpath(path)) != root:
+            raise ValueError(f"Class name {class_name!r} cannot be used as a file name.")
+        files.append((path, class_file_content(backend, fragment)))
+    return files
+
+
+def export_code(diagram, language, output_dir, cache=None, max_workers=None, changes=None):
+    """
+    Generate code for every class of a diagram into its own file.
+    :param diagram: Diagram dict or model object exposing to_dict().
+    :param language: Name of a registered language backend.
+    :param output_dir: Directory receiving the files; created when missing.
+    :param cache: Optional CodegenCache shared with in-memory code generation.
+    :param max_workers: Writer threads; defaults to the ThreadPoolExecutor default.
+    :param changes: Optional cache.change_numbers() taken with the diagram snapshot; see iter_class_fragments.
+    :return: Dict with the lists of "written" and "unchanged" file paths.
+    :raise ValueError: A class name cannot be used as a file name; nothing is written then.
+    """
+    backend = get_backend(language)
+    os.makedirs(output_dir, exist_ok=True)
+
+    files = [
+        (path, text.encode("utf-8"))
+        for path, text in class_files(backend, iter_class_fragments(diagram, language, cache, changes), output_dir)
+    ]
+
+    # Hand the pool a few large batches rather than one task per file; the
+    # per-task overhead otherwise costs about as much as a small write.
+    batch_size = max(1, len(files) // BATCHES_PER_EXPORT)
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+
+    result = {"written": [], "unchanged": []}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch, flags in zip(batches, executor.map(write_batch, batches)):
+            for (path, _), written in zip(batch, flags):
+                result["written" if written else "unchanged"].append(path)
+    return result
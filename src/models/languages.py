@@ -0,0 +1,171 @@
+"""
+Registry of code generation backends, one per target language.
+
+Each backend compiles its templates once, when it is created and registered,
+so generating a class is a table lookup plus template fills. Supporting a new
+language means registering another LanguageBackend; the generation loop in
+code_generator does not change.
+"""
+import re
+
+
+class MemberTemplate:
+    """
+    A one-line-per-member template such as "    {member} = None".
+
+    The template is split around its placeholder once. With a single
+    placeholder, rendering a whole member list is one str.join instead of one
+    format call per member (see benchmarks/bench_backends.py). A template using
+    the placeholder several times, e.g. a getter, fills each line in turn.
+    """
+
+    __slots__ = ("parts", "prefix", "suffix", "separator")
+
+    def __init__(self, template, placeholder="{member}"):
+        """
+        Compile a template.
+        :raises ValueError: If the template does not contain the placeholder.
+        """
+        self.parts = template.split(placeholder)
+        if len(self.parts) < 2:
+            raise ValueError(f"Member template {template!r} has no {placeholder} placeholder.")
+        self.prefix, self.suffix = self.parts[0], self.parts[-1]
+        self.separator = self.suffix + "\n" + self.prefix if len(self.parts) == 2 else None
+
+    def render(self, members):
+        """Render one line per member, joined by newlines."""
+        if not members:
+            return ""
+        if self.separator is None:
+            return "\n".join([member.join(self.parts) for member in members])
+        return self.prefix + self.separator.join(members) + self.suffix
+
+
+class LanguageBackend:
+    """Code generation templates for one target language."""
+
+    def __init__(self, name, extension, class_header, inheritance, attribute, method, relationships,
+                 class_footer="", file_prologue="", snake_case_files=False, version=1):
+        """
+        Initialize and compile a backend.
+        :param name: Language name used to select the backend, e.g. "python".
+        :param extension: File extension of generated sources, e.g. ".py".
+        :param class_header: str.format template with {name} and {inheritance}.
+        :param inheritance: str.format template with {parent}, used when the class has a parent.
+        :param attribute: Per-attribute line template with one or more {member} placeholders.
+        :param method: Per-method line template with one or more {member} placeholders.
+        :param relationships: Dict of association type to str.format template with {to},
+                              {to_lower} and {owner}.
+        :param class_footer: Text closing the class.
+        :param file_prologue: Text starting every generated source file, e.g. "<?php".
+        :param snake_case_files: Name files after the snake_case class name (Python modules)
+                                 instead of the class name itself.
+        :param version: Bumped when the templates change, to invalidate cached output.
+        """
+        self.name = name
+        self.extension = extension
+        self.class_footer = class_footer
+        self.file_prologue = file_prologue
+        self.snake_case_files = snake_case_files
+        self.version = version
+        self.render_header = class_header.format
+        self.render_inheritance = inheritance.format
+        self.attribute = MemberTemplate(attribute)
+        self.method = MemberTemplate(method)
+        self.relationship_templates = {kind: template.format for kind, template in relationships.items()}
+
+    def generate_class(self, class_name, attributes, methods, parent_class):
+        """Generate the code of one class."""
+        inheritance = self.render_inheritance(parent=parent_class) if parent_class else ""
+        attribute_block = self.attribute.render(attributes)
+        method_block = self.method.render(methods)
+        if attribute_block and method_block:
+            body = attribute_block + "\n" + method_block
+        else:
+            body = attribute_block or method_block
+        return self.render_header(name=class_name, inheritance=inheritance) + body + self.class_footer
+
+    def file_name(self, class_name):
+        """Name of the source file holding one class."""
+        if self.snake_case_files:
+            class_name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", class_name).lower()
+        return class_name + self.extension
+
+    def generate_relationship(self, assoc):
+        """Generate the member line of a composition/aggregation association, or "" for other types."""
+        template = self.relationship_templates.get(assoc["type"])
+        if template is None:
+            return ""
+        to_class = assoc["to"]
+        return template(to=to_class, to_lower=to_class.lower(), owner=assoc["from"])
+
+
+_BACKENDS = {}
+
+
+def register_backend(backend):
+    """Register a LanguageBackend under its name, replacing any previous one."""
+    _BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(language):
+    """Return the backend for a language, or raise ValueError if none is registered."""
+    backend = _BACKENDS.get(language)
+    if backend is None:
+        raise ValueError(f"Unsupported language. Choose {describe_languages()}.")
+    return backend
+
+
+def available_languages():
+    """Names of the registered languages, in registration order."""
+    return list(_BACKENDS)
+
+
+def describe_languages():
+    """Registered languages as prose, e.g. "python, java, or php"."""
+    names = available_languages()
+    if len(names) <= 2:
+        return " or ".join(names)
+    return ", ".join(names[:-1]) + ", or " + names[-1]
+
+
+register_backend(LanguageBackend(
+    "python", ".py",
+    class_header="class {name}{inheritance}:\n",
+    inheritance="({parent})",
+    attribute="    {member} = None",
+    method="    def {member}(self):\n        pass",
+    relationships={
+        "composition": "    self.{to_lower} = {to}()  # Composition relationship in {owner}",
+        "aggregation": "    self.{to_lower} = None  # Aggregation relationship in {owner}",
+    },
+    snake_case_files=True
+))
+
+register_backend(LanguageBackend(
+    "java", ".java",
+    class_header="public class {name}{inheritance} {{\n",
+    inheritance=" extends {parent}",
+    attribute="    private Object {member};",
+    method="    public void {member}() {}\n",
+    relationships={
+        "composition": "    private {to} {to_lower};  // Composition relationship in {owner}",
+        "aggregation": "    private {to} {to_lower};  // Aggregation relationship in {owner}",
+    },
+    class_footer="\n}"
+))
+
+register_backend(LanguageBackend(
+    "php", ".php",
+    class_header="class {name}{inheritance} {{\n",
+    inheritance=" extends {parent}",
+    attribute="    public ${member};",
+    method="    public function {member}() {}\n",
+    relationships={
+        "composition": "    private ${to_lower};  // Composition relationship in {owner}",
+        "aggregation": "    private ${to_lower};  // Aggregation relationship in {owner}",
+    },
+    class_footer="\n}",
+    file_prologue="<?php\n\n"
+))
@@ -0,0 +1,78 @@
+"""
+Headless rendering of many diagram files to SVG or PNG.
+
+Never imports tkinter, so it runs on build machines without a display:
+
+    python -m src.render "docs/diagrams/**/*.json" -o build/diagrams
+    python -m src.render a.json b.umlb --output-dir out --format svg --format png --zoom 2 --jobs 8
+
+Every input is written to <output-dir>/<path relative to the inputs' common
+directory> with a .svg and/or .png extension. Files are spread over a
+process pool; PNG output needs the optional CairoSVG package.
+"""
+import argparse
+import json
+import os
+import sys
+from functools import partial
+
+from .batch import expand_inputs, print_results, run_pool
+from .diagram.svg import render_file, require_cairosvg
+
+FORMATS = ("svg", "png")
+
+
+def render_one(path, stem, result, output_dir, formats, zoom):
+    """Render one diagram file; a run_pool worker. Records the written files in result."""
+    result["written"] = []
+    target_stem = os.path.join(output_dir, stem)
+    os.makedirs(os.path.dirname(target_stem) or ".", exist_ok=True)
+    result["written"] = render_file(path, target_stem, formats, zoom)
+
+
+def render_batch(paths, output_dir, formats=("svg",), zoom=1.0, jobs=None):
+    """
+    Render every path, over a process pool when jobs > 1.
+    :param jobs: Worker processes; defaults to the number of CPUs.
+    :return: (list of per-file result dicts in input order, wall-clock seconds)
+    """
+    return run_pool(paths, partial(render_one, output_dir=output_dir, formats=formats, zoom=zoom), jobs)
+
+
+def main(argv=None):
+    """Command-line entry point; returns the process exit status."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.render", description="Render UML diagram files to SVG or PNG without a display."
+    )
+    parser.add_argument("inputs", nargs="+", help="Diagram files (.json or .umlb) or glob patterns.")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("-f", "--format", action="append", dest="formats", choices=FORMATS,
+                        help="Output format; repeat for both (default: svg).")
+    parser.add_argument("-z", "--zoom", type=float, default=1.0, help="Output pixels per diagram unit.")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes (default: number of CPUs).")
+    parser.add_argument("--report", help="Also write the per-file results to this JSON file.")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the totals and errors.")
+    args = parser.parse_args(argv)
+
+    formats = tuple(args.formats or ("svg",))
+    if "png" in formats:
+        try:
+            require_cairosvg()
+        except RuntimeError as e:
+            parser.error(str(e))
+    paths, missing = expand_inputs(args.inputs)
+    for pattern in missing:
+        print(f"warning: no diagram files match {pattern}", file=sys.stderr)
+
+    results, elapsed = render_batch(paths, args.output_dir, formats, args.zoom, args.jobs)
+    failed = print_results(results, args.quiet)
+    print(f"{len(results)} files ({failed} failed) rendered in {elapsed:.2f} s: "
+          f"{len(results) / elapsed if elapsed else 0.0:.1f} files/s")
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump({"formats": formats, "seconds": elapsed, "files": results}, file, indent=4)
+    return 1 if failed or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from benchmarks.fake_canvas import FakeRoot
+from src.gui.background import BackgroundRunner
+
+
+def test_join_waits_for_cancelled_workers():
+    runner = BackgroundRunner(FakeRoot())
+    started = threading.Event()
+    stopped = []
+
+    def work(task):
+        started.set()
+        try:
+            while True:
+                time.sleep(0.01)
+                task.check()
+        finally:
+            stopped.append(task.kind)
+
+    runner.submit("codegen", "Generating code", work)
+    runner.submit("export", "Exporting code", work)
+    started.wait()
+    assert not runner.join(0.05)
+    runner.cancel_all()
+    assert runner.join(5)
+    assert sorted(stopped) == ["codegen", "export"]
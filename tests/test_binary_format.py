@@ -0,0 +1,54 @@
+import json
+import random
+
+import pytest
+
+from benchmarks.synthetic import make_diagram
+from src.diagram.binary_format import BinaryDiagram, encode, read_binary, write_binary
+
+
+def random_data(rnd):
+    names = [f"C{i}" for i in range(40)] + ["Ünïcode", "C3"]
+    classes = []
+    for name in names:
+        cls = {
+            "name": name,
+            "attributes": [f"a{rnd.randint(0, 20)}" for _ in range(rnd.randint(0, 4))],
+            "methods": [f"m{rnd.randint(0, 20)}(x)" for _ in range(rnd.randint(0, 3))],
+        }
+        if rnd.random() < 0.8:
+            x, y = rnd.choice([rnd.randint(-500, 500), rnd.uniform(-500, 500)]), rnd.randint(0, 500)
+            cls["position"] = [x, y, x + 200, y + 90.5]
+        classes.append(cls)
+    associations = [
+        {"type": rnd.choice(["association", "inheritance"]), "from": rnd.choice(names), "to": rnd.choice(names)}
+        for _ in range(60)
+    ]
+    # Dangling endpoints are kept by name
+    associations.append({"type": "dependency", "from": "C1", "to": "Missing"})
+    return {"classes": classes, "associations": associations}
+
+
+def test_round_trip_is_identical_to_json(tmp_path):
+    rnd = random.Random(4)
+    for round_number in range(20):
+        data = random_data(rnd)
+        path = str(tmp_path / f"diagram{round_number}.umlb")
+        write_binary(data, path)
+        assert json.dumps(read_binary(path)) == json.dumps(data)
+        with BinaryDiagram(path) as diagram:
+            assert [diagram.class_record(i) for i in range(diagram.class_count)] == data["classes"]
+
+
+def test_synthetic_diagram_round_trip(tmp_path):
+    data = make_diagram(500, members=3, associations_per_class=2)
+    path = str(tmp_path / "diagram.umlb")
+    write_binary(data, path)
+    assert read_binary(path) == data
+
+
+@pytest.mark.parametrize("position", [[1, 2, 3], [1, 2, 3, "4"], [1, 2, 3, True], [0, 0, 0, 2 ** 60]])
+def test_invalid_position_names_the_class(position):
+    data = {"classes": [{"name": "Broken", "attributes": [], "methods": [], "position": position}]}
+    with pytest.raises(ValueError, match="Broken"):
+        encode(data)
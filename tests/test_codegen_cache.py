@@ -0,0 +1,64 @@
+import random
+
+from benchmarks.synthetic import make_diagram
+from src.diagram import ClassNode, Diagram
+from src.diagram.history import History
+from src.models.code_generator import generate_code
+from src.models.codegen_cache import CodegenCache
+from src.models.languages import available_languages
+
+KINDS = ("association", "inheritance", "composition", "aggregation", "dependency")
+
+
+def test_attached_cache_matches_uncached_generation():
+    rnd = random.Random(5)
+    diagram = Diagram.from_dict(make_diagram(80, members=2, associations_per_class=1, inheritance_depth=2))
+    history = History()
+    history.attach(diagram)
+    cache = CodegenCache()
+    cache.attach(diagram)
+
+    for step in range(300):
+        names = list(diagram.classes)
+        roll = rnd.random()
+        if roll < 0.1:
+            diagram.add_class(ClassNode(f"N{step}", [f"a{step}"], ["run()"]))
+        elif roll < 0.2:
+            with history.step():
+                diagram.remove_class(rnd.choice(names))
+        elif roll < 0.25:
+            history.undo()
+        elif roll < 0.5:
+            diagram.add_edge(rnd.choice(KINDS), rnd.choice(names), rnd.choice(names))
+        elif roll < 0.65 and diagram.edges:
+            diagram.remove_edge(rnd.choice(list(diagram.edges)))
+        elif roll < 0.9:
+            diagram.set_members(rnd.choice(names), [f"x{step}"], [f"m{step}(a)"])
+        else:
+            diagram.move_class(rnd.choice(names), 10, 10)
+        if step % 10 == 0:
+            snapshot = diagram.to_dict(include_positions=False)
+            for language in available_languages():
+                expected = generate_code(snapshot, language)
+                assert generate_code(snapshot, language, cache, cache.change_numbers()) == expected, (step, language)
+
+
+def test_saved_cache_gives_the_same_code(tmp_path):
+    data = make_diagram(200, members=3, associations_per_class=2)
+    path = str(tmp_path / "cache.json")
+    cache = CodegenCache(path=path)
+    expected = {language: generate_code(data, language, cache) for language in available_languages()}
+    cache.save()
+
+    loaded = CodegenCache(path=path)
+    assert len(loaded.entries) == len(cache.entries)
+    for language, code in expected.items():
+        assert generate_code(data, language, loaded) == code
+    assert loaded.misses == 0
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    cache = CodegenCache(path=str(path))
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,59 @@
+import os
+import random
+
+import pytest
+
+from benchmarks.synthetic import make_diagram
+from src.models.code_generator import generate_code
+from src.models.exporter import export_code
+
+
+def read_tree(directory):
+    contents = {}
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), "rb") as file:
+            contents[name] = file.read()
+    return contents
+
+
+def test_reexport_writes_only_changed_files(tmp_path):
+    rnd = random.Random(6)
+    data = make_diagram(120, members=2, associations_per_class=1)
+    output_dir = str(tmp_path / "out")
+
+    first = export_code(data, "java", output_dir, max_workers=4)
+    assert len(first["written"]) == 120 and not first["unchanged"]
+    # Every file together holds the same classes as the single-file output
+    code = generate_code(data, "java")
+    for text in read_tree(output_dir).values():
+        assert text.decode("utf-8").rstrip("\n") in code
+
+    for _ in range(5):
+        edited = set(rnd.sample(range(120), 7))
+        for i in edited:
+            data["classes"][i]["attributes"].append(f"extra{rnd.randint(0, 1000)}")
+        before = {path: os.stat(path).st_mtime_ns for path in first["written"]}
+        result = export_code(data, "java", output_dir)
+        expected = {os.path.join(output_dir, data["classes"][i]["name"] + ".java") for i in edited}
+        assert set(result["written"]) == expected
+        assert len(result["unchanged"]) == 120 - len(expected)
+        for path in result["unchanged"]:
+            assert os.stat(path).st_mtime_ns == before[path]
+
+
+def test_colliding_names_get_distinct_files(tmp_path):
+    data = {"classes": [
+        {"name": "HttpServer", "attributes": [], "methods": []},
+        {"name": "HTTPServer", "attributes": [], "methods": []},
+    ], "associations": []}
+    result = export_code(data, "python", str(tmp_path))
+    assert sorted(os.path.basename(path) for path in result["written"]) == ["http_server.py", "http_server_2.py"]
+
+
+@pytest.mark.parametrize("name", ["../escape", "", "sub\\dir"])
+def test_unsafe_names_write_nothing(tmp_path, name):
+    data = {"classes": [{"name": "Fine", "attributes": [], "methods": []},
+                        {"name": name, "attributes": [], "methods": []}], "associations": []}
+    with pytest.raises(ValueError):
+        export_code(data, "java", str(tmp_path / "out"))
+    assert os.listdir(tmp_path / "out") == []
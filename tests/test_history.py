@@ -0,0 +1,101 @@
+import random
+
+from benchmarks.synthetic import make_diagram
+from src.diagram import ClassNode, Diagram
+from src.diagram.history import History
+
+KINDS = ("association", "inheritance", "composition", "aggregation", "dependency")
+
+
+def state(diagram):
+    """Diagram content regardless of order; undo re-inserts classes and edges at the end."""
+    data = diagram.to_dict()
+    classes = sorted((cls["name"], cls["attributes"], cls["methods"], cls["position"]) for cls in data["classes"])
+    associations = sorted((assoc["type"], assoc["from"], assoc["to"]) for assoc in data["associations"])
+    return classes, associations
+
+
+def random_step(rnd, diagram, step):
+    names = list(diagram.classes)
+    roll = rnd.random()
+    if roll < 0.15:
+        diagram.add_class(ClassNode(f"N{step}", [f"a{step}"], [], rnd.randint(0, 500), rnd.randint(0, 500)))
+    elif roll < 0.3:
+        diagram.remove_class(rnd.choice(names))
+    elif roll < 0.5:
+        diagram.add_edge(rnd.choice(KINDS), rnd.choice(names), rnd.choice(names))
+    elif roll < 0.6 and diagram.edges:
+        diagram.remove_edge(rnd.choice(list(diagram.edges)))
+    elif roll < 0.75:
+        diagram.set_members(rnd.choice(names), [f"x{step}"], [f"m{step}(a)"])
+    else:
+        name = rnd.choice(names)
+        for _ in range(rnd.randint(1, 4)):
+            diagram.move_class(name, rnd.randint(-20, 20), rnd.randint(-20, 20))
+
+
+def test_undo_and_redo_retrace_every_step():
+    rnd = random.Random(9)
+    diagram = Diagram.from_dict(make_diagram(40, members=2, associations_per_class=2))
+    history = History()
+    history.attach(diagram)
+
+    states = [state(diagram)]
+    for step in range(300):
+        with history.step():
+            random_step(rnd, diagram, step)
+        states.append(state(diagram))
+
+    for expected in reversed(states[:-1]):
+        assert history.undo()
+        assert state(diagram) == expected
+    assert not history.undo()
+    for expected in states[1:]:
+        assert history.redo()
+        assert state(diagram) == expected
+    assert not history.redo()
+
+    # A new edit after undoing drops the redo steps and their memory
+    for _ in range(10):
+        history.undo()
+    diagram.add_class(ClassNode("Late"))
+    assert not history.can_redo()
+    assert history.size == sum(cost for cost, _ in history.undo_steps)
+
+
+def test_budget_drops_the_oldest_steps():
+    rnd = random.Random(10)
+    diagram = Diagram.from_dict(make_diagram(40, members=2, associations_per_class=2))
+    history = History(max_bytes=5000)
+    history.attach(diagram)
+
+    states = [state(diagram)]
+    for step in range(300):
+        with history.step():
+            random_step(rnd, diagram, step)
+        states.append(state(diagram))
+    assert history.size <= 5000
+    kept = len(history.undo_steps)
+    assert 0 < kept < 300
+
+    while history.undo():
+        pass
+    assert state(diagram) == states[-1 - kept]
+    while history.redo():
+        pass
+    assert state(diagram) == states[-1]
+
+
+def test_a_drag_undoes_at_once():
+    diagram = Diagram()
+    diagram.add_class(ClassNode("A", x=0, y=0))
+    history = History()
+    history.attach(diagram)
+    for _ in range(20):
+        diagram.move_class("A", 3, 4)
+    history.seal()
+    diagram.move_class("A", 1, 1)
+    assert len(history.undo_steps) == 2
+    history.undo()
+    history.undo()
+    assert diagram.get("A").position()[:2] == [0, 0]
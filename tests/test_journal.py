@@ -0,0 +1,175 @@
+import os
+import random
+import threading
+
+from benchmarks.fake_canvas import make_headless_app
+from src.diagram import ClassNode, Diagram
+from src.diagram.journal import Journal, claim_journal, replay_journal, set_aside_journal
+from src.gui import uml_app
+
+KINDS = ("association", "inheritance", "composition", "aggregation", "dependency")
+
+
+def random_edit(rnd, diagram, step):
+    names = list(diagram.classes)
+    roll = rnd.random()
+    if len(names) < 5 or roll < 0.15:
+        diagram.add_class(ClassNode(f"N{step}", [f"a{step}"], [], rnd.randint(0, 500), rnd.randint(0, 500)))
+    elif roll < 0.25:
+        diagram.remove_class(rnd.choice(names))
+    elif roll < 0.45:
+        diagram.add_edge(rnd.choice(KINDS), rnd.choice(names), rnd.choice(names))
+    elif roll < 0.55 and diagram.edges:
+        diagram.remove_edge(rnd.choice(list(diagram.edges)))
+    elif roll < 0.65:
+        diagram.set_members(rnd.choice(names), [f"x{step}"], [f"m{step}(a)"])
+    else:
+        # Runs of moves of one class are merged into a single record
+        name = rnd.choice(names)
+        for _ in range(rnd.randint(1, 4)):
+            diagram.move_class(name, rnd.randint(-20, 20), rnd.randint(-20, 20))
+
+
+def test_replay_matches_diagram(tmp_path):
+    rnd = random.Random(2)
+    diagram = Diagram()
+    for i in range(20):
+        diagram.add_class(ClassNode(f"C{i}", x=10 * i, y=20 * i))
+    path = str(tmp_path / "journal.jsonl")
+    # Compacts every few records, so replays start from snapshots as well as from logs
+    journal = Journal(path, compact_every=25)
+    journal.attach(diagram)
+    # Until its first snapshot is on disk, a journal holds nothing to recover
+    journal.wait()
+
+    for step in range(600):
+        random_edit(rnd, diagram, step)
+        if step % 7 == 0:
+            journal.flush()
+        if step % 50 == 0:
+            journal.flush()
+            assert replay_journal(path).to_dict() == diagram.to_dict(), step
+    journal.flush()
+    assert replay_journal(path).to_dict() == diagram.to_dict()
+    journal.close()
+    assert os.path.exists(path)
+
+
+def test_running_editors_get_their_own_slots(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    first, first_lock = claim_journal(path)
+    second, second_lock = claim_journal(path)
+    assert first == path
+    assert second == str(tmp_path / "journal.2.jsonl")
+
+    # A journal left in a free slot is set aside for recovery
+    diagram = Diagram()
+    journal = Journal(first)
+    journal.attach(diagram)
+    diagram.add_class(ClassNode("Left"))
+    journal.close()
+    first_lock.release()
+    claimed, lock = claim_journal(path)
+    assert claimed == path
+    aside = set_aside_journal(claimed)
+    assert not os.path.exists(claimed)
+    assert list(replay_journal(aside).classes) == ["Left"]
+    lock.release()
+    second_lock.release()
+
+
+def test_replay_removes_the_right_parallel_edge(tmp_path):
+    diagram = Diagram()
+    for name in ("A", "B", "C"):
+        diagram.add_class(ClassNode(name))
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path)
+    journal.attach(diagram)
+    journal.wait()
+
+    first = diagram.add_edge("association", "A", "B")
+    diagram.add_edge("dependency", "C", "A")
+    second = diagram.add_edge("association", "A", "B")
+    diagram.add_edge("association", "B", "A")
+    third = diagram.add_edge("association", "A", "B")
+    diagram.remove_edge(second)
+    journal.flush()
+    assert replay_journal(path).to_dict() == diagram.to_dict()
+    diagram.restore_edge(second)
+    diagram.remove_edge(third)
+    diagram.remove_edge(first)
+    journal.flush()
+    assert replay_journal(path).to_dict() == diagram.to_dict()
+    journal.close()
+
+
+class FullDisk:
+    def write(self, text):
+        raise OSError(28, "No space left on device")
+
+    def close(self):
+        pass
+
+
+def test_unwritable_journal_turns_autosave_off(tmp_path, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(uml_app.messagebox, "showwarning", lambda title, message: warnings.append(message))
+    app = make_headless_app(journal_path="/proc/nonexistent/journal.jsonl")
+    app.root.run_pending()
+    assert app.journal is None and app.journal_lock is None
+    assert len(warnings) == 1 and "/proc/nonexistent" in warnings[0]
+    app.diagram.add_class(ClassNode("A"))
+
+    # A journal that stops being writable mid-session turns autosave off too, keeping the edit
+    app = make_headless_app(journal_path=str(tmp_path / "journal.jsonl"))
+    app.journal.file.close()
+    app.journal.file = FullDisk()
+    app.diagram.add_class(ClassNode("A"))
+    app.diagram.add_class(ClassNode("B"))
+    app.root.run_pending()
+    assert app.journal is None and app.journal_lock is None
+    assert len(warnings) == 2 and "No space left" in warnings[1]
+    assert list(app.diagram.classes) == ["A", "B"]
+
+
+def test_replay_while_a_snapshot_is_written(tmp_path):
+    rnd = random.Random(3)
+    diagram = Diagram()
+    for i in range(10):
+        diagram.add_class(ClassNode(f"C{i}", x=10 * i))
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path, compact_every=5)
+    journal.attach(diagram)
+    journal.wait()
+
+    gate = threading.Event()
+    write_snapshot = journal.write_snapshot
+    journal.write_snapshot = lambda *args: (gate.wait(), write_snapshot(*args))
+    for step in range(8):
+        random_edit(rnd, diagram, step)
+    journal.flush()
+    assert journal.writer is not None
+    for step in range(8, 12):
+        random_edit(rnd, diagram, step)
+    journal.flush()
+    # A crash now finds the old snapshot and a log running across the new marker
+    assert replay_journal(path).to_dict() == diagram.to_dict()
+    gate.set()
+    journal.wait()
+    assert replay_journal(path).to_dict() == diagram.to_dict()
+    with open(path) as file:
+        assert len(file.readlines()) <= 5
+
+    # A diagram attached meanwhile is not recoverable until its snapshot is written;
+    # replay stops at its marker, returning the previous diagram
+    before = diagram.to_dict()
+    gate.clear()
+    other = Diagram()
+    journal.attach(other)
+    other.add_class(ClassNode("Other"))
+    journal.flush()
+    assert replay_journal(path).to_dict() == before
+    gate.set()
+    journal.wait()
+    assert list(replay_journal(path).classes) == ["Other"]
+    journal.close()
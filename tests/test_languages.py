@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.bench_backends import LEGACY
+from benchmarks.synthetic import make_diagram
+from src.models.languages import LanguageBackend, MemberTemplate, get_backend
+
+
+def test_backends_match_previous_generators():
+    for cls in make_diagram(50, members=3)["classes"]:
+        for language, legacy in LEGACY.items():
+            for parent in (None, "Base"):
+                args = (cls["name"], cls["attributes"], cls["methods"], parent)
+                assert get_backend(language).generate_class(*args) == legacy(*args)
+
+
+def test_member_used_several_times():
+    template = MemberTemplate("    def get_{member}(self): return self.{member}")
+    assert template.render(["a", "b"]) == (
+        "    def get_a(self): return self.a\n    def get_b(self): return self.b"
+    )
+    assert template.render([]) == ""
+
+
+def test_template_without_placeholder_is_rejected():
+    with pytest.raises(ValueError, match="placeholder"):
+        LanguageBackend(
+            "broken", ".txt", class_header="{name}{inheritance}\n", inheritance="({parent})",
+            attribute="    field", method="    {member}()", relationships={}
+        )
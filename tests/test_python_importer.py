@@ -0,0 +1,102 @@
+import os
+import random
+
+import pytest
+
+from src.models.python_importer import ImportCache, import_python_tree, parse_source
+
+SOURCE = '''
+class Base:
+    kind = "base"
+
+class Account(Base):
+    limit: int = 0
+
+    def __init__(self, owner, *items):
+        self.owner = owner
+        if items:
+            self.items = list(items)
+        else:
+            self.items = []
+        for item in items:
+            self.last = item
+        try:
+            self.opened = True
+        except ValueError:
+            self.failed = True
+
+        def helper():
+            self.hidden = 1
+
+        class Inner:
+            def __init__(inner):
+                self.also_hidden = 2
+
+        self.callback = lambda: helper()
+
+    def close(self):
+        self.closed = True
+'''
+
+
+def test_init_attributes_skip_nested_scopes():
+    records = {record["name"]: record for record in parse_source(SOURCE)}
+    assert records["Account"]["attributes"] == [
+        "limit", "owner", "items", "last", "opened", "failed", "callback"
+    ]
+    assert records["Account"]["methods"] == ["close"]
+    assert records["Account"]["bases"] == ["Base"]
+    assert records["Inner"]["attributes"] == []
+
+
+def write_tree(root, rnd, files):
+    for i in range(files):
+        package = os.path.join(root, f"pkg{i % 5}")
+        os.makedirs(package, exist_ok=True)
+        lines = []
+        for j in range(rnd.randint(1, 3)):
+            parent = f"(C{rnd.randint(0, files - 1)}_0)" if rnd.random() < 0.5 else ""
+            lines.append(f"class C{i}_{j}{parent}:\n    a{rnd.randint(0, 9)} = 1\n    def m{j}(self):\n        pass\n")
+        with open(os.path.join(package, f"mod{i}.py"), "w") as file:
+            file.write("\n".join(lines))
+
+
+def test_cached_and_pooled_imports_match_a_fresh_import(tmp_path):
+    rnd = random.Random(7)
+    root = str(tmp_path / "src")
+    write_tree(root, rnd, 80)
+    with open(os.path.join(root, "broken.py"), "w") as file:
+        file.write("class (:\n")
+
+    cache = ImportCache()
+    pooled, stats = import_python_tree(root, cache, max_workers=2)
+    assert stats["parsed"] == 81 and len(stats["errors"]) == 1
+    assert pooled == import_python_tree(root, max_workers=1)[0]
+
+    # Change a few files; only those are parsed again
+    for i in rnd.sample(range(80), 4):
+        with open(os.path.join(root, f"pkg{i % 5}", f"mod{i}.py"), "a") as file:
+            file.write(f"\nclass Extra{i}:\n    pass\n")
+    cached, stats = import_python_tree(root, cache, max_workers=1)
+    assert stats["parsed"] == 4
+    assert cached == import_python_tree(root, max_workers=1)[0]
+
+    cache_path = str(tmp_path / "cache.json")
+    cache.save(cache_path)
+    reloaded, stats = import_python_tree(root, ImportCache(cache_path), max_workers=1)
+    assert stats["parsed"] == 0 and reloaded == cached
+
+
+def test_check_stops_the_import(tmp_path):
+    root = str(tmp_path / "src")
+    write_tree(root, random.Random(8), 10)
+    calls = []
+
+    def check():
+        calls.append(None)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        import_python_tree(root, max_workers=1, check=check)
+    assert len(calls) == 3
@@ -0,0 +1,42 @@
+import random
+
+from benchmarks.synthetic import make_diagram
+from src.diagram import ClassNode, Diagram
+from src.diagram.search import SearchIndex
+
+
+def rebuilt_index(diagram):
+    index = SearchIndex()
+    index.attach(Diagram.from_dict(diagram.to_dict()))
+    index.build()
+    return index
+
+
+def test_incremental_index_matches_rebuild():
+    rnd = random.Random(3)
+    diagram = Diagram.from_dict(make_diagram(300, members=4, associations_per_class=1))
+    index = SearchIndex()
+    index.attach(diagram)
+    index.build()
+
+    for step in range(400):
+        names = list(diagram.classes)
+        roll = rnd.random()
+        if roll < 0.3:
+            diagram.remove_class(rnd.choice(names))
+        elif roll < 0.6:
+            diagram.add_class(ClassNode(f"UserAccount{step}", [f"attr{rnd.randint(0, 50)}"], ["getUserName"]))
+        else:
+            diagram.set_members(rnd.choice(names), [f"attr{rnd.randint(0, 50)}"], [f"doThing{step % 5}"])
+        if step % 20 == 0:
+            fresh = rebuilt_index(diagram)
+            assert index.postings == fresh.postings, step
+            assert index.tokens == fresh.tokens, step
+            assert index.neighbours == fresh.neighbours, step
+
+    fresh = rebuilt_index(diagram)
+    assert index.postings == fresh.postings
+    assert index.tokens == fresh.tokens
+    assert index.neighbours == fresh.neighbours
+    for query in ("useraccount", "usr", "attr1", "dothing getusername"):
+        assert index.search(query) == fresh.search(query), query
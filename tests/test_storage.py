@@ -0,0 +1,48 @@
+import json
+import os
+
+import pytest
+
+from src.diagram.layout import layout_file
+from src.diagram.storage import load_diagram_file, save_atomic, save_diagram_file
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = str(tmp_path / "diagram.json")
+    save_diagram_file({"classes": [], "associations": []}, path)
+
+    def failing(temp_path):
+        with open(temp_path, "w") as file:
+            file.write("{partial")
+        raise RuntimeError("disk full")
+
+    with pytest.raises(RuntimeError):
+        save_atomic(path, failing)
+    assert load_diagram_file(path) == {"classes": [], "associations": []}
+    assert os.listdir(tmp_path) == ["diagram.json"]
+
+
+@pytest.mark.parametrize("extension", [".json", ".umlb"])
+def test_layout_file_changes_only_positions(tmp_path, extension):
+    data = {
+        "classes": [
+            {"name": "A", "attributes": ["x"], "methods": []},
+            {"name": "B", "attributes": [], "methods": ["run()"]},
+            {"name": "A", "attributes": ["duplicate"], "methods": []},
+        ],
+        "associations": [
+            {"type": "inheritance", "from": "B", "to": "A"},
+            {"type": "association", "from": "A", "to": "Missing"},
+        ],
+    }
+    path = str(tmp_path / ("diagram" + extension))
+    save_diagram_file(data, path)
+    positions = layout_file(path)
+
+    laid_out = load_diagram_file(path)
+    assert sorted(positions) == ["A", "B"]
+    assert "position" not in laid_out["classes"][2]
+    for cls in laid_out["classes"][:2]:
+        assert cls.pop("position")[:2] == list(positions[cls["name"]])
+    assert json.dumps(laid_out) == json.dumps(data)
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
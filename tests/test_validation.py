@@ -0,0 +1,57 @@
+import random
+
+from src.diagram import ClassNode, Diagram
+from src.diagram.history import History
+from src.diagram.validation import Validator, validate_data
+
+
+def issue_keys(issues):
+    return sorted((issue.kind, tuple(sorted(issue.classes))) for issue in issues)
+
+
+def test_incremental_validation_matches_full_validation():
+    rnd = random.Random(1)
+    diagram = Diagram()
+    for i in range(60):
+        diagram.add_class(ClassNode(f"C{i}"))
+    validator = Validator()
+    validator.attach(diagram)
+    history = History()
+    history.attach(diagram)
+
+    for step in range(1500):
+        names = list(diagram.classes)
+        roll = rnd.random()
+        if len(names) < 5 or roll < 0.05:
+            diagram.add_class(ClassNode(f"N{step}"))
+        elif roll < 0.5:
+            diagram.add_edge("inheritance", rnd.choice(names), rnd.choice(names))
+        elif roll < 0.8 and diagram.edges:
+            diagram.remove_edge(rnd.choice(list(diagram.edges)))
+        elif roll < 0.85:
+            with history.step():
+                diagram.remove_class(rnd.choice(names))
+        elif roll < 0.9:
+            history.undo()
+        else:
+            diagram.add_edge("association", rnd.choice(names), rnd.choice(names))
+
+        fresh = Validator()
+        fresh.attach(diagram)
+        diagram.unsubscribe(fresh.on_model_change)
+        assert issue_keys(validator.issues()) == issue_keys(fresh.issues()), step
+        assert issue_keys(fresh.issues()) == issue_keys(validate_data(diagram.to_dict())), step
+    assert validator.problem_count() > 0
+
+
+def test_validate_data_reports_file_problems():
+    data = {
+        "classes": [{"name": "A"}, {"name": "A"}, {"name": "B"}],
+        "associations": [
+            {"type": "inheritance", "from": "A", "to": "Z"},
+            {"type": "inheritance", "from": "A", "to": "B"},
+            {"type": "inheritance", "from": "B", "to": "A"},
+        ],
+    }
+    kinds = {issue.kind for issue in validate_data(data)}
+    assert kinds == {"duplicate_class", "dangling_endpoint", "cycle"}